@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,11 +13,97 @@ class Settings(BaseSettings):
     # MongoDB Settings
     ME_CONFIG_MONGODB_URL: str = "mongodb://localhost:27017/"
     MONGODB_DB: str = "odoohack"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # None waits for a free connection indefinitely
+    MONGODB_COMPRESSORS: str = ""  # comma-separated, e.g. "zstd,zlib"; zstd and snappy need their extra packages
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None  # None never times out a socket read
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    RESOURCE_INIT_RETRY_SECONDS: float = 5.0
     GEMINI_API_KEY: str = "" 
+    GEMINI_MODEL_NAME: str = "gemini-1.5-flash-latest"
+    LLM_PROVIDER: str = "gemini"  # "gemini", or "fake" for the local deterministic model
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_FAKE_LATENCY_SECONDS: float = 0.0
+    LLM_FAKE_TOKENS_PER_SECOND: float = 0.0  # 0 streams the fake reply without delay
     #jira key
     JIRA_URL:str=""
     JIRA_USERNAME:str=""
     JIRA_API_KEY:str=""
 
+    # Background jobs
+    MEMBERSHIP_RECONCILE_INTERVAL_SECONDS: int = 3600
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = 30.0
+    MEMBERSHIP_CACHE_MAX_USERS: int = 10000
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 900
+    TASK_ROLLUP_INTERVAL_SECONDS: int = 3600
+    TASK_ROLLUP_BACKFILL_DAYS: int = 7
+    TASK_ANALYTICS_DEFAULT_DAYS: int = 30
+    TASK_ANALYTICS_MAX_DAYS: int = 366
+    WORKLOAD_REPORT_WEEKS: int = 8
+    WORKLOAD_REPORT_MAX_PROJECTS: int = 500
+    WORKLOAD_REPORT_BATCH_SIZE: int = 5000
+    WORKLOAD_CACHE_TTL_SECONDS: float = 300.0
+    WORKLOAD_CACHE_MAX_ENTRIES: int = 256
+    LLM_MAX_CONCURRENT_JOBS: int = 8
+    LLM_MAX_CONCURRENT_JOBS_PER_PROJECT: int = 2
+    LLM_QUEUE_MAX_SIZE: int = 200
+    LLM_JOB_RETENTION_SECONDS: float = 3600.0
+    LLM_JOB_RETENTION_MAX_JOBS: int = 10000
+    LLM_METRICS_WINDOW: int = 1000
+    LLM_STREAM_FLUSH_INTERVAL_SECONDS: float = 0.1
+    LLM_CONTEXT_TOKEN_BUDGET: int = 3000
+    LLM_CONTEXT_TASK_SHARE: float = 0.6
+    LLM_CONTEXT_MAX_OPEN_TASKS: int = 300
+    LLM_CONTEXT_MAX_DONE_TASKS: int = 50
+    LLM_CONTEXT_MAX_MESSAGES: int = 50
+    LLM_CONTEXT_DESCRIPTION_MAX_TOKENS: int = 200
+    LLM_CONTEXT_LINE_MAX_TOKENS: int = 100
+    LLM_CACHE_TTL_SECONDS: float = 600.0
+    LLM_CACHE_MAX_ENTRIES: int = 2000
+    RETRIEVAL_HASH_BITS: int = 18
+    RETRIEVAL_TOP_K: int = 8
+    RETRIEVAL_INDEX_CACHE_PROJECTS: int = 64
+    RETRIEVAL_INDEX_CACHE_SECONDS: float = 3600.0
+    RETRIEVAL_BACKFILL_MAX_ITEMS: int = 5000
+    CHAT_SUMMARY_ENABLED: bool = False  # Opt-in: every room's chat is sent to the LLM provider
+    CHAT_SUMMARY_EVERY_MESSAGES: int = 20
+    CHAT_SUMMARY_MAX_BATCH: int = 200
+    CHAT_SUMMARY_MAX_TOKENS: int = 400
+    CHAT_SUMMARY_PROJECTS_PER_RUN: int = 20
+    CHAT_SUMMARY_POLL_INTERVAL_SECONDS: float = 30.0
+    CASCADE_BATCH_SIZE: int = 500
+    CASCADE_BATCH_DELAY_SECONDS: float = 0.05
+    CASCADE_POLL_INTERVAL_SECONDS: float = 2.0
+    CASCADE_STALE_JOB_SECONDS: int = 300
+    CASCADE_MAX_ATTEMPTS: int = 10
+    CASCADE_BACKOFF_BASE_SECONDS: float = 5.0
+    CASCADE_BACKOFF_MAX_SECONDS: float = 600.0
+    JIRA_OUTBOX_POLL_INTERVAL_SECONDS: float = 2.0
+    JIRA_OUTBOX_LEASE_SECONDS: int = 120
+    JIRA_OUTBOX_MAX_ATTEMPTS: int = 8
+    JIRA_OUTBOX_BACKOFF_BASE_SECONDS: float = 2.0
+    JIRA_OUTBOX_BACKOFF_MAX_SECONDS: float = 600.0
+    JIRA_TASK_SYNC_INTERVAL_SECONDS: int = 60
+    JIRA_TASK_SYNC_LEASE_SECONDS: int = 300
+    JIRA_TASK_SYNC_BATCH_SIZE: int = 500
+    # Pull windows overlap the previous run by this much to absorb clock skew with Jira.
+    JIRA_TASK_SYNC_OVERLAP_MINUTES: int = 2
+    TASK_IMPORT_BATCH_SIZE: int = 500
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+    # Large batches keep round trips low on big chat histories while bounding memory per batch.
+    ARCHIVE_CURSOR_BATCH_SIZE: int = 2000
+    # A resume token is emitted after this many records of a section.
+    ARCHIVE_CHECKPOINT_EVERY: int = 1000
+    # Due-date reminders are sent this long before a task is due.
+    REMINDER_LEAD_SECONDS: int = 86400
+    # How far past the lead time each scheduler reload looks, and how often it reloads.
+    REMINDER_WINDOW_SECONDS: int = 3600
+    REMINDER_BATCH_SIZE: int = 100
+
 # Create a single, importable instance of the settings
 settings = Settings()
\ No newline at end of file
@@ -1,44 +1,99 @@
-import os
+import logging
+import inspect
+import threading
+from typing import Any, Dict
 from pymongo import MongoClient
 from pymongo.database import Database
 from .config import settings # Assuming config is in the same core directory
+from .logger import logs
+from .mongo_metrics import mongo_metrics
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class MongoManager:
-    """Manages the single connection pool to the MongoDB database."""
+    """
+    Manages the single connection pool to the MongoDB database.
+
+    Nothing is opened when the manager is created: `connect` is called by the application
+    lifespan (or by the first `get_client` call in scripts), and MongoClient itself connects in
+    the background, so neither importing nor starting the app blocks on an unreachable server.
+    """
     def __init__(self, mongo_url: str):
-        print("Initializing MongoDB connection pool...")
-        try:
-            self.client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
-            self.client.admin.command('ping') # Verify connection
-            print("MongoDB connection successful.")
-        except Exception as e:
-            print(f"FATAL: Error connecting to MongoDB: {e}")
-            self.client = None
-    
+        self.mongo_url = mongo_url
+        self.client = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def client_options() -> Dict[str, Any]:
+        """Pool, timeout and compression options from settings, plus the metrics listeners."""
+        options = {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "event_listeners": mongo_metrics.listeners,
+        }
+        if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+            options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+        if settings.MONGODB_SOCKET_TIMEOUT_MS is not None:
+            options["socketTimeoutMS"] = settings.MONGODB_SOCKET_TIMEOUT_MS
+        compressors = [name.strip() for name in settings.MONGODB_COMPRESSORS.split(",") if name.strip()]
+        if compressors:
+            options["compressors"] = compressors
+        return options
+
+    def connect(self) -> MongoClient:
+        with self._lock:
+            if self.client is None:
+                logs.define_logger(logging.INFO, None, inspect.stack()[0], message="Initializing MongoDB connection pool...")
+                self.client = MongoClient(self.mongo_url, **self.client_options())
+            return self.client
+
     def get_client(self) -> MongoClient:
-        if not self.client:
-            raise ConnectionError("MongoDB client is not available.")
-        return self.client
+        return self.client or self.connect()
 
     def get_database(self) -> Database:
         """Returns the database instance specified in settings."""
         return self.get_client()[settings.MONGODB_DB]
 
+    def ping(self) -> bool:
+        """Round-trips to the server. Raises if no server answers within the selection timeout."""
+        self.get_client().admin.command('ping')
+        return True
+
+    def pool_status(self) -> Dict[str, Any]:
+        """The client's view of the deployment, without any network I/O."""
+        if self.client is None:
+            return {"connected": False, "servers": []}
+        description = self.client.topology_description
+        return {
+            "connected": True,
+            "topology": description.topology_type_name,
+            "servers": [
+                {"address": f"{host}:{port}", "type": server.server_type_name, "round_trip_ms": round(server.round_trip_time * 1000, 2) if server.round_trip_time is not None else None}
+                for (host, port), server in description.server_descriptions().items()
+            ],
+            "max_pool_size": self.client.options.pool_options.max_pool_size,
+            "min_pool_size": self.client.options.pool_options.min_pool_size,
+        }
+
     def close_connection(self):
-        if self.client:
-            self.client.close()
-            print("MongoDB connection closed.")
+        with self._lock:
+            if self.client:
+                self.client.close()
+                self.client = None
+                logs.define_logger(logging.INFO, None, inspect.stack()[0], message="MongoDB connection closed.")
 
 # --- Singleton Instance ---
-# This part runs when the module is imported, creating one connection manager.
-mongo_url = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-mongo_manager = MongoManager(mongo_url=mongo_url)
+# Creating the manager only records the URL; the pool is opened in the application lifespan.
+mongo_manager = MongoManager(mongo_url=settings.ME_CONFIG_MONGODB_URL)
+
+# --- Dependency Functions ---
+def get_mongo_manager() -> MongoManager:
+    """FastAPI dependency to get the connection manager."""
+    return mongo_manager
 
-# --- Dependency Function ---
-# This is the function that your repository needs to import.
 def get_db() -> Database:
     """FastAPI dependency to get the database instance."""
     return mongo_manager.get_database()
@@ -1,10 +1,15 @@
+import asyncio
+from abc import ABC, abstractmethod
 import google.generativeai as genai
+import google.api_core.exceptions as google_exceptions
 import logging
 import inspect
 from functools import lru_cache
+from typing import AsyncIterator, Dict, Type
 
 from app.core.config import settings
 from app.core.logger import logs
+from app.utils.fake_llm import FakeGenerativeModel
 
 @lru_cache(maxsize=1) # Cache the client instance
 def get_gemini_client():
@@ -27,4 +32,119 @@ def get_gemini_client():
         return genai
     except Exception as e:
         logs.define_logger(logging.CRITICAL, None, log_name, message=f"FATAL: Failed to configure Gemini API client: {e}")
-        raise ConnectionError(f"Failed to configure Gemini API client: {e}")
\ No newline at end of file
+        raise ConnectionError(f"Failed to configure Gemini API client: {e}")
+
+
+async def _chunk_texts(response) -> AsyncIterator[str]:
+    async for chunk in response:
+        yield chunk.text
+
+
+class LLMProvider(ABC):
+    """
+    A model that streams answers to prompts. Subclasses implement `_open_stream`; the timeout and
+    retry policy shared by every provider lives in `stream`.
+    """
+    name = "base"
+    # Errors worth another attempt. Only raised before the first chunk is retried, since text
+    # already relayed to the chat room cannot be taken back.
+    retryable_errors: tuple = (asyncio.TimeoutError, ConnectionError)
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.retries = 0
+
+    @abstractmethod
+    async def _open_stream(self, prompt: str, timeout_seconds: float) -> AsyncIterator[str]:
+        """Starts generating an answer and returns its text chunks."""
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yields the answer to `prompt` as it is generated. Each attempt must finish within
+        LLM_TIMEOUT_SECONDS; failed attempts that produced nothing are retried up to
+        LLM_MAX_RETRIES times with exponential backoff.
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            deadline = loop.time() + settings.LLM_TIMEOUT_SECONDS
+            produced = False
+            try:
+                chunks = (await asyncio.wait_for(self._open_stream(prompt, settings.LLM_TIMEOUT_SECONDS), settings.LLM_TIMEOUT_SECONDS)).__aiter__()
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError(f"No complete answer within {settings.LLM_TIMEOUT_SECONDS}s.")
+                    try:
+                        text = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        return
+                    if text:
+                        produced = True
+                        yield text
+            except self.retryable_errors as e:
+                if produced or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                attempt += 1
+                self.retries += 1
+                delay = settings.LLM_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logs.define_logger(logging.WARNING, None, inspect.stack()[0], message=f"LLM provider '{self.name}' attempt {attempt} failed ({type(e).__name__}: {e}); retrying in {delay:.2f}s.")
+                await asyncio.sleep(delay)
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the google.generativeai client."""
+    name = "gemini"
+    retryable_errors = LLMProvider.retryable_errors + (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+    )
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = get_gemini_client().GenerativeModel(model_name)
+
+    async def _open_stream(self, prompt: str, timeout_seconds: float) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True, request_options={"timeout": timeout_seconds})
+        return _chunk_texts(response)
+
+
+class FakeLLMProvider(LLMProvider):
+    """The deterministic FakeGenerativeModel, for local runs, tests and load tests."""
+    name = "fake"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = FakeGenerativeModel(model_name, latency_seconds=settings.LLM_FAKE_LATENCY_SECONDS, tokens_per_second=settings.LLM_FAKE_TOKENS_PER_SECOND)
+
+    async def _open_stream(self, prompt: str, timeout_seconds: float) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True, request_options={"timeout": timeout_seconds})
+        return _chunk_texts(response)
+
+
+LLM_PROVIDERS: Dict[str, Type[LLMProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    FakeLLMProvider.name: FakeLLMProvider,
+}
+
+
+def is_llm_configured() -> bool:
+    """Returns True if LLM_PROVIDER names a known provider that has what it needs to run."""
+    if settings.LLM_PROVIDER == GeminiProvider.name:
+        return bool(settings.GEMINI_API_KEY)
+    return settings.LLM_PROVIDER in LLM_PROVIDERS
+
+
+@lru_cache(maxsize=1)
+def get_llm_provider() -> LLMProvider:
+    """
+    Returns the provider selected by LLM_PROVIDER for GEMINI_MODEL_NAME.
+    Call `get_llm_provider.cache_clear()` after changing those settings at runtime.
+    """
+    provider_class = LLM_PROVIDERS.get(settings.LLM_PROVIDER)
+    if provider_class is None:
+        raise ValueError(f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}'. Expected one of: {', '.join(LLM_PROVIDERS)}.")
+    logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Using LLM provider '{provider_class.name}' with model '{settings.GEMINI_MODEL_NAME}'.")
+    return provider_class(settings.GEMINI_MODEL_NAME)
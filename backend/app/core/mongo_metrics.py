@@ -0,0 +1,147 @@
+import threading
+from typing import Dict, Any, Tuple
+
+from pymongo import monitoring
+
+from app.utils.metrics import registry
+
+# Commands that do not name a collection are reported under this name (ping, hello, ...).
+NO_COLLECTION = "-"
+
+MONGO_COMMAND_DURATION = registry.histogram("mongo_command_duration_seconds", "Duration of MongoDB commands, as measured by the driver.", ["collection", "operation"])
+MONGO_COMMAND_FAILURES = registry.counter("mongo_command_failures_total", "MongoDB commands that failed.", ["collection", "operation"])
+MONGO_CHECKOUT_WAIT = registry.histogram("mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.")
+MONGO_CHECKOUT_FAILURES = registry.counter("mongo_pool_checkout_failures_total", "Connection checkouts that failed, by reason.", ["reason"])
+MONGO_CONNECTIONS_OPEN = registry.gauge("mongo_pool_connections_open", "Connections currently open.")
+MONGO_CONNECTIONS_CHECKED_OUT = registry.gauge("mongo_pool_connections_checked_out", "Connections currently checked out.")
+MONGO_CONNECTIONS_CREATED = registry.counter("mongo_pool_connections_created_total", "Connections opened.")
+MONGO_CONNECTIONS_CLOSED = registry.counter("mongo_pool_connections_closed_total", "Connections closed.")
+MONGO_POOL_CLEARS = registry.counter("mongo_pool_clears_total", "Times the pool was cleared after an error.")
+
+
+def _command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return command.get("collection", NO_COLLECTION)
+    target = command.get(command_name)
+    return target if isinstance(target, str) else NO_COLLECTION
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Latency histogram and failure count per (collection, operation), fed by pymongo command
+    events. The collection is taken from the started event, as the finished events do not carry
+    the command.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], str] = {}
+        self.latency = MONGO_COMMAND_DURATION
+        self.failures = MONGO_COMMAND_FAILURES
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        collection = _command_collection(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _finished(self, event, failed: bool):
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), NO_COLLECTION)
+        self.latency.labels(collection, event.command_name).observe(event.duration_micros / 1_000_000)
+        if failed:
+            self.failures.labels(collection, event.command_name).inc()
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finished(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finished(event, failed=True)
+
+    def snapshot(self) -> list:
+        rows = []
+        for (collection, operation), histogram in list(self.latency.children.items()):
+            failures = self.failures.children.get((collection, operation))
+            rows.append({"collection": collection, "operation": operation, "failures": int(failures.value) if failures else 0, **histogram.snapshot()})
+        return sorted(rows, key=lambda row: row["sum_seconds"], reverse=True)
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool activity, fed by pymongo pool events: how long operations wait to check a
+    connection out, how often that fails (e.g. the wait queue timed out), and how many
+    connections are open and in use.
+    """
+    def __init__(self):
+        self.checkout_wait = MONGO_CHECKOUT_WAIT.labels()
+        self.checkout_failures = MONGO_CHECKOUT_FAILURES
+        self.connections_open = MONGO_CONNECTIONS_OPEN.labels()
+        self.connections_checked_out = MONGO_CONNECTIONS_CHECKED_OUT.labels()
+        self.connections_created = MONGO_CONNECTIONS_CREATED.labels()
+        self.connections_closed = MONGO_CONNECTIONS_CLOSED.labels()
+        self.pool_clears = MONGO_POOL_CLEARS.labels()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears.inc()
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.connections_created.inc()
+        self.connections_open.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.connections_closed.inc()
+        self.connections_open.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent):
+        self.checkout_failures.labels(str(event.reason)).inc()
+        if getattr(event, "duration", None) is not None:
+            self.checkout_wait.observe(event.duration)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent):
+        self.connections_checked_out.inc()
+        # 'duration' (the time spent waiting for the connection) exists since pymongo 4.7.
+        if getattr(event, "duration", None) is not None:
+            self.checkout_wait.observe(event.duration)
+
+    def connection_checked_in(self, event):
+        self.connections_checked_out.dec()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "connections_open": int(self.connections_open.value),
+            "connections_checked_out": int(self.connections_checked_out.value),
+            "connections_created": int(self.connections_created.value),
+            "connections_closed": int(self.connections_closed.value),
+            "pool_clears": int(self.pool_clears.value),
+            "checkout_failures": {reason: int(counter.value) for (reason,), counter in list(self.checkout_failures.children.items())},
+            "checkout_wait": self.checkout_wait.snapshot(),
+        }
+
+
+class MongoMetrics:
+    """The command and pool listeners registered on the application's MongoClient."""
+    def __init__(self):
+        self.commands = MongoCommandMetrics()
+        self.pool = MongoPoolMetrics()
+
+    @property
+    def listeners(self) -> list:
+        return [self.commands, self.pool]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"pool": self.pool.snapshot(), "commands": self.commands.snapshot()}
+
+mongo_metrics = MongoMetrics()
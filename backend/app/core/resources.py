@@ -0,0 +1,78 @@
+import inspect
+import threading
+from typing import Any, Callable, Dict, List, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyResource:
+    """
+    Stands in for an object that needs the database to be constructed (repositories create their
+    indexes in __init__). The object is built on first use, or at startup by the application
+    lifespan, so importing a module never touches MongoDB.
+
+    Looking up a method of a class that is not built yet returns a function that builds it when
+    called, so `asyncio.to_thread(task_repo.get_by_id, ...)` builds the repository in the worker
+    thread rather than blocking the event loop.
+    """
+    # Its own members are prefixed with 'resource_' so they never shadow the wrapped object's.
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def resource_initialized(self) -> bool:
+        return self._instance is not None
+
+    def resource_instance(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def resource_reset(self):
+        """
+        Drops the instance; the next access builds a new one (e.g. after a reconnect). Does not
+        wait for a build in progress on another thread, so shutdown never blocks on the database.
+        """
+        self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._instance is None and inspect.isfunction(getattr(self._factory, name, None)):
+            def deferred(*args, **kwargs):
+                return getattr(self.resource_instance(), name)(*args, **kwargs)
+            return deferred
+        return getattr(self.resource_instance(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyResource {self._name} ({'initialized' if self.resource_initialized else 'pending'})>"
+
+
+_resources: List[LazyResource] = []
+
+
+def lazy_resource(name: str, factory: Callable[[], T]) -> T:
+    """Registers a lazily constructed singleton and returns its stand-in."""
+    resource = LazyResource(name, factory)
+    _resources.append(resource)
+    return resource  # type: ignore[return-value]
+
+
+def pending_resources() -> List[LazyResource]:
+    """The registered resources that have not been built yet."""
+    return [resource for resource in _resources if not resource.resource_initialized]
+
+
+def reset_resources():
+    for resource in _resources:
+        resource.resource_reset()
+
+
+def resources_status() -> Dict[str, bool]:
+    """Whether each registered resource has been built."""
+    return {resource._name: resource.resource_initialized for resource in _resources}
@@ -1,3 +1,7 @@
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.auth_routes import router as auth_router# Assuming your router is in routes/auth_routes.py
@@ -8,10 +12,40 @@ from app.routes.notification_routes import router as notification_router # Impor
 from app.routes.llm_routes import router as llm_router
 from app.routes.member_routes import router as member_router
 from app.routes.stats_routes import router as stats_router
+from app.routes.search_routes import router as search_router
+from app.routes.health_routes import router as health_router
+from app.routes.metrics_routes import router as metrics_router
+from app.core.config import settings
+from app.core.db_connection import mongo_manager
+from app.core.llm_connection import is_llm_configured
+from app.core.logger import logs
+from app.core.resources import pending_resources, reset_resources
+from app.services.reminder_service import reminder_scheduler
+from app.services.llm_queue_service import llm_job_queue
+from app.services import project_service, cascade_service, jira_service, jira_outbox_service, jira_sync_service, stats_service, analytics_service, chat_summary_service
+from app.utils.background import background_runner
+from app.utils.request_metrics import RequestMetricsMiddleware
 
 
 
-app = FastAPI(title = "SynergySphere – Advanced Team Collaboration Platform")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens the MongoDB pool and starts the background jobs; on shutdown stops the jobs, then
+    closes the pool. Repositories are created in the background (see initialize_repositories),
+    so the server accepts connections, and answers /health/live, even while MongoDB is down.
+    """
+    mongo_manager.connect()
+    background_runner.start("resource-initialization", initialize_repositories())
+    await start_background_jobs()
+    try:
+        yield
+    finally:
+        await background_runner.shutdown()
+        reset_resources()
+        mongo_manager.close_connection()
+
+app = FastAPI(title = "SynergySphere – Advanced Team Collaboration Platform", lifespan=lifespan)
  #--- CORS Middleware Configuration ---
  #Define the list of origins that are allowed to make requests to this API.
  #In production, you should restrict this to your actual frontend domain.
@@ -30,7 +64,10 @@ app.add_middleware(
     allow_credentials=True, # Allows cookies to be included in requests
     allow_methods=["*"],    # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],    # Allows all headers
+    expose_headers=["ETag", "X-Next-Cursor"], # Lets the frontend read ETags and pagination cursors
 )
+# Added last so it is outermost and its timings include CORS handling.
+app.add_middleware(RequestMetricsMiddleware)
 # --- Include Routers ---
 # It's good practice to add middleware before including routers.
 app.include_router(auth_router)
@@ -41,6 +78,55 @@ app.include_router(notification_router) # Add the notification router
 app.include_router(llm_router)
 app.include_router(member_router)
 app.include_router(stats_router)
+app.include_router(search_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+
+
+# --- Background Jobs ---
+async def initialize_repositories():
+    """Creates the repositories and their indexes, retrying until MongoDB is reachable."""
+    while True:
+        failed = []
+        for resource in pending_resources():
+            try:
+                await asyncio.to_thread(resource.resource_instance)
+            except Exception as e:
+                failed.append(resource)
+                logs.define_logger(logging.WARNING, None, inspect.stack()[0], message=f"Could not initialize {resource!r}, retrying: {e}")
+        if not failed:
+            return
+        await asyncio.sleep(settings.RESOURCE_INIT_RETRY_SECONDS)
+
+async def start_background_jobs():
+    # The first run also backfills the membership index for projects created before it existed.
+    background_runner.start_periodic(
+        "membership-reconciliation",
+        settings.MEMBERSHIP_RECONCILE_INTERVAL_SECONDS,
+        project_service.reconcile_memberships
+    )
+    # Stat counters are maintained incrementally; this corrects drift and backfills them on first run.
+    background_runner.start_periodic(
+        "stats-reconciliation",
+        settings.STATS_RECONCILE_INTERVAL_SECONDS,
+        stats_service.reconcile_counters
+    )
+    # Seeds each day's analytics rollups soon after midnight and backfills recent days.
+    background_runner.start_periodic(
+        "task-rollups",
+        settings.TASK_ROLLUP_INTERVAL_SECONDS,
+        analytics_service.snapshot_and_backfill
+    )
+    background_runner.start("project-cascade-worker", cascade_service.cascade_worker())
+    background_runner.start("due-date-reminders", reminder_scheduler.run())
+    background_runner.start("llm-job-dispatcher", llm_job_queue.run())
+    # Summaries send every room's chat to the model, so they only run when enabled and the provider is usable.
+    if settings.CHAT_SUMMARY_ENABLED and is_llm_configured():
+        background_runner.start("chat-summarizer", chat_summary_service.chat_summary_worker())
+    # Outbox entries are kept until Jira is configured, then drained.
+    if jira_service.is_configured():
+        background_runner.start("jira-outbox-worker", jira_outbox_service.jira_outbox_worker())
+        background_runner.start_periodic("jira-task-sync", settings.JIRA_TASK_SYNC_INTERVAL_SECONDS, jira_sync_service.sync_all_projects)
 
 
 
@@ -0,0 +1,58 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+class LLMJobStatus(str, Enum):
+    """
+    Lifecycle of a queued LLM prompt.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class LLMJob(BaseModel):
+    """
+    A prompt waiting for, or answered by, the LLM job queue.
+    """
+    job_id: str
+    project_id: str
+    user_id: str
+    status: LLMJobStatus = LLMJobStatus.QUEUED
+    enqueued_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    queue_wait_seconds: Optional[float] = None  # From enqueue until a worker picked the job up
+    generation_seconds: Optional[float] = None  # From pickup until the answer was posted to the chat
+    response_message_id: Optional[str] = None  # Chat message holding the answer
+    error: Optional[str] = None
+
+class ContextSection(BaseModel):
+    """
+    One section of the context sent with a prompt, and what it cost.
+    """
+    name: str
+    tokens: int  # Estimated tokens of the text included
+    items_included: int
+    items_available: int  # Candidates fetched before the budget was applied
+    fetch_seconds: float
+
+class LLMContext(BaseModel):
+    """
+    The context block of a prompt, built within the token budget.
+    """
+    text: str
+    total_tokens: int
+    token_budget: int
+    sections: List[ContextSection]
+    build_seconds: float
+
+class RetrievedItem(BaseModel):
+    """
+    A task or chat message returned by the retrieval index for a question.
+    """
+    kind: str  # "task" or "chat"
+    item_id: str
+    label: str
+    score: float  # Cosine similarity of the hashed TF-IDF vectors, 0 to 1
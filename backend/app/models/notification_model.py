@@ -14,6 +14,7 @@ class NotificationBase(BaseModel):
     user_id: str  # The ID of the user who receives the notification
     message: str
     link: Optional[str] = None  # A URL to the relevant item (e.g., /tasks/{task_id})
+    project_id: Optional[str] = None  # The project the notification is about, if any
     status: NotificationStatus = Field(default=NotificationStatus.UNREAD)
 
 class Notification(NotificationBase):
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
 from bson import ObjectId
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
 from datetime import datetime
+from enum import Enum
 
 # --- Core Model ---
 class Project(BaseModel):
@@ -42,3 +43,34 @@ class ProjectUpdate(BaseModel):
 class ProjectMemberUpdate(BaseModel):
     user_id: str = Field(..., description="The ID of the user to add or remove from the project.")
 
+
+# --- Cascade Job Models ---
+class CascadeJobStatus(str, Enum):
+    """Lifecycle of a background cascade job."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class ProjectCascadeJob(BaseModel):
+    """Progress of the background job soft-deleting a deleted project's tasks, chat history and notifications."""
+    job_id: str = Field(..., alias="_id")
+    project_id: str
+    status: CascadeJobStatus
+    progress: Dict[str, int] = Field(default_factory=dict, description="Documents soft-deleted so far, per collection.")
+    error: Optional[str] = None
+    attempts: int = 0  # Failed runs so far; a failed run is retried with backoff
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator("job_id", mode="before")
+    @classmethod
+    def convert_objectid_to_str(cls, v: Any) -> str:
+        if isinstance(v, ObjectId):
+            return str(v)
+        return v
+
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+from enum import Enum
+
+class SearchScope(str, Enum):
+    """
+    What a search covers.
+    """
+    ALL = "all"
+    TASKS = "tasks"
+    PROJECTS = "projects"
+    CHAT = "chat"
+
+class SearchHit(BaseModel):
+    """
+    A single search result.
+    """
+    type: str  # "task", "project" or "chat"
+    id: str
+    project_id: str
+    title: str  # Task title, project name or chat message text
+    score: float  # Relevance; higher is better
+    highlights: Dict[str, str] = Field(default_factory=dict)  # Field name -> HTML snippet with <mark>ed terms
@@ -12,6 +12,28 @@ class TaskStatus(str, Enum):
     IN_PROGRESS = "In Progress"
     DONE = "Done"
 
+class TaskSortField(str, Enum):
+    """
+    Whitelist of fields a project task list can be sorted by.
+    Each of them is backed by a compound index on (project_id, is_deleted, field, _id).
+    """
+    DUE_DATE = "due_date"
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+    TITLE = "title"
+    STATUS = "status"
+
+class TaskListFilter(BaseModel):
+    """
+    Server-side filters for listing the tasks of a project.
+    All fields are optional and combined with AND.
+    """
+    status: Optional[List[TaskStatus]] = None
+    assignee: Optional[str] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    overdue: Optional[bool] = None
+
 class TaskBase(BaseModel):
     """
     Base model for task properties.
@@ -47,8 +69,11 @@ class Task(TaskBase):
     task_id: str = Field(..., alias="_id")
     project_id: str
     created_by: str  # The user ID of the creator
+    jira_issue_key: Optional[str] = None  # Set once the task is mirrored to Jira
+    version: int = 1  # Incremented on every write; sent back in If-Match for optimistic concurrency
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None  # Set when the task moves to Done, cleared if it is reopened
 
     @field_validator("task_id", mode="before")
     @classmethod
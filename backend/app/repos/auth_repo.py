@@ -6,6 +6,7 @@ from ..models.auth_model import UserCreate
 from bson import ObjectId
 from ..core.security import get_password_hash
 from ..core.db_connection import get_db
+from ..core.resources import lazy_resource
 
 USER_COLLECTION_NAME = "users"
 
@@ -60,4 +61,8 @@ class AuthRepo(BaseRepo):
         # The get_all method from BaseRepo will combine this with the 'is_deleted: False' filter.
         return self.get_all(query)
 
-auth_repo = AuthRepo()
\ No newline at end of file
+auth_repo = lazy_resource("auth_repo", AuthRepo)
+
+def get_auth_repo() -> AuthRepo:
+    """FastAPI dependency returning the shared AuthRepo."""
+    return auth_repo.resource_instance()
\ No newline at end of file
@@ -1,13 +1,35 @@
 import logging
 import inspect
+import functools
+import time
 from pymongo.collection import Collection
-from pymongo.errors import PyMongoError
+from pymongo.errors import PyMongoError, CursorNotFound
 from bson import ObjectId
 from bson.errors import InvalidId
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Import the custom logger instance
 from app.core.logger import logs
+from app.utils.metrics import registry
+
+REPO_OPERATION_DURATION = registry.histogram(
+    "mongo_repo_operation_duration_seconds",
+    "Duration of repository operations, including the driver round trips and document decoding.",
+    ["collection", "operation"]
+)
+
+def timed(func):
+    """Records the duration of a repository method under its collection and method name."""
+    operation = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            REPO_OPERATION_DURATION.labels(self.collection.name, operation).observe(time.perf_counter() - start)
+    return wrapper
 
 class BaseRepo:
     """
@@ -21,19 +43,23 @@ class BaseRepo:
         """
         self.collection = collection
 
+    @timed
     def create(self, data: Dict[str, Any]) -> ObjectId:
         """
         Creates a new document in the collection.
-        All new documents are automatically set to 'is_deleted: False'.
+        All new documents are automatically set to 'is_deleted: False'
+        and start at 'version: 1'.
         """
         try:
             data['is_deleted'] = False
+            data['version'] = 1
             result = self.collection.insert_one(data)
             return result.inserted_id
         except PyMongoError as e:
             logs.define_logger(level=logging.CRITICAL, loggName=inspect.stack()[0], message=f"Database error during document creation: {e}")
             raise
 
+    @timed
     def create_many(self, data_list: List[Dict[str, Any]]) -> int:
         """Creates multiple new documents in the collection."""
         if not data_list:
@@ -41,19 +67,21 @@ class BaseRepo:
         try:
             for doc in data_list:
                 doc['is_deleted'] = False
+                doc['version'] = 1
             result = self.collection.insert_many(data_list)
             return len(result.inserted_ids)
         except PyMongoError as e:
             logs.define_logger(level=logging.CRITICAL, loggName=inspect.stack()[0], message=f"Database error during bulk document creation: {e}")
             raise
 
-    def get_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
+    @timed
+    def get_by_id(self, doc_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
-        Finds a single non-deleted document by its string ID.
+        Finds a single non-deleted document by its string ID, optionally with only the projected fields.
         Returns None if the document is not found or is marked as deleted.
         """
         try:
-            return self.collection.find_one({"_id": ObjectId(doc_id), "is_deleted": False})
+            return self.collection.find_one({"_id": ObjectId(doc_id), "is_deleted": False}, projection)
         except InvalidId:
             logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Invalid ObjectId format for doc_id: '{doc_id}'.")
             return None
@@ -61,6 +89,7 @@ class BaseRepo:
             logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error finding document by ID '{doc_id}': {e}")
             raise
 
+    @timed
     def get_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Finds the first non-deleted document that matches the query.
@@ -72,6 +101,7 @@ class BaseRepo:
             logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error finding one document with query '{query}': {e}")
             raise
 
+    @timed
     def get_all(self, query: Dict[str, Any] = {}) -> List[Dict[str, Any]]:
         """
         Finds all non-deleted documents that match the query.
@@ -83,15 +113,32 @@ class BaseRepo:
             logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error finding all documents with query '{query}': {e}")
             raise
 
+    @timed
+    def get_version(self, doc_id: str) -> Optional[int]:
+        """
+        Returns only the 'version' counter of a non-deleted document, without loading the document body.
+        Returns None if the document is not found or is marked as deleted.
+        """
+        try:
+            doc = self.collection.find_one({"_id": ObjectId(doc_id), "is_deleted": False}, {"version": 1})
+            return doc.get("version", 0) if doc else None
+        except InvalidId:
+            logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Invalid ObjectId format for doc_id: '{doc_id}'.")
+            return None
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error reading version of document '{doc_id}': {e}")
+            raise
+
+    @timed
     def update(self, doc_id: str, update_data: Dict[str, Any]) -> int:
         """
-        Updates a document by its string ID.
+        Updates a document by its string ID and increments its 'version' counter.
         Returns the number of documents modified.
         """
         try:
             result = self.collection.update_one(
                 {"_id": ObjectId(doc_id)}, 
-                {"$set": update_data}
+                {"$set": update_data, "$inc": {"version": 1}}
             )
             return result.modified_count
         except InvalidId:
@@ -104,10 +151,90 @@ class BaseRepo:
     def delete_soft(self, doc_id: str) -> int:
         """
         Soft-deletes a document by setting 'is_deleted' to True.
-        This is the standard, recommended way to delete.
+        This is the standard, recommended way to delete. The version is bumped via `update`.
         """
         return self.update(doc_id, {"is_deleted": True})
     
+    @timed
+    def delete_soft_batch(self, query: Dict[str, Any], batch_size: int) -> int:
+        """
+        Soft-deletes at most `batch_size` non-deleted documents matching the query.
+        Returns the number of documents deleted; 0 means nothing is left to delete.
+        Keeping each write bounded avoids long-running update_many calls on large collections.
+        """
+        try:
+            query = {**query, "is_deleted": False}
+            batch_ids = [doc["_id"] for doc in self.collection.find(query, {"_id": 1}).limit(batch_size)]
+            if not batch_ids:
+                return 0
+            result = self.collection.update_many(
+                {"_id": {"$in": batch_ids}, "is_deleted": False},
+                {"$set": {"is_deleted": True}, "$inc": {"version": 1}}
+            )
+            return result.modified_count
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error during batched soft delete with query '{query}': {e}")
+            raise
+
+    def iter_by_id(
+        self,
+        query: Dict[str, Any],
+        after_id: Optional[ObjectId] = None,
+        batch_size: int = 1000,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every non-deleted document matching the query in _id order, starting after `after_id`.
+        Only one cursor batch is held in memory. If the server reaps the cursor while a slow consumer
+        is busy, the scan transparently reopens from the last _id it yielded.
+        """
+        last_id = after_id
+        while True:
+            condition = {**query, "is_deleted": False}
+            if last_id is not None:
+                condition["_id"] = {"$gt": last_id}
+            cursor = self.collection.find(condition, projection).sort("_id", 1).batch_size(batch_size)
+            try:
+                for doc in cursor:
+                    last_id = doc["_id"]
+                    yield doc
+                return
+            except CursorNotFound:
+                logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Cursor expired while streaming '{self.collection.name}'; resuming after {last_id}.")
+            finally:
+                cursor.close()
+
+    @timed
+    def text_search(
+        self,
+        text: str,
+        query: Dict[str, Any],
+        limit: int,
+        after: Optional[Tuple[float, ObjectId]] = None,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs a $text search over the collection's text index, ranked by relevance.
+        Each result carries its relevance in '_score'. Results are ordered by (_score desc, _id asc),
+        and `after` is the (_score, _id) of the last result of the previous page.
+        """
+        try:
+            pipeline: List[Dict[str, Any]] = [
+                {"$match": {"$text": {"$search": text}, **query, "is_deleted": False}},
+                {"$addFields": {"_score": {"$meta": "textScore"}}},
+            ]
+            if after:
+                score, last_id = after
+                pipeline.append({"$match": {"$or": [{"_score": {"$lt": score}}, {"_score": score, "_id": {"$gt": last_id}}]}})
+            pipeline += [{"$sort": {"_score": -1, "_id": 1}}, {"$limit": limit}]
+            if projection:
+                pipeline.append({"$project": {**projection, "_score": 1}})
+            return list(self.collection.aggregate(pipeline))
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error during text search for '{text}': {e}")
+            raise
+
+    @timed
     def delete_hard(self, doc_id: str) -> int:
         """
         Permanently deletes a document from the database.
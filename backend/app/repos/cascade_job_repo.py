@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+from app.repos.base_repo import BaseRepo
+
+CASCADE_JOB_COLLECTION_NAME = "cascade_jobs"
+
+class CascadeJobRepo(BaseRepo):
+    """
+    Repository for background cascade jobs that soft-delete the data of a deleted project.
+    Jobs are claimed atomically, so several workers can drain the queue without doing the same job twice.
+    """
+    def __init__(self):
+        db = get_db()
+        super().__init__(collection=db.get_collection(CASCADE_JOB_COLLECTION_NAME))
+        self.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        self.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("created_at", DESCENDING)])
+
+    def enqueue(self, project_id: str, collections: list) -> str:
+        """Creates a pending cascade job for a project and returns its ID."""
+        now = datetime.utcnow()
+        job = {
+            "project_id": project_id,
+            "status": "pending",
+            "progress": {name: 0 for name in collections},
+            "error": None,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        return str(self.create(job))
+
+    def claim_next(self, stale_after_seconds: int) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claims the oldest pending job that is due (retries wait for their backoff), or a
+        running job whose worker stopped heart-beating.
+        Re-running a job is safe because every cascade step is an idempotent soft delete.
+        """
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {
+                "is_deleted": False,
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$not": {"$gt": now}}},
+                    {"status": "running", "updated_at": {"$lt": now - timedelta(seconds=stale_after_seconds)}}
+                ]
+            },
+            {"$set": {"status": "running", "started_at": now, "updated_at": now}, "$inc": {"version": 1}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def add_progress(self, job_id, collection_name: str, count: int):
+        """Adds to the processed-document counter of one collection and refreshes the heartbeat."""
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$inc": {f"progress.{collection_name}": count, "version": 1}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+
+    def finish(self, job_id):
+        """Marks a job as completed."""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "completed", "error": None, "finished_at": now, "updated_at": now}, "$inc": {"version": 1}}
+        )
+
+    def schedule_retry(self, job_id, attempts: int, error: str, next_attempt_at: datetime, give_up: bool):
+        """Records a failed attempt and either puts the job back to pending until `next_attempt_at` or fails it."""
+        now = datetime.utcnow()
+        fields: Dict[str, Any] = {"status": "failed" if give_up else "pending", "attempts": attempts, "error": error, "next_attempt_at": next_attempt_at, "updated_at": now}
+        if give_up:
+            fields["finished_at"] = now
+        self.collection.update_one({"_id": job_id}, {"$set": fields, "$inc": {"version": 1}})
+
+    def get_latest_for_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the most recent cascade job of a project."""
+        return self.collection.find_one({"project_id": project_id, "is_deleted": False}, sort=[("created_at", DESCENDING)])
+
+cascade_job_repo = lazy_resource("cascade_job_repo", CascadeJobRepo)
\ No newline at end of file
@@ -1,8 +1,10 @@
-from typing import List, Dict, Any
-from pymongo import ASCENDING
+from typing import List, Dict, Any, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT
+from bson import ObjectId
 
 from .base_repo import BaseRepo
 from ..core.db_connection import get_db
+from ..core.resources import lazy_resource
 
 CHAT_COLLECTION_NAME = "chat_history"
 
@@ -13,6 +15,10 @@ class ChatRepo(BaseRepo):
         db = get_db()
         chat_collection = db.get_collection(CHAT_COLLECTION_NAME)
         super().__init__(collection=chat_collection)
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING), ("created_at", ASCENDING)])
+        self.collection.create_index([("message", TEXT)], name="chat_text")
+        # Keyset scans in _id order (streaming exports).
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING), ("_id", ASCENDING)])
 
     def get_history_for_project_paginated(
         self, project_id: str, page: int = 1, limit: int = 50
@@ -26,3 +32,29 @@ class ChatRepo(BaseRepo):
         # Fetch documents, sort by timestamp, skip for pagination, and limit results
         cursor = self.collection.find(query).sort("created_at", ASCENDING).skip(skip_count).limit(limit)
         return list(cursor)
+
+    def get_recent_for_project(self, project_id: str, limit: int, projection: Optional[Dict[str, Any]] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches the latest messages of a project, newest first, optionally narrowed by `filters`.
+        """
+        query = {**(filters or {}), "project_id": project_id, "is_deleted": False}
+        return list(self.collection.find(query, projection).sort([("created_at", DESCENDING), ("_id", DESCENDING)]).limit(limit))
+
+    def get_after(self, project_id: str, after_id: Optional[ObjectId], limit: int, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches the messages of a project posted after `after_id` (from the start when None),
+        oldest first.
+        """
+        query = {"project_id": project_id, "is_deleted": False}
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        return list(self.collection.find(query, projection).sort("_id", ASCENDING).limit(limit))
+
+    def count_after(self, project_id: str, after_id: Optional[ObjectId]) -> int:
+        """Counts the messages of a project posted after `after_id` (all of them when None)."""
+        query = {"project_id": project_id, "is_deleted": False}
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        return self.collection.count_documents(query)
+
+chat_repo = lazy_resource("chat_repo", ChatRepo)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import logging
+import inspect
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from bson import ObjectId
+from pymongo import DESCENDING
+from pymongo.errors import PyMongoError
+
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+CHAT_SUMMARY_COLLECTION_NAME = "chat_summaries"
+
+
+class ChatSummaryRepo:
+    """
+    Repository for the rolling summary of each project's chat, one document per project keyed
+    by the project ID:
+
+        {"_id": project_id, "summary": str, "last_message_id": ObjectId | None,
+         "messages_covered": int, "pending_messages": int, "updated_at": datetime}
+
+    'last_message_id' is the newest message folded into the summary; 'pending_messages' counts
+    messages posted since, so the summarizer can find rooms that are due without scanning chats.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(CHAT_SUMMARY_COLLECTION_NAME)
+        self.collection.create_index([("pending_messages", DESCENDING)])
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": project_id})
+
+    def record_message(self, project_id: str):
+        """Counts a new message of a project towards its next summary update."""
+        try:
+            self.collection.update_one(
+                {"_id": project_id},
+                {"$inc": {"pending_messages": 1}, "$setOnInsert": {"summary": "", "last_message_id": None, "messages_covered": 0}},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            # The count is derived data, recounted when the summary is next updated: the message is already stored, so this must not fail the send.
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error counting a message for the summary of project '{project_id}': {e}")
+
+    def find_due(self, min_pending: int, limit: int) -> List[Dict[str, Any]]:
+        """Returns the summaries with at least `min_pending` new messages, busiest rooms first."""
+        return list(self.collection.find({"pending_messages": {"$gte": min_pending}}).sort("pending_messages", DESCENDING).limit(limit))
+
+    def advance(self, project_id: str, expected_last_message_id: Optional[ObjectId], summary: str, last_message_id: ObjectId, covered: int, pending: int) -> bool:
+        """
+        Replaces the summary with one extended up to `last_message_id`, with `pending` messages
+        counted after it. Only applies if no other update moved the summary past
+        `expected_last_message_id` in the meantime.
+        """
+        result = self.collection.update_one(
+            {"_id": project_id, "last_message_id": expected_last_message_id},
+            {
+                "$set": {"summary": summary, "last_message_id": last_message_id, "pending_messages": pending, "updated_at": datetime.utcnow()},
+                "$inc": {"messages_covered": covered},
+            },
+        )
+        return result.modified_count > 0
+
+    def set_pending(self, project_id: str, pending: int):
+        """Corrects the pending count from a real count, e.g. after messages of the span were deleted."""
+        self.collection.update_one({"_id": project_id}, {"$set": {"pending_messages": pending}})
+
+    def delete(self, project_id: str):
+        self.collection.delete_one({"_id": project_id})
+
+chat_summary_repo = lazy_resource("chat_summary_repo", ChatSummaryRepo)
\ No newline at end of file
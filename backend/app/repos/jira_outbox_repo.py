@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+from app.repos.base_repo import BaseRepo
+
+JIRA_OUTBOX_COLLECTION_NAME = "jira_outbox"
+
+class JiraOutboxRepo(BaseRepo):
+    """
+    Repository for the Jira outbox: pending Jira operations recorded alongside local writes
+    and drained by a background worker. Each entry has a unique idempotency key, so the
+    same operation is never recorded twice.
+    """
+    def __init__(self):
+        db = get_db()
+        super().__init__(collection=db.get_collection(JIRA_OUTBOX_COLLECTION_NAME))
+        self.collection.create_index([("idempotency_key", ASCENDING)], unique=True)
+        self.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("operation", ASCENDING)])
+
+    def record(self, operation: str, project_id: str, payload: Dict[str, Any], idempotency_key: str) -> Optional[str]:
+        """
+        Records a pending operation. Returns the entry ID, or None if an entry with the
+        same idempotency key already exists.
+        """
+        now = datetime.utcnow()
+        entry = {
+            "operation": operation,
+            "project_id": project_id,
+            "payload": payload,
+            "idempotency_key": idempotency_key,
+            "status": "pending",
+            "attempts": 0,
+            "last_error": None,
+            "next_attempt_at": now,
+            "lease_until": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        try:
+            return str(self.create(entry))
+        except DuplicateKeyError:
+            return None
+
+    def claim_next(self, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claims the oldest entry that is due, leasing it to the caller.
+        Entries whose lease expired (crashed worker) become claimable again.
+        """
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {
+                "is_deleted": False,
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "processing", "lease_until": {"$lt": now}}
+                ]
+            },
+            {"$set": {"status": "processing", "lease_until": now + timedelta(seconds=lease_seconds), "updated_at": now}, "$inc": {"version": 1}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def mark_done(self, entry_id, status: str = "done"):
+        """Marks an entry as finished ('done' or 'cancelled')."""
+        self.collection.update_one(
+            {"_id": entry_id},
+            {"$set": {"status": status, "lease_until": None, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+
+    def schedule_retry(self, entry_id, attempts: int, error: str, next_attempt_at: datetime, dead: bool):
+        """Records a failed attempt and either schedules the next one or gives up."""
+        self.collection.update_one(
+            {"_id": entry_id},
+            {
+                "$set": {
+                    "status": "dead" if dead else "pending",
+                    "attempts": attempts,
+                    "last_error": error,
+                    "next_attempt_at": next_attempt_at,
+                    "lease_until": None,
+                    "updated_at": datetime.utcnow()
+                },
+                "$inc": {"version": 1}
+            }
+        )
+
+    def cancel_pending(self, project_id: str, operation: str) -> int:
+        """Cancels not-yet-processed entries of a project for the given operation."""
+        result = self.collection.update_many(
+            {"project_id": project_id, "operation": operation, "status": "pending", "is_deleted": False},
+            {"$set": {"status": "cancelled", "updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+        return result.modified_count
+
+jira_outbox_repo = lazy_resource("jira_outbox_repo", JiraOutboxRepo)
\ No newline at end of file
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from pymongo import ReturnDocument
+
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+JIRA_SYNC_COLLECTION_NAME = "jira_sync_state"
+
+class JiraSyncRepo:
+    """
+    Repository for per-project Jira task sync state, keyed by project ID.
+    Holds the pull watermark (the newest Jira 'updated' timestamp applied) and a lease,
+    so only one worker syncs a given project at a time.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(JIRA_SYNC_COLLECTION_NAME)
+
+    def claim(self, project_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """Leases a project for syncing. Returns its state, or None if another worker holds the lease."""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": project_id},
+            {"$setOnInsert": {"watermark": None, "lease_until": None, "last_synced_at": None, "last_error": None}},
+            upsert=True
+        )
+        return self.collection.find_one_and_update(
+            {"_id": project_id, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"lease_until": now + timedelta(seconds=lease_seconds)}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def release(self, project_id: str, watermark: Optional[datetime], error: Optional[str] = None):
+        """Stores the new watermark and outcome, and releases the lease."""
+        update = {"lease_until": None, "last_synced_at": datetime.utcnow(), "last_error": error}
+        if watermark is not None:
+            update["watermark"] = watermark
+        self.collection.update_one({"_id": project_id}, {"$set": update})
+
+jira_sync_repo = lazy_resource("jira_sync_repo", JiraSyncRepo)
\ No newline at end of file
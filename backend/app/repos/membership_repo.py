@@ -0,0 +1,132 @@
+import logging
+import inspect
+from datetime import datetime
+from typing import List, Iterable, Tuple, FrozenSet
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+from app.repos.base_repo import BaseRepo
+from app.utils.cache import TTLCache
+
+MEMBERSHIP_COLLECTION_NAME = "project_memberships"
+
+class MembershipRepo(BaseRepo):
+    """
+    Repository for the materialized user -> projects membership index.
+    One document per (user_id, project_id) pair, kept in sync with the 'created_by'
+    and 'members' fields of the Projects collection so that listing a user's projects
+    is a single indexed lookup instead of an $or scan over Projects.
+
+    Membership checks are served from a per-user TTL cache, invalidated by every write made
+    through this repository.
+    """
+    def __init__(self):
+        db = get_db()
+        super().__init__(collection=db.get_collection(MEMBERSHIP_COLLECTION_NAME))
+        self.collection.create_index([("user_id", ASCENDING), ("project_id", ASCENDING)], unique=True)
+        self.collection.create_index([("user_id", ASCENDING), ("is_deleted", ASCENDING), ("project_id", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING)])
+        self._project_ids_cache = TTLCache(settings.MEMBERSHIP_CACHE_MAX_USERS, settings.MEMBERSHIP_CACHE_TTL_SECONDS)
+
+    def add(self, project_id: str, user_id: str, role: str = "member") -> None:
+        """Adds (or revives) a membership. Re-adding an existing member is a no-op apart from the role."""
+        try:
+            self.collection.update_one(
+                {"user_id": user_id, "project_id": project_id},
+                {
+                    "$set": {"role": role, "is_deleted": False},
+                    "$setOnInsert": {"joined_at": datetime.utcnow()},
+                    "$inc": {"version": 1}
+                },
+                upsert=True
+            )
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error adding membership of user '{user_id}' to project '{project_id}': {e}")
+            raise
+        finally:
+            self._project_ids_cache.invalidate(user_id)
+
+    def remove(self, project_id: str, user_id: str) -> int:
+        """Soft-deletes a single membership."""
+        result = self.collection.update_many(
+            {"user_id": user_id, "project_id": project_id, "is_deleted": False},
+            {"$set": {"is_deleted": True}, "$inc": {"version": 1}}
+        )
+        self._project_ids_cache.invalidate(user_id)
+        return result.modified_count
+
+    def remove_project(self, project_id: str) -> int:
+        """Soft-deletes every membership of a project."""
+        user_ids = self.get_member_ids(project_id)
+        result = self.collection.update_many(
+            {"project_id": project_id, "is_deleted": False},
+            {"$set": {"is_deleted": True}, "$inc": {"version": 1}}
+        )
+        self._project_ids_cache.invalidate(*user_ids)
+        return result.modified_count
+
+    def get_member_ids(self, project_id: str) -> List[str]:
+        """Returns the IDs of every user of a project, creator included."""
+        cursor = self.collection.find({"project_id": project_id, "is_deleted": False}, {"user_id": 1, "_id": 0})
+        return [doc["user_id"] for doc in cursor]
+
+    def get_project_ids_for_user(self, user_id: str) -> List[str]:
+        """Returns the IDs of all projects a user belongs to, served from the (user_id, is_deleted, project_id) index."""
+        cursor = self.collection.find({"user_id": user_id, "is_deleted": False}, {"project_id": 1, "_id": 0})
+        return [doc["project_id"] for doc in cursor]
+
+    def get_project_id_set(self, user_id: str) -> FrozenSet[str]:
+        """Cached variant of `get_project_ids_for_user`, for hot-path membership checks."""
+        project_ids = self._project_ids_cache.get(user_id)
+        if project_ids is None:
+            project_ids = frozenset(self.get_project_ids_for_user(user_id))
+            self._project_ids_cache.set(user_id, project_ids)
+        return project_ids
+
+    def is_member(self, project_id: str, user_id: str) -> bool:
+        """Returns True if the user created or belongs to the project. Served from the cache."""
+        return project_id in self.get_project_id_set(user_id)
+
+    def count_for_user(self, user_id: str) -> int:
+        """Counts the projects a user belongs to."""
+        return self.collection.count_documents({"user_id": user_id, "is_deleted": False})
+
+    def get_all_pairs(self) -> Iterable[Tuple[str, str, str, int]]:
+        """Yields (project_id, user_id, role, version) for every live membership. Used by reconciliation."""
+        cursor = self.collection.find({"is_deleted": False}, {"project_id": 1, "user_id": 1, "role": 1, "version": 1, "_id": 0})
+        for doc in cursor:
+            yield doc["project_id"], doc["user_id"], doc.get("role", "member"), doc.get("version", 0)
+
+    def apply_repairs(self, to_add: List[Tuple[str, str, str]], to_remove: List[Tuple[str, str, int]]) -> int:
+        """
+        Applies reconciliation repairs in a single unordered bulk write.
+        A removal only applies if the membership is still at the version it was read at, so one
+        written concurrently (e.g. a member re-added during the run) is left alone.
+        """
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "project_id": project_id},
+                {"$set": {"role": role, "is_deleted": False}, "$setOnInsert": {"joined_at": now}, "$inc": {"version": 1}},
+                upsert=True
+            )
+            for project_id, user_id, role in to_add
+        ]
+        operations += [
+            UpdateOne(
+                {"user_id": user_id, "project_id": project_id, "is_deleted": False, "version": version},
+                {"$set": {"is_deleted": True}, "$inc": {"version": 1}}
+            )
+            for project_id, user_id, version in to_remove
+        ]
+        if not operations:
+            return 0
+        result = self.collection.bulk_write(operations, ordered=False)
+        self._project_ids_cache.invalidate(*{user_id for _, user_id, _ in to_add}, *{user_id for _, user_id, _ in to_remove})
+        return result.modified_count + result.upserted_count
+
+membership_repo = lazy_resource("membership_repo", MembershipRepo)
\ No newline at end of file
@@ -1,31 +1,74 @@
+from pymongo import ASCENDING, DESCENDING
 from pymongo.collection import Collection
 from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
 from typing import Optional, Dict, Any, List
 
 from app.repos.base_repo import BaseRepo
+from app.repos.version_repo import version_repo, user_notifications_scope
 
 class NotificationRepo(BaseRepo):
     """Repository for managing notification documents."""
     def __init__(self):
         db = get_db()
         super().__init__(collection=db.get_collection("notifications"))
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING)])
+        self.collection.create_index([("user_id", ASCENDING), ("is_deleted", ASCENDING), ("_id", DESCENDING)])
+
+    def create(self, data: Dict[str, Any]):
+        """Creates a notification and bumps the version of the recipient's notification list."""
+        inserted_id = super().create(data)
+        version_repo.bump(user_notifications_scope(data["user_id"]))
+        return inserted_id
+
+    def create_many(self, data_list: List[Dict[str, Any]]) -> int:
+        """Creates notifications in one insert and bumps the list version of every recipient once."""
+        inserted_count = super().create_many(data_list)
+        for user_id in {data["user_id"] for data in data_list}:
+            version_repo.bump(user_notifications_scope(user_id))
+        return inserted_count
+
+    def get_list_version(self, user_id: str) -> int:
+        """Returns the version of a user's notification list without reading the notifications."""
+        return version_repo.get(user_notifications_scope(user_id))
 
     def get_by_user_id(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Finds all notifications for a given user, sorted by most recent."""
-        query = {"user_id": user_id}
+        query = {"user_id": user_id, "is_deleted": False}
         # Sort by _id descending to get the most recent notifications
-        return list(self.collection.find(query, {"is_deleted": False}).sort("_id", -1).limit(limit))
+        return list(self.collection.find(query).sort("_id", -1).limit(limit))
+
+    def delete_soft_batch(self, query: Dict[str, Any], batch_size: int) -> int:
+        """
+        Soft-deletes a bounded batch of notifications and bumps the list version of every affected user.
+        """
+        query = {**query, "is_deleted": False}
+        batch = list(self.collection.find(query, {"_id": 1, "user_id": 1}).limit(batch_size))
+        if not batch:
+            return 0
+        result = self.collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}, "is_deleted": False},
+            {"$set": {"is_deleted": True}, "$inc": {"version": 1}}
+        )
+        for user_id in {doc["user_id"] for doc in batch}:
+            version_repo.bump(user_notifications_scope(user_id))
+        return result.modified_count
 
-    def mark_as_read(self, notification_id: str) -> int:
+    def mark_as_read(self, notification_id: str, user_id: str) -> int:
         """Marks a single notification as read."""
-        return self.update(notification_id, {"status": "read"})
+        modified_count = self.update(notification_id, {"status": "read"})
+        if modified_count > 0:
+            version_repo.bump(user_notifications_scope(user_id))
+        return modified_count
 
     def mark_all_as_read_for_user(self, user_id: str) -> int:
         """Marks all unread notifications for a user as read."""
         result = self.collection.update_many(
             {"user_id": user_id, "status": "unread", "is_deleted": False},
-            {"$set": {"status": "read"}}
+            {"$set": {"status": "read"}, "$inc": {"version": 1}}
         )
+        if result.modified_count > 0:
+            version_repo.bump(user_notifications_scope(user_id))
         return result.modified_count
 
-notification_repo = NotificationRepo()
\ No newline at end of file
+notification_repo = lazy_resource("notification_repo", NotificationRepo)
\ No newline at end of file
@@ -1,10 +1,13 @@
 from pymongo.collection import Collection
 from pymongo.results import UpdateResult
-from typing import Dict, Any, Optional
+from pymongo import TEXT
+from typing import Dict, Any, Optional, List, Tuple, Iterable
 from bson import ObjectId
 
 from app.repos.base_repo import BaseRepo
 from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+from app.repos.membership_repo import membership_repo
 
 # Assuming project_repo is an instance of ProjectRepo and configured correctly.
 # project_repo = ProjectRepo(collection=db.projects)
@@ -16,6 +19,8 @@ class ProjectRepo(BaseRepo):
     def __init__(self):
         db = get_db()
         super().__init__(collection=db.get_collection("Projects"))
+        # Full-text search; a name match ranks above a description match.
+        self.collection.create_index([("project_name", TEXT), ("description", TEXT)], weights={"project_name": 3}, name="project_text")
 
     def get_by_name(self, project_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -23,6 +28,50 @@ class ProjectRepo(BaseRepo):
         """
         return self.get_one({"project_name": project_name})
 
+    def get_by_id_including_deleted(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Finds a project by its ID regardless of its 'is_deleted' flag.
+        Background workers use this to act on projects that were deleted after work was queued.
+        """
+        if not ObjectId.is_valid(project_id):
+            return None
+        return self.collection.find_one({"_id": ObjectId(project_id)})
+
+    def get_by_ids(self, project_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Finds all non-deleted projects whose _id is in the given list.
+        Invalid IDs are skipped.
+        """
+        object_ids = [ObjectId(pid) for pid in project_ids if ObjectId.is_valid(pid)]
+        if not object_ids:
+            return []
+        return self.get_all({"_id": {"$in": object_ids}})
+
+    def get_versions_for_user(self, user_id: str) -> List[Tuple[str, int]]:
+        """
+        Returns (project_id, version) pairs for every project the user created or belongs to.
+        Only the '_id' and 'version' fields are read, so this is cheap enough to run on every poll.
+        """
+        object_ids = [ObjectId(pid) for pid in membership_repo.get_project_ids_for_user(user_id) if ObjectId.is_valid(pid)]
+        if not object_ids:
+            return []
+        cursor = self.collection.find({"_id": {"$in": object_ids}, "is_deleted": False}, {"version": 1}).sort("_id", 1)
+        return [(str(doc["_id"]), doc.get("version", 0)) for doc in cursor]
+
+    def iter_membership_sources(self) -> Iterable[Tuple[str, str, List[str]]]:
+        """
+        Yields (project_id, created_by, members) for every non-deleted project.
+        This is the source of truth the membership index is reconciled against.
+        """
+        cursor = self.collection.find({"is_deleted": False}, {"created_by": 1, "members": 1})
+        for doc in cursor:
+            yield str(doc["_id"]), doc.get("created_by"), doc.get("members", [])
+
+    def get_jira_linked(self) -> List[Tuple[str, str]]:
+        """Returns (project_id, jira_project_key) pairs for every non-deleted project mirrored to Jira."""
+        cursor = self.collection.find({"is_deleted": False, "jira_project_key": {"$nin": [None, ""]}}, {"jira_project_key": 1})
+        return [(str(doc["_id"]), doc["jira_project_key"]) for doc in cursor]
+
     def _add_mem_to_proj(self, item_id: str, update_data: Dict[str, Any]) -> int:
         """
         CORRECT IMPLEMENTATION using update_one.
@@ -37,10 +86,11 @@ class ProjectRepo(BaseRepo):
     def add_member(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Adds a member to a project's members list using $addToSet to avoid duplicates."""
         # Use the update method from BaseRepo, which handles ObjectId conversion.
-        update_data = {"$addToSet": {"members": user_id}}
+        update_data = {"$addToSet": {"members": user_id}, "$inc": {"version": 1}}
         modified_count = self._add_mem_to_proj(project_id, update_data)
 
         if modified_count > 0:
+            membership_repo.add(project_id, user_id)
             # If successful, fetch the updated document using the reliable get_by_id.
             return self.get_by_id(project_id)
         return None
@@ -57,12 +107,16 @@ class ProjectRepo(BaseRepo):
 
     def remove_member(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Removes a member from a project's members list using $pull."""
-        update_data = {"$pull": {"members": user_id}}
+        update_data = {"$pull": {"members": user_id}, "$inc": {"version": 1}}
         modified_count = self._remove_mem_from_proj(project_id, update_data)
 
         if modified_count > 0:
             # If successful, fetch the updated document.
-            return self.get_by_id(project_id)
+            updated_doc = self.get_by_id(project_id)
+            # The creator keeps access to the project even if they were also listed as a member.
+            if updated_doc and updated_doc.get("created_by") != user_id:
+                membership_repo.remove(project_id, user_id)
+            return updated_doc
         return None
 
-project_repo=ProjectRepo()
+project_repo = lazy_resource("project_repo", ProjectRepo)
\ No newline at end of file
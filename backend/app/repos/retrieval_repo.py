@@ -0,0 +1,73 @@
+import logging
+import inspect
+from datetime import datetime
+from typing import Dict, Any, List
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+RETRIEVAL_COLLECTION_NAME = "retrieval_vectors"
+BACKFILL_COLLECTION_NAME = "retrieval_backfills"
+
+
+class RetrievalRepo:
+    """
+    Repository for the hashed term vectors of the retrieval index, one document per indexed item:
+
+        {"_id": "<kind>:<item_id>", "project_id": str, "kind": "task" | "chat", "item_id": str,
+         "label": str, "indices": bytes, "counts": bytes, "updated_at": datetime}
+
+    'indices' and 'counts' are the raw bytes of int32 / float32 NumPy arrays holding the hashed
+    term buckets of the item and their term frequencies.
+
+    A project whose existing items were indexed has a marker in a second collection,
+    {"_id": project_id, "backfilled_at": datetime}.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(RETRIEVAL_COLLECTION_NAME)
+        self.collection.create_index([("project_id", ASCENDING)])
+        self.backfills = db.get_collection(BACKFILL_COLLECTION_NAME)
+
+    def upsert_many(self, docs: List[Dict[str, Any]], only_missing: bool = False) -> bool:
+        """
+        Writes the vectors of several items in one round trip. Returns False if the write failed.
+
+        :param only_missing: Leave items that already have a vector untouched (used by the backfill,
+            so it never overwrites a vector written by a newer edit).
+        """
+        if not docs:
+            return True
+        now = datetime.utcnow()
+        operator = "$setOnInsert" if only_missing else "$set"
+        try:
+            self.collection.bulk_write([UpdateOne({"_id": doc["_id"]}, {operator: {**doc, "updated_at": now}}, upsert=True) for doc in docs], ordered=False)
+            return True
+        except PyMongoError as e:
+            # The index is derived data, written after the task or message itself: a failed write must not fail the request.
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error writing {len(docs)} retrieval vectors: {e}")
+            return False
+
+    def delete(self, doc_id: str):
+        try:
+            self.collection.delete_one({"_id": doc_id})
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error deleting retrieval vector '{doc_id}': {e}")
+
+    def delete_for_project(self, project_id: str) -> int:
+        self.backfills.delete_one({"_id": project_id})
+        return self.collection.delete_many({"project_id": project_id}).deleted_count
+
+    def is_backfilled(self, project_id: str) -> bool:
+        return self.backfills.count_documents({"_id": project_id}, limit=1) > 0
+
+    def mark_backfilled(self, project_id: str):
+        self.backfills.update_one({"_id": project_id}, {"$setOnInsert": {"backfilled_at": datetime.utcnow()}}, upsert=True)
+
+    def get_for_project(self, project_id: str) -> List[Dict[str, Any]]:
+        return list(self.collection.find({"project_id": project_id}, {"kind": 1, "item_id": 1, "label": 1, "indices": 1, "counts": 1}).sort("_id", ASCENDING))
+
+retrieval_repo = lazy_resource("retrieval_repo", RetrievalRepo)
\ No newline at end of file
@@ -0,0 +1,72 @@
+import logging
+import inspect
+from typing import Dict, Any, List
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+STATS_COUNTER_COLLECTION_NAME = "stat_counters"
+GLOBAL_STATS_SCOPE = "global"
+
+
+def user_stats_scope(user_id: str) -> str:
+    """Scope key for the counters of tasks assigned to a single user."""
+    return f"user:{user_id}"
+
+
+class StatsCounterRepo:
+    """
+    Repository for pre-aggregated statistics counters.
+    Each document is keyed by a scope string ('global', 'user:<id>') and holds
+    numeric fields that writers adjust with $inc, so stats endpoints read a single document
+    instead of counting whole collections.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(STATS_COUNTER_COLLECTION_NAME)
+
+    def increment(self, deltas: Dict[str, Dict[str, int]]) -> None:
+        """
+        Atomically applies counter deltas to several scopes in one unordered bulk write.
+
+        :param deltas: scope -> {field path: delta}; zero deltas are skipped.
+        """
+        operations = []
+        for scope, fields in deltas.items():
+            fields = {field: delta for field, delta in fields.items() if delta}
+            if fields:
+                operations.append(UpdateOne({"_id": scope}, {"$inc": fields}, upsert=True))
+        if not operations:
+            return
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            # Counters are corrected by the periodic reconciliation, so a failed increment must not fail the request.
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error updating stat counters {list(deltas)}: {e}")
+
+    def get(self, scope: str) -> Dict[str, Any]:
+        """Returns the counters of a scope, or an empty dict if nothing was counted yet."""
+        return self.collection.find_one({"_id": scope}, {"_id": 0}) or {}
+
+    def get_all_scopes(self) -> List[str]:
+        """Returns every scope that has counters."""
+        return [doc["_id"] for doc in self.collection.find({}, {"_id": 1})]
+
+    def replace_all(self, counters: Dict[str, Dict[str, Any]]) -> int:
+        """Overwrites the counters of the given scopes with freshly computed values. Used by reconciliation."""
+        operations = [ReplaceOne({"_id": scope}, values, upsert=True) for scope, values in counters.items()]
+        if not operations:
+            return 0
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    def delete_scopes(self, scopes: List[str]) -> int:
+        """Deletes the counters of scopes that are no longer maintained."""
+        if not scopes:
+            return 0
+        return self.collection.delete_many({"_id": {"$in": scopes}}).deleted_count
+
+stats_counter_repo = lazy_resource("stats_counter_repo", StatsCounterRepo)
\ No newline at end of file
@@ -1,10 +1,33 @@
 from pymongo.collection import Collection
 from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne, ReturnDocument
 from bson import ObjectId
+from bson.errors import InvalidId
 
 from app.repos.base_repo import BaseRepo
+from app.models.task_model import TaskStatus
+from app.repos.version_repo import version_repo, project_tasks_scope
+
+# Fields a project task list may be sorted on. Anything else is rejected before it reaches Mongo.
+SORTABLE_FIELDS = ("due_date", "created_at", "updated_at", "title", "status")
+
+def _set_completed_at(data: Dict[str, Any], moment: Optional[datetime]):
+    """Stamps when a task was completed (for throughput analytics), or clears it when it is reopened."""
+    data["completed_at"] = (moment or datetime.utcnow()) if data.get("status") == TaskStatus.DONE else None
+
+def _completed_at_update(status: str, moment: datetime) -> Dict[str, Any]:
+    """
+    Aggregation expression for 'completed_at' when a task is saved with `status`: stamped only if
+    the task moves to Done, kept if it already was Done (clients often re-send the whole form),
+    cleared otherwise.
+    """
+    if status != TaskStatus.DONE:
+        return {"$literal": None}
+    return {"$cond": [{"$eq": ["$status", TaskStatus.DONE.value]}, "$completed_at", moment]}
+
 
 class TaskRepo(BaseRepo):
     """
@@ -13,6 +36,29 @@ class TaskRepo(BaseRepo):
     def __init__(self):
         db = get_db()
         super().__init__(collection=db.get_collection("Tasks"))
+        self._ensure_indexes()
+
+    def _ensure_indexes(self):
+        """
+        Creates the compound indexes used by the project task list.
+        One index per allowed sort field keeps filtered, sorted pages index-backed;
+        create_index is a no-op when the index already exists.
+        """
+        for field in SORTABLE_FIELDS:
+            self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING), (field, ASCENDING), ("_id", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING), ("assignee", ASCENDING), ("due_date", ASCENDING)])
+        # Keyset scans in _id order (streaming exports).
+        self.collection.create_index([("project_id", ASCENDING), ("is_deleted", ASCENDING), ("_id", ASCENDING)])
+        # Full-text search; a title match ranks above a description match.
+        self.collection.create_index([("title", TEXT), ("description", TEXT)], weights={"title": 3}, name="task_text")
+        # Due-date reminders: range scans over upcoming deadlines.
+        self.collection.create_index([("is_deleted", ASCENDING), ("due_date", ASCENDING)])
+        # Jira sync: find unpushed changes and map pulled issues back to tasks.
+        self.collection.create_index([("project_id", ASCENDING), ("jira_dirty", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("jira_issue_key", ASCENDING)])
+        # Daily rollup backfill: tasks created or completed in the last days.
+        self.collection.create_index([("created_at", ASCENDING)])
+        self.collection.create_index([("completed_at", ASCENDING)])
 
     def get_by_project_id(self, project_id: str) -> List[Dict[str, Any]]:
         """
@@ -21,6 +67,45 @@ class TaskRepo(BaseRepo):
         """
         return self.get_all({"project_id": project_id})
 
+    def find_page_for_project(
+        self,
+        project_id: str,
+        filters: Dict[str, Any],
+        sort_field: str = "created_at",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, ObjectId]] = None,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds one page of a project's non-deleted tasks using keyset pagination.
+
+        :param filters: Additional Mongo conditions, combined with AND.
+        :param sort_field: One of SORTABLE_FIELDS. Ties are broken by _id.
+        :param limit: Maximum number of documents to return, or None for all.
+        :param after: The (sort value, _id) of the last document of the previous page.
+        :param projection: Fields to return, or None for whole documents.
+        """
+        if sort_field not in SORTABLE_FIELDS:
+            raise ValueError(f"Sorting by '{sort_field}' is not allowed.")
+
+        conditions = [{"project_id": project_id, "is_deleted": False}]
+        if filters:
+            conditions.append(filters)
+        if after is not None:
+            last_value, last_id = after
+            op = "$lt" if descending else "$gt"
+            conditions.append({"$or": [
+                {sort_field: {op: last_value}},
+                {sort_field: last_value, "_id": {op: last_id}}
+            ]})
+
+        direction = DESCENDING if descending else ASCENDING
+        cursor = self.collection.find({"$and": conditions}, projection).sort([(sort_field, direction), ("_id", direction)])
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
     def get_by_id(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         Finds a single task by its ID using the inherited method.
@@ -30,27 +115,186 @@ class TaskRepo(BaseRepo):
     def create_task(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Creates a new task document and returns the created document.
+        Bumps the version of the project's task list and flags the task for Jira sync.
         """
+        data["jira_dirty"] = True
+        _set_completed_at(data, data.get("created_at"))
         inserted_id = self.create(data)
         if inserted_id:
+            version_repo.bump(project_tasks_scope(data["project_id"]))
             return self.get_by_id(str(inserted_id))
         return None
 
-    def update_task(self, task_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def create_tasks(self, data_list: List[Dict[str, Any]]) -> List[ObjectId]:
         """
-        Updates a task by its ID and returns the updated document.
+        Inserts many tasks of one project with a single insert_many and returns their IDs, in order.
+        Bumps the version of the project's task list once and flags the tasks for Jira sync.
         """
-        modified_count = self.update(task_id, update_data)
-        if modified_count > 0:
-            return self.get_by_id(task_id)
-        return None
+        if not data_list:
+            return []
+        for data in data_list:
+            data["jira_dirty"] = True
+            _set_completed_at(data, data.get("created_at"))
+        # insert_many sets the '_id' of each document in place.
+        self.create_many(data_list)
+        version_repo.bump(project_tasks_scope(data_list[0]["project_id"]))
+        return [data["_id"] for data in data_list]
 
+    def iter_for_project(self, project_id: str, projection: Dict[str, Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the non-deleted tasks of a project in creation order, holding one cursor batch in memory at a time.
+        """
+        cursor = self.collection.find({"project_id": project_id, "is_deleted": False}, projection).sort("_id", ASCENDING).batch_size(batch_size)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def iter_for_projects(self, project_ids: List[str], projection: Dict[str, Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the non-deleted tasks of several projects through one projected cursor.
+        """
+        cursor = self.collection.find({"project_id": {"$in": project_ids}, "is_deleted": False}, projection).batch_size(batch_size)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
 
-    def delete_task(self, task_id: str) -> bool:
+    def update_task(
+        self,
+        task_id: str,
+        update_data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        allowed_project_ids: Optional[Iterable[str]] = None
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
         """
-        Soft deletes a task by its ID.
+        Updates a task by its ID in a single conditional find_one_and_update.
+        Bumps the version of the project's task list and flags the task for Jira sync.
+        A new due date re-arms the due-date reminder.
+
+        :param expected_version: Only update if the task is still at this version.
+        :param allowed_project_ids: Only update if the task belongs to one of these projects
+            (used to check a new assignee's membership inside the same write).
+        :return: The (previous, updated) documents, or None if the task is missing or a condition did not hold.
+        """
+        update_data = {**update_data, "jira_dirty": True}
+        if "due_date" in update_data:
+            update_data["reminder_sent"] = False
+        try:
+            condition: Dict[str, Any] = {"_id": ObjectId(task_id), "is_deleted": False}
+        except InvalidId:
+            return None
+        if expected_version is not None:
+            condition["version"] = expected_version
+        if allowed_project_ids is not None:
+            condition["project_id"] = {"$in": list(allowed_project_ids)}
+
+        # An update pipeline, so 'completed_at' can depend on the status the task had before.
+        # Values are wrapped in $literal, as strings starting with '$' would read as field paths.
+        pipeline: List[Dict[str, Any]] = []
+        completed_moment = update_data.get("updated_at") or datetime.utcnow()
+        if "status" in update_data:
+            pipeline.append({"$set": {"completed_at": _completed_at_update(update_data["status"], completed_moment)}})
+        pipeline.append({"$set": {
+            **{field: {"$literal": value} for field, value in update_data.items()},
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+        }})
+
+        # The previous document is returned so callers can see what changed; the updated one is
+        # derived from it rather than read again.
+        previous_doc = self.collection.find_one_and_update(condition, pipeline, return_document=ReturnDocument.BEFORE)
+        if not previous_doc:
+            return None
+        version_repo.bump(project_tasks_scope(previous_doc["project_id"]))
+        updated_doc = {**previous_doc, **update_data, "version": previous_doc.get("version", 0) + 1}
+        if "status" in update_data:
+            was_done = previous_doc.get("status") == TaskStatus.DONE.value
+            updated_doc["completed_at"] = (previous_doc.get("completed_at") if was_done else completed_moment) if update_data["status"] == TaskStatus.DONE else None
+        return previous_doc, updated_doc
+
+    def delete_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Soft deletes a task by its ID and bumps the version of the project's task list.
+        Returns the project_id, assignee and status of the deleted task, or None if nothing was deleted.
+        """
+        try:
+            deleted_doc = self.collection.find_one_and_update(
+                {"_id": ObjectId(task_id), "is_deleted": False},
+                {"$set": {"is_deleted": True, "jira_dirty": True}, "$inc": {"version": 1}},
+                projection={"project_id": 1, "assignee": 1, "status": 1}
+            )
+        except InvalidId:
+            return None
+        if not deleted_doc:
+            return None
+        version_repo.bump(project_tasks_scope(deleted_doc["project_id"]))
+        return deleted_doc
+
+    def get_due_between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        Finds open, not-yet-reminded tasks due in [start, end), reading only what the reminder
+        scheduler needs. Served by the (is_deleted, due_date) index.
+        """
+        query = {
+            "is_deleted": False,
+            "due_date": {"$gte": start, "$lt": end},
+            "status": {"$ne": TaskStatus.DONE.value},
+            "reminder_sent": {"$ne": True}
+        }
+        return list(self.collection.find(query, {"due_date": 1}))
+
+    def claim_reminders(self, task_ids: List[ObjectId], due_before: datetime, claim_token: str) -> List[Dict[str, Any]]:
+        """
+        Atomically marks the reminders of the given tasks as sent and returns the tasks this caller won.
+        Tasks that were completed, deleted, moved out of range or claimed by another worker are skipped,
+        so concurrent schedulers never send the same reminder twice.
+        """
+        self.collection.update_many(
+            {
+                "_id": {"$in": task_ids},
+                "is_deleted": False,
+                "due_date": {"$lt": due_before},
+                "status": {"$ne": TaskStatus.DONE.value},
+                "reminder_sent": {"$ne": True}
+            },
+            {"$set": {"reminder_sent": True, "reminder_claim": claim_token}}
+        )
+        projection = {"title": 1, "assignee": 1, "project_id": 1, "due_date": 1}
+        return list(self.collection.find({"_id": {"$in": task_ids}, "reminder_claim": claim_token}, projection))
+
+    def get_jira_dirty(self, project_id: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Finds tasks of a project with changes not yet pushed to Jira, including soft-deleted ones
+        so their issues can be removed.
+        """
+        return list(self.collection.find({"project_id": project_id, "jira_dirty": True}).limit(limit))
+
+    def get_by_jira_keys(self, project_id: str, issue_keys: List[str]) -> List[Dict[str, Any]]:
+        """Finds the non-deleted tasks of a project linked to the given Jira issue keys."""
+        return list(self.collection.find({"project_id": project_id, "jira_issue_key": {"$in": issue_keys}, "is_deleted": False}))
+
+    def apply_sync_updates(self, project_id: str, updates: List[Tuple[ObjectId, Optional[int], Dict[str, Any]]], skip_dirty: bool = False) -> int:
+        """
+        Applies Jira sync results of a project in one bulk write. Each update only applies if the
+        task is still at the version it was read at, so concurrent user edits are never overwritten.
+
+        :param project_id: The project the tasks belong to; its task list version is bumped.
+        :param updates: (task _id, expected version or None to skip the check, fields to $set) triples.
+        :param skip_dirty: Also skip tasks with unpushed local changes (used when pulling).
         """
-        modified_count = self.delete_soft(task_id)
-        return modified_count > 0
+        operations = []
+        for task_id, version, fields in updates:
+            condition = {"_id": task_id}
+            if version is not None:
+                condition["version"] = version
+            if skip_dirty:
+                condition["jira_dirty"] = {"$ne": True}
+            operations.append(UpdateOne(condition, {"$set": fields, "$inc": {"version": 1}}))
+        if not operations:
+            return 0
+        modified_count = self.collection.bulk_write(operations, ordered=False).modified_count
+        if modified_count:
+            version_repo.bump(project_tasks_scope(project_id))
+        return modified_count
         
-task_repo=TaskRepo()
\ No newline at end of file
+task_repo = lazy_resource("task_repo", TaskRepo)
\ No newline at end of file
@@ -0,0 +1,91 @@
+import logging
+import inspect
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+TASK_ROLLUP_COLLECTION_NAME = "task_daily_rollups"
+
+
+def day_start(moment: datetime) -> datetime:
+    """Midnight (UTC) of the day `moment` falls on; rollup documents are keyed by it."""
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def rollup_id(project_id: str, day: datetime) -> str:
+    return f"{project_id}:{day.strftime('%Y-%m-%d')}"
+
+
+class TaskRollupRepo:
+    """
+    Repository for daily per-project task rollups.
+    One document per project and day holds the tasks created and completed that day, the
+    end-of-day count per status and the overdue count, so analytics read one small document
+    per day instead of scanning the tasks collection.
+
+    'status' is absolute once the snapshot job has seeded the day ('seeded': True). Before that
+    it only holds the day's status changes, to be added to the previous day's counts.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(TASK_ROLLUP_COLLECTION_NAME)
+        self.collection.create_index([("project_id", ASCENDING), ("day", ASCENDING)])
+        self.collection.create_index([("project_id", ASCENDING), ("seeded", ASCENDING), ("day", ASCENDING)])
+        self.collection.create_index([("day", ASCENDING)])
+
+    def increment(self, day: datetime, deltas: Dict[str, Dict[str, int]]) -> None:
+        """
+        Atomically applies counter deltas to the rollups of several projects for one day.
+
+        :param deltas: project_id -> {field path: delta}; zero deltas are skipped.
+        """
+        operations = []
+        for project_id, fields in deltas.items():
+            fields = {field: delta for field, delta in fields.items() if delta}
+            if fields:
+                operations.append(UpdateOne(
+                    {"_id": rollup_id(project_id, day)},
+                    {"$inc": fields, "$setOnInsert": {"project_id": project_id, "day": day}},
+                    upsert=True
+                ))
+        if not operations:
+            return
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            # The snapshot job recomputes the recent days, so a failed increment must not fail the request.
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error updating task rollups for {list(deltas)}: {e}")
+
+    def set_fields(self, values: Dict[Tuple[str, datetime], Dict[str, Any]]) -> int:
+        """Overwrites fields of many (project_id, day) rollups in one unordered bulk write."""
+        operations = [
+            UpdateOne(
+                {"_id": rollup_id(project_id, day)},
+                {"$set": fields, "$setOnInsert": {"project_id": project_id, "day": day}},
+                upsert=True
+            )
+            for (project_id, day), fields in values.items()
+        ]
+        if not operations:
+            return 0
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    def get_keys_since(self, start: datetime) -> Set[Tuple[str, datetime]]:
+        """Returns the (project_id, day) of every rollup from `start` on."""
+        return {(doc["project_id"], doc["day"]) for doc in self.collection.find({"day": {"$gte": start}}, {"project_id": 1, "day": 1})}
+
+    def get_range(self, project_id: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Returns the rollups of a project from `start` to `end` (inclusive), in day order."""
+        return list(self.collection.find({"project_id": project_id, "day": {"$gte": start, "$lte": end}}, {"_id": 0}).sort("day", ASCENDING))
+
+    def get_last_seeded_before(self, project_id: str, day: datetime) -> Optional[Dict[str, Any]]:
+        """Returns the latest rollup of a project before `day` whose status counts are absolute, if any."""
+        return self.collection.find_one({"project_id": project_id, "day": {"$lt": day}, "seeded": True}, {"_id": 0}, sort=[("day", DESCENDING)])
+
+task_rollup_repo = lazy_resource("task_rollup_repo", TaskRollupRepo)
\ No newline at end of file
@@ -0,0 +1,72 @@
+import logging
+import inspect
+from typing import Dict, List
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.core.logger import logs
+from app.core.db_connection import get_db
+from app.core.resources import lazy_resource
+
+VERSION_COLLECTION_NAME = "collection_versions"
+
+
+def project_tasks_scope(project_id: str) -> str:
+    """Scope key for the task list of a single project."""
+    return f"tasks:{project_id}"
+
+
+def project_chat_scope(project_id: str) -> str:
+    """Scope key for the chat history of a single project (human messages only)."""
+    return f"chat:{project_id}"
+
+
+def user_notifications_scope(user_id: str) -> str:
+    """Scope key for the notification list of a single user."""
+    return f"notifications:{user_id}"
+
+
+class VersionRepo:
+    """
+    Repository for monotonically increasing collection versions.
+    Each document is keyed by a scope string (e.g. 'tasks:<project_id>') and holds a
+    counter that is bumped on every write inside that scope, so list endpoints can
+    answer conditional requests without reading the list itself.
+    """
+    def __init__(self):
+        db = get_db()
+        self.collection = db.get_collection(VERSION_COLLECTION_NAME)
+
+    def get(self, scope: str) -> int:
+        """Returns the current version of a scope, or 0 if nothing was ever written to it."""
+        try:
+            doc = self.collection.find_one({"_id": scope}, {"version": 1})
+            return doc.get("version", 0) if doc else 0
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error reading version for scope '{scope}': {e}")
+            raise
+
+    def get_many(self, scopes: List[str]) -> Dict[str, int]:
+        """Returns the current version of several scopes in one query; unknown scopes are 0."""
+        try:
+            versions = {doc["_id"]: doc.get("version", 0) for doc in self.collection.find({"_id": {"$in": scopes}}, {"version": 1})}
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error reading versions of {len(scopes)} scopes: {e}")
+            raise
+        return {scope: versions.get(scope, 0) for scope in scopes}
+
+    def bump(self, scope: str) -> int:
+        """Atomically increments the version of a scope and returns the new value."""
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": scope},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return doc["version"]
+        except PyMongoError as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Database error bumping version for scope '{scope}': {e}")
+            raise
+
+version_repo = lazy_resource("version_repo", VersionRepo)
\ No newline at end of file
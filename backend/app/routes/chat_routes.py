@@ -1,4 +1,5 @@
 import asyncio
+import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Query, Body
 import json
 import logging
@@ -12,14 +13,21 @@ from app.models.chat_model import ChatMessage, ChatMessageCreate
 from app.services.auth_service import get_current_user_from_token, get_current_active_user, auth_repo
 from app.services import chat_service
 from app.core.logger import logs
+from app.utils.websocket_manager import WEBSOCKET_CONNECTIONS, WEBSOCKET_BROADCAST_RECIPIENTS, WEBSOCKET_BROADCAST_DURATION
 
 router = APIRouter(tags=["Chat"])
 
 class ConnectionManager:
     """Manages active WebSocket connections for project-specific chat rooms."""
-    def __init__(self):
+    def __init__(self, endpoint: str):
         # Structure: { "project_id": { "websocket_object": "username" } }
         self.active_connections: Dict[str, Dict[WebSocket, str]] = {}
+        WEBSOCKET_CONNECTIONS.labels(endpoint).set_function(self.connection_count)
+        self._broadcast_recipients = WEBSOCKET_BROADCAST_RECIPIENTS.labels(endpoint)
+        self._broadcast_duration = WEBSOCKET_BROADCAST_DURATION.labels(endpoint)
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.active_connections.values())
 
     async def _send_personal_json(self, websocket: WebSocket, payload: Dict[str, Any]):
         """Sends a JSON payload to a single websocket client."""
@@ -58,14 +66,16 @@ class ConnectionManager:
     async def broadcast(self, project_id: str, payload: Dict[str, Any]):
         """Broadcasts a JSON payload to all clients in a specific project room."""
         if project_id in self.active_connections:
-            await asyncio.gather(
-                *[
-                    self._send_personal_json(ws, payload)
-                    for ws in self.active_connections[project_id]
-                ]
-            )
-
-manager = ConnectionManager()
+            start = time.perf_counter()
+            sends = [
+                self._send_personal_json(ws, payload)
+                for ws in self.active_connections[project_id]
+            ]
+            await asyncio.gather(*sends)
+            self._broadcast_recipients.observe(len(sends))
+            self._broadcast_duration.observe(time.perf_counter() - start)
+
+manager = ConnectionManager("/ws/chat")
 
 @router.websocket("/ws/chat/{project_id}")
 async def websocket_endpoint(websocket: WebSocket, project_id: str, token: str = Query(...)):
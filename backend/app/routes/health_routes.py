@@ -0,0 +1,57 @@
+import asyncio
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.db_connection import MongoManager, get_mongo_manager
+from app.core.mongo_metrics import mongo_metrics
+from app.core.resources import resources_status
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health Check"],
+)
+
+@router.get("/live")
+async def liveness():
+    """
+    Reports that the process is up and its event loop is serving requests. Does not touch the
+    database, so a MongoDB outage never gets the process restarted.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness(mongo: MongoManager = Depends(get_mongo_manager)):
+    """
+    Reports whether the instance can serve traffic: MongoDB answers a ping within
+    HEALTH_CHECK_TIMEOUT_SECONDS and every repository has been initialized. Answers 503 otherwise,
+    with the connection pool's view of the servers to help diagnose why.
+    """
+    try:
+        await asyncio.wait_for(asyncio.to_thread(mongo.ping), settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        database = "ok"
+    except asyncio.TimeoutError:
+        database = f"no answer within {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"
+    except Exception as e:
+        database = f"error: {e}"
+
+    resources = resources_status()
+    pending = sorted(name for name, initialized in resources.items() if not initialized)
+    ready = database == "ok" and not pending
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "pool": mongo.pool_status(),
+            "pending_resources": pending,
+        },
+    )
+
+@router.get("/mongo")
+async def mongo_statistics(mongo: MongoManager = Depends(get_mongo_manager)):
+    """
+    Connection pool and command statistics since startup: checkout wait times and failures, and
+    latency histograms per collection and operation, slowest (by total time) first.
+    """
+    return {"pool_status": mongo.pool_status(), **mongo_metrics.snapshot()}
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
 
 from app.models.auth_model import User
 from app.models.chat_model import GeminiRequest
+from app.models.llm_model import LLMJob
+from app.models.response import ResponseModel
 from app.services.auth_service import get_current_active_user
-from app.services import llm_service, chat_service
+from app.services import chat_service
+from app.services.llm_queue_service import llm_job_queue, LLMQueueFull
+from app.services.llm_cache_service import llm_answer_cache
+from app.repos.membership_repo import membership_repo
 
 router = APIRouter(
     prefix="/llm",
@@ -18,11 +24,42 @@ async def trigger_gemini_prompt(
 ):
     """
     Receives a prompt for the Gemini LLM, validates user membership,
-    and triggers the asynchronous response generation.
+    and queues the asynchronous response generation. The answer is posted to the
+    project chat; the returned job ID can be polled at /llm/jobs/{job_id}.
     """
     if not chat_service._is_user_project_member(project_id, current_user.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not a member of this project.")
 
-    await llm_service.handle_gemini_prompt(project_id, request.prompt, current_user.user_id, current_user.username)
+    try:
+        job = llm_job_queue.submit(project_id, request.prompt, current_user.user_id, current_user.username)
+    except LLMQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "5"})
 
-    return {"status": "processing", "message": "Prompt is being processed."}
\ No newline at end of file
+    return {"status": "processing", "message": "Prompt is being processed.", "job_id": job.job_id}
+
+@router.get("/jobs/{job_id}", response_model=ResponseModel[LLMJob])
+def get_llm_job(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Returns the status of a queued prompt, with its queue wait and generation time once known.
+    Jobs are visible to the members of their project.
+    """
+    job = llm_job_queue.get(job_id)
+    if not job or not chat_service._is_user_project_member(job.project_id, current_user.user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found.")
+    return ResponseModel(status="success", data=job, status_code=status.HTTP_200_OK)
+
+@router.get("/queue", response_model=ResponseModel[Dict[str, Any]])
+def get_llm_queue_metrics(current_user: User = Depends(get_current_active_user)):
+    """
+    Returns LLM queue depth, running jobs and queue-wait / generation-time percentiles.
+    Running jobs are only broken down by project for the caller's own projects.
+    """
+    metrics = llm_job_queue.metrics(membership_repo.get_project_id_set(current_user.user_id))
+    return ResponseModel(status="success", data=metrics, status_code=status.HTTP_200_OK)
+
+@router.get("/cache", response_model=ResponseModel[Dict[str, Any]])
+def get_llm_cache_metrics(current_user: User = Depends(get_current_active_user)):
+    """
+    Returns LLM answer cache size, hit rate and the upstream latency saved by cache hits.
+    """
+    return ResponseModel(status="success", data=llm_answer_cache.metrics(), status_code=status.HTTP_200_OK)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import registry
+
+router = APIRouter(tags=["Health Check"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Exposes the application's metrics in the Prometheus text format: HTTP latency per route,
+    websocket connections and broadcasts, notification fan-out, and MongoDB repository, command
+    and connection pool timings.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, Query, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, WebSocket, Query, WebSocketDisconnect
 from typing import List
 
 from app.models.response import ResponseModel
@@ -6,6 +6,7 @@ from app.models.auth_model import User
 from app.models.notification_model import Notification
 from app.services import notification_service, auth_service
 from app.utils.websocket_manager import manager
+from app.utils.etag import build_etag, etag_matches, set_etag, not_modified
 
 router = APIRouter(
     prefix="/notifications",
@@ -14,8 +15,13 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=ResponseModel[List[Notification]])
-def get_user_notifications(current_user: User = Depends(auth_service.get_current_active_user)):
-    """Retrieve the current user's notifications."""
+def get_user_notifications(request: Request, response: Response, current_user: User = Depends(auth_service.get_current_active_user)):
+    """Retrieve the current user's notifications. Answers 304 if If-None-Match matches the current ETag."""
+    etag = build_etag("notifications", current_user.user_id, notification_service.get_notifications_version(current_user.user_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     notifications = notification_service.get_notifications_for_user(current_user.user_id)
     return ResponseModel(
         status="success",
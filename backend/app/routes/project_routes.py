@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 
 # Import the models for projects, users, and responses
 from ..models.project_model import Project, ProjectCreate, ProjectUpdate
@@ -7,8 +8,10 @@ from ..models.auth_model import User
 from ..models.response import ResponseModel
 
 # Import the services for projects and authentication
-from ..services import project_service
+from ..services import project_service, cascade_service, project_archive_service
+from ..services.chat_service import _is_user_project_member
 from ..services.auth_service import get_current_active_user
+from ..utils.etag import build_etag, etag_matches, set_etag, not_modified
 
 router = APIRouter(
     prefix="/projects",
@@ -41,10 +44,17 @@ def create_new_project(
 
 
 @router.get("/", response_model=ResponseModel)
-def get_all_user_projects(current_user: User = Depends(get_current_active_user)):
+def get_all_user_projects(request: Request, response: Response, current_user: User = Depends(get_current_active_user)):
     """
     Retrieve all non-deleted projects. Requires authentication.
+    Supports conditional requests: answers 304 if If-None-Match matches the current ETag.
     """
+    versions = project_service.get_projects_versions(current_user.user_id)
+    etag = build_etag("projects", current_user.user_id, *(f"{pid}:{version}" for pid, version in versions))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     projects = project_service.get_all_projects(current_user.user_id)
     projects_data = [p.model_dump(by_alias=True) for p in projects]
     return ResponseModel(
@@ -56,11 +66,19 @@ def get_all_user_projects(current_user: User = Depends(get_current_active_user))
 
 
 @router.get("/{project_id}", response_model=ResponseModel)
-def get_single_project(project_id: str, current_user: User = Depends(get_current_active_user)):
+def get_single_project(project_id: str, request: Request, response: Response, current_user: User = Depends(get_current_active_user)):
     """
     Retrieve a single project by its ID. Requires authentication.
+    Supports conditional requests: answers 304 if If-None-Match matches the current ETag.
     """
-    project = project_service.get_project_by_id(project_id)
+    version = project_service.get_project_version(project_id)
+    if version is not None:
+        etag = build_etag("project", project_id, version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+    project = project_service.get_project_by_id(project_id) if version is not None else None
     if not project:
         return ResponseModel(
             status="Failure",
@@ -104,14 +122,16 @@ def update_existing_project(
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
 
 
-@router.delete("/{project_id}", response_model=ResponseModel)
+@router.delete("/{project_id}", response_model=ResponseModel, status_code=status.HTTP_202_ACCEPTED)
 def delete_a_project(project_id: str, current_user: User = Depends(get_current_active_user)):
     """
     Soft-delete a project. Requires authentication.
+    Returns immediately; the project's tasks, chat history and notifications are removed
+    by a background job whose progress is available at GET /projects/{project_id}/deletion.
     """
     try:
-        success = project_service.delete_project(project_id)
-        if not success:
+        job_id = project_service.delete_project(project_id)
+        if not job_id:
             return ResponseModel(
                 status="Failure",
                 message="Project not found or could not be deleted.",
@@ -120,9 +140,55 @@ def delete_a_project(project_id: str, current_user: User = Depends(get_current_a
             )
         return ResponseModel(
             status="Success",
-            message="Project deleted successfully.",
-            data=None,
-            status_code=status.HTTP_200_OK
+            message="Project deleted successfully. Related data is being removed in the background.",
+            data={"cascade_job_id": job_id},
+            status_code=status.HTTP_202_ACCEPTED
         )
     except ValueError as ve:
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(ve))
+
+
+@router.get("/{project_id}/deletion", response_model=ResponseModel)
+def get_project_deletion_status(project_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Retrieve the progress of the background cascade started when a project was deleted.
+    """
+    job = cascade_service.get_cascade_status(project_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No deletion job found for this project.")
+    return ResponseModel(
+        status="Success",
+        message="Deletion status retrieved successfully.",
+        data=job.model_dump(mode="json"),
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.get("/{project_id}/archive")
+def export_project_archive(
+    project_id: str,
+    format: project_archive_service.ArchiveFormat = Query(project_archive_service.ArchiveFormat.NDJSON, description="Archive format."),
+    resume_token: Optional[str] = Query(None, description="Resume an NDJSON archive right after this checkpoint token."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Streams a full archive of a project: the project, its members, tasks and chat history.
+    NDJSON archives contain checkpoint lines whose resume_token restarts an interrupted download;
+    zip archives are always complete.
+    """
+    if not _is_user_project_member(project_id, current_user.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not a member of this project.")
+
+    filename = f"project-{project_id}.{format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == project_archive_service.ArchiveFormat.ZIP:
+        if resume_token:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resume tokens are only supported for NDJSON archives.")
+        return StreamingResponse(project_archive_service.stream_zip_archive(project_id), media_type="application/zip", headers=headers)
+
+    if resume_token:
+        try:
+            project_archive_service.decode_resume_token(project_id, resume_token)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return StreamingResponse(project_archive_service.stream_ndjson_archive(project_id, resume_token), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
+
+from app.models.response import ResponseModel
+from app.models.auth_model import User
+from app.models.search_model import SearchScope, SearchHit
+from app.services import search_service
+from app.services.auth_service import get_current_active_user
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"],
+    dependencies=[Depends(get_current_active_user)]
+)
+
+@router.get("", response_model=ResponseModel[List[SearchHit]])
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text. Supports \"exact phrases\" and -excluded terms."),
+    scope: SearchScope = Query(SearchScope.ALL, description="Restrict the search to tasks, projects or chat."),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size."),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Searches the tasks, projects and chat messages of the projects the user belongs to.
+    Hits are ranked by relevance and carry highlighted snippets; the cursor for the next page
+    is returned in the X-Next-Cursor header.
+    """
+    try:
+        hits, next_cursor = search_service.search(current_user.user_id, q, scope, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return ResponseModel(status="success", message="Search completed.", data=hits, status_code=status.HTTP_200_OK)
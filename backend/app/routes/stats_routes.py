@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date
+from typing import Dict, Any, List, Optional
 
 from app.models.response import ResponseModel
 from app.models.auth_model import User
-from app.services import stats_service
+from app.services import stats_service, analytics_service, workload_service
+from app.core.config import settings
 from app.services.auth_service import get_current_active_user
 from app.services.chat_service import _is_user_project_member
+from app.repos.membership_repo import membership_repo
+
+MAX_DASHBOARD_PROJECTS = 100
 
 router = APIRouter(
     prefix="/stats",
@@ -47,4 +52,116 @@ def get_project_dashboard(project_id: str, current_user: User = Depends(get_curr
         stats = stats_service.get_project_dashboard_stats(project_id)
         return ResponseModel(status="success", data=stats, status_code=status.HTTP_200_OK)
     except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/projects", response_model=ResponseModel[Dict[str, Dict[str, Any]]])
+def get_projects_dashboard(
+    project_ids: Optional[List[str]] = Query(None, description="Projects to fetch; defaults to every project of the user."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Provides dashboard statistics for several projects at once, keyed by project ID,
+    so a dashboard with many project cards needs a single request.
+    Requires the user to be a member of every requested project.
+    """
+    member_project_ids = membership_repo.get_project_id_set(current_user.user_id)
+    if project_ids is None:
+        project_ids = sorted(member_project_ids)
+    elif not member_project_ids.issuperset(project_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of all the requested projects."
+        )
+    if len(project_ids) > MAX_DASHBOARD_PROJECTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_DASHBOARD_PROJECTS} projects can be requested at once."
+        )
+
+    stats = stats_service.get_projects_dashboard_stats(project_ids)
+    return ResponseModel(status="success", data=stats, status_code=status.HTTP_200_OK)
+
+def _ensure_project_member(project_id: str, user: User):
+    if not _is_user_project_member(project_id, user.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this project."
+        )
+
+@router.get("/project/{project_id}/burndown", response_model=ResponseModel[List[Dict[str, Any]]])
+def get_project_burndown(
+    project_id: str,
+    start: Optional[date] = Query(None, description="First day of the series (default: 30 days before 'end')."),
+    end: Optional[date] = Query(None, description="Last day of the series (default: today)."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Provides the remaining (open) and done task counts at the end of each day.
+    """
+    _ensure_project_member(project_id, current_user)
+    try:
+        series = analytics_service.get_burndown(project_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ResponseModel(status="success", data=series, status_code=status.HTTP_200_OK)
+
+@router.get("/project/{project_id}/throughput", response_model=ResponseModel[List[Dict[str, Any]]])
+def get_project_throughput(
+    project_id: str,
+    start: Optional[date] = Query(None, description="First day of the series (default: 30 days before 'end')."),
+    end: Optional[date] = Query(None, description="Last day of the series (default: today)."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Provides the number of tasks created and completed on each day.
+    """
+    _ensure_project_member(project_id, current_user)
+    try:
+        series = analytics_service.get_throughput(project_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ResponseModel(status="success", data=series, status_code=status.HTTP_200_OK)
+
+@router.get("/project/{project_id}/cumulative-flow", response_model=ResponseModel[List[Dict[str, Any]]])
+def get_project_cumulative_flow(
+    project_id: str,
+    start: Optional[date] = Query(None, description="First day of the series (default: 30 days before 'end')."),
+    end: Optional[date] = Query(None, description="Last day of the series (default: today)."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Provides the task count per status at the end of each day.
+    """
+    _ensure_project_member(project_id, current_user)
+    try:
+        series = analytics_service.get_cumulative_flow(project_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ResponseModel(status="success", data=series, status_code=status.HTTP_200_OK)
+
+@router.get("/workload", response_model=ResponseModel[Dict[str, Any]])
+def get_workload_report(
+    project_ids: Optional[List[str]] = Query(None, description="Projects to include; defaults to every project of the user."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Provides a cross-project workload report: per user and per project open, overdue and
+    per-status task counts, each user's tasks per project, and open tasks per due week.
+    Requires the user to be a member of every included project.
+    """
+    member_project_ids = membership_repo.get_project_id_set(current_user.user_id)
+    if project_ids is None:
+        project_ids = sorted(member_project_ids)
+    elif not member_project_ids.issuperset(project_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of all the requested projects."
+        )
+    if len(project_ids) > settings.WORKLOAD_REPORT_MAX_PROJECTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.WORKLOAD_REPORT_MAX_PROJECTS} projects can be included in a workload report."
+        )
+
+    report = workload_service.get_workload_report(project_ids)
+    return ResponseModel(status="success", data=report, status_code=status.HTTP_200_OK)
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
-from app.models.task_model import Task, TaskCreate, TaskUpdate
+from datetime import datetime
+from app.models.task_model import Task, TaskCreate, TaskUpdate, TaskListFilter, TaskSortField, TaskStatus
 from app.models.response import ResponseModel
 from app.models.auth_model import User
 from app.services.auth_service import get_current_active_user
 from app.repos.task_repo import TaskRepo
+from app.services.chat_service import _is_user_project_member
+from app.services.task_transfer_service import TransferFormat, import_tasks, export_tasks
+from app.utils.responses import RequestStreamingResponse
+from app.utils.etag import build_etag, etag_matches, set_etag, not_modified, version_etag, parse_if_match
 from app.services.task_service import (
+    TaskVersionConflict,
     create_task, 
     get_task, 
-    get_tasks_for_project, 
+    query_tasks_for_project,
+    get_tasks_version,
     update_task, 
     delete_task
 )
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 router = APIRouter(
     prefix="/tasks", 
     tags=["Tasks"],
@@ -41,14 +53,19 @@ async def create_new_task(project_id: str, task_data: TaskCreate, current_user:
 
 # Route to get a single task by ID
 @router.get("/{task_id}", response_model=ResponseModel[Task], status_code=status.HTTP_200_OK)
-def get_task_by_id(task_id: str):
+def get_task_by_id(task_id: str, request: Request, response: Response):
     """
     Retrieves a single task by its ID.
+    The ETag holds the task version; send it back in If-Match when updating the task.
     """
     task = get_task(task_id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
-    
+
+    etag = version_etag(task.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return ResponseModel(
         status="success",
         message="Task fetched successfully.",
@@ -58,11 +75,49 @@ def get_task_by_id(task_id: str):
 
 # Route to get all tasks for a project
 @router.get("/project/{project_id}", response_model=ResponseModel[List[Task]], status_code=status.HTTP_200_OK)
-def get_all_tasks_for_project(project_id: str):
+def get_all_tasks_for_project(
+    project_id: str,
+    request: Request,
+    response: Response,
+    status_filter: Optional[List[TaskStatus]] = Query(None, alias="status", description="Only return tasks in these statuses."),
+    assignee: Optional[str] = Query(None, description="Only return tasks assigned to this user ID."),
+    due_after: Optional[datetime] = Query(None, description="Only return tasks due at or after this time."),
+    due_before: Optional[datetime] = Query(None, description="Only return tasks due at or before this time."),
+    overdue: Optional[bool] = Query(None, description="Only return overdue (true) or not overdue (false) tasks."),
+    sort_by: TaskSortField = Query(TaskSortField.CREATED_AT, description="Field to sort by."),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort direction."),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size. Omit to return every matching task."),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page.")
+):
     """
-    Retrieves all tasks for a specific project.
+    Retrieves the tasks of a specific project, filtered and sorted server-side.
+    When `limit` is set, the cursor for the next page is returned in the X-Next-Cursor header.
+    Supports conditional requests: answers 304 if If-None-Match matches the current ETag.
+    Lists filtered by `overdue` get no ETag, as they change with time rather than with writes.
     """
-    tasks = get_tasks_for_project(project_id)
+    # The query string is part of the ETag, since each filter/page is its own representation.
+    etag = build_etag("tasks", project_id, get_tasks_version(project_id), request.url.query) if overdue is None else None
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
+    filters = TaskListFilter(
+        status=status_filter,
+        assignee=assignee,
+        due_after=due_after,
+        due_before=due_before,
+        overdue=overdue
+    )
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        tasks, next_cursor = query_tasks_for_project(project_id, filters, sort_by, order == "desc", limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if etag:
+        set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return ResponseModel(
         status="success",
         message="Tasks fetched successfully.",
@@ -70,23 +125,76 @@ def get_all_tasks_for_project(project_id: str):
         data=tasks
     )
 
+# Route to bulk-import tasks into a project
+@router.post("/project/{project_id}/import", status_code=status.HTTP_200_OK)
+async def import_tasks_for_project(
+    project_id: str,
+    request: Request,
+    format: Optional[TransferFormat] = Query(None, description="Body format. Defaults to csv for text/csv bodies, ndjson otherwise."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Imports tasks from a streamed CSV (with a header row) or NDJSON body, with the columns
+    title, description, assignee, due_date and status.
+    The response is an NDJSON stream with one result per row, followed by a summary line.
+    """
+    if not _is_user_project_member(project_id, current_user.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not a member of this project.")
+    if format is None:
+        format = TransferFormat.CSV if "csv" in request.headers.get("content-type", "") else TransferFormat.NDJSON
+
+    async def result_stream():
+        async for result in import_tasks(project_id, current_user.user_id, request.stream(), format):
+            yield json.dumps(result) + "\n"
+
+    return RequestStreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+# Route to export the tasks of a project
+@router.get("/project/{project_id}/export", status_code=status.HTTP_200_OK)
+def export_tasks_for_project(
+    project_id: str,
+    format: TransferFormat = Query(TransferFormat.NDJSON, description="Output format."),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Streams every task of a project as CSV or NDJSON. The output can be imported again.
+    """
+    if not _is_user_project_member(project_id, current_user.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not a member of this project.")
+
+    media_type = "text/csv" if format == TransferFormat.CSV else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="tasks-{project_id}.{format.value}"'}
+    return StreamingResponse(export_tasks(project_id, format), media_type=media_type, headers=headers)
+
 # Route to update an existing task
 @router.put("/{task_id}", response_model=ResponseModel[Task], status_code=status.HTTP_200_OK)
-async def update_existing_task(task_id: str, task_update: TaskUpdate):
+async def update_existing_task(task_id: str, task_update: TaskUpdate, request: Request, response: Response):
     """
     Updates an existing task by its ID.
+    With an If-Match header holding the task version (its ETag), the update only applies if nobody
+    changed the task in between; otherwise 409 Conflict is returned and nothing is written.
     """
     try:
-        updated_task = await update_task(task_id, task_update)
+        expected_version = parse_if_match(request)
+        updated_task = await update_task(task_id, task_update, expected_version)
         if updated_task is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found or no changes made.")
-        
+
+        set_etag(response, version_etag(updated_task.version))
         return ResponseModel(
             status="success",
             message="Task updated successfully.",
             status_code=status.HTTP_200_OK,
             data=updated_task
         )
+    except HTTPException:
+        raise
+    except TaskVersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task was modified by someone else (current version: {e.current_version}). Reload it and retry.",
+            headers={"ETag": version_etag(e.current_version)} if e.current_version is not None else None
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
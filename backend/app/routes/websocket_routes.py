@@ -119,5 +119,5 @@ async def notification_websocket_endpoint(
             # Keep the connection alive by waiting for messages (which we can ignore)
             await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_channel_id)
+        await manager.disconnect(websocket, user_channel_id)
         logs.define_logger(logging.INFO, None, log_name, message=f"Notification WebSocket disconnected for user '{current_user.username}'.")
@@ -0,0 +1,162 @@
+import logging
+import inspect
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.task_model import TaskStatus
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+from app.repos.task_rollup_repo import task_rollup_repo, day_start
+
+STATUSES = [task_status.value for task_status in TaskStatus]
+OPEN_STATUSES = [TaskStatus.TODO.value, TaskStatus.IN_PROGRESS.value]
+
+
+def _zero_status() -> Dict[str, int]:
+    return {task_status: 0 for task_status in STATUSES}
+
+
+def _count_by_project_day(field: str, since: datetime) -> Dict[Tuple[str, datetime], int]:
+    """Counts the tasks whose `field` timestamp falls on each day since `since`, per project."""
+    pipeline = [
+        {"$match": {field: {"$gte": since}}},
+        {"$group": {
+            "_id": {"project_id": "$project_id", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}}},
+            "count": {"$sum": 1}
+        }}
+    ]
+    return {
+        (item["_id"]["project_id"], datetime.strptime(item["_id"]["day"], "%Y-%m-%d")): item["count"]
+        for item in task_repo.collection.aggregate(pipeline)
+    }
+
+
+def snapshot_and_backfill():
+    """
+    Seeds today's rollup of every project with its current status and overdue counts, and
+    recomputes the created/completed counts of the last TASK_ROLLUP_BACKFILL_DAYS days from the
+    task timestamps. Task writes keep today's rollup up to date in between; this corrects days
+    that were missed (the job did not run, an increment failed, or a write bypassed the services).
+    """
+    log_name = inspect.stack()[0]
+    now = datetime.utcnow()
+    today = day_start(now)
+    since = today - timedelta(days=settings.TASK_ROLLUP_BACKFILL_DAYS)
+
+    values: Dict[Tuple[str, datetime], Dict[str, Any]] = {key: {"created": 0, "completed": 0} for key in task_rollup_repo.get_keys_since(since)}
+    for field, counts in (("created", _count_by_project_day("created_at", since)), ("completed", _count_by_project_day("completed_at", since))):
+        for key, count in counts.items():
+            values.setdefault(key, {"created": 0, "completed": 0})[field] = count
+
+    status_counts = defaultdict(_zero_status)
+    for item in task_repo.collection.aggregate([
+        {"$match": {"is_deleted": False}},
+        {"$group": {"_id": {"project_id": "$project_id", "status": "$status"}, "count": {"$sum": 1}}}
+    ]):
+        status_counts[item["_id"]["project_id"]][item["_id"]["status"] or TaskStatus.TODO.value] += item["count"]
+    overdue_counts = {
+        item["_id"]: item["count"]
+        for item in task_repo.collection.aggregate([
+            {"$match": {"is_deleted": False, "status": {"$in": OPEN_STATUSES}, "due_date": {"$lt": now}}},
+            {"$group": {"_id": "$project_id", "count": {"$sum": 1}}}
+        ])
+    }
+    for doc in project_repo.collection.find({"is_deleted": False}, {"_id": 1}):
+        project_id = str(doc["_id"])
+        values.setdefault((project_id, today), {}).update({
+            "status": status_counts[project_id],
+            "overdue": overdue_counts.get(project_id, 0),
+            "seeded": True
+        })
+
+    written = task_rollup_repo.set_fields(values)
+    logs.define_logger(logging.INFO, None, log_name, message=f"Task rollups: {len(values)} project-days recomputed since {since.date()}, {written} written.")
+
+
+def _day_range(start: Optional[date], end: Optional[date]) -> Tuple[datetime, datetime]:
+    today = datetime.utcnow().date()
+    end = min(end or today, today)
+    start = start or end - timedelta(days=settings.TASK_ANALYTICS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise ValueError("'start' must not be after 'end'.")
+    if (end - start).days + 1 > settings.TASK_ANALYTICS_MAX_DAYS:
+        raise ValueError(f"A series can span at most {settings.TASK_ANALYTICS_MAX_DAYS} days.")
+    return datetime.combine(start, time()), datetime.combine(end, time())
+
+
+def _apply_rollup(status: Dict[str, int], rollup: Dict[str, Any]) -> Dict[str, int]:
+    """Returns the status counts at the end of a rollup's day, given those of the day before."""
+    if rollup.get("seeded"):
+        return {**_zero_status(), **rollup.get("status", {})}
+    status = dict(status)
+    for task_status, delta in rollup.get("status", {}).items():
+        status[task_status] = status.get(task_status, 0) + delta
+    return status
+
+
+def get_daily_rollups(project_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Returns one entry per day from `start` to `end` (default: the last TASK_ANALYTICS_DEFAULT_DAYS
+    days) with the tasks created and completed that day and the end-of-day status and overdue counts.
+    Reads one rollup per day; days without a rollup carry the previous counts forward.
+    """
+    start_day, end_day = _day_range(start, end)
+    base = task_rollup_repo.get_last_seeded_before(project_id, start_day)
+    status = _apply_rollup(_zero_status(), base) if base else _zero_status()
+    overdue = base.get("overdue", 0) if base else 0
+    # Rollups after the last seeded one only hold status changes, so they are replayed on top of it.
+    read_from = base["day"] + timedelta(days=1) if base else datetime.min
+    rollups = task_rollup_repo.get_range(project_id, read_from, end_day)
+
+    by_day = {}
+    for rollup in rollups:
+        if rollup["day"] < start_day:
+            status = _apply_rollup(status, rollup)
+            overdue = rollup.get("overdue", overdue)
+        else:
+            by_day[rollup["day"]] = rollup
+
+    series = []
+    day = start_day
+    while day <= end_day:
+        rollup = by_day.get(day, {})
+        status = _apply_rollup(status, rollup) if rollup else status
+        overdue = rollup.get("overdue", overdue)
+        series.append({
+            "date": day.date().isoformat(),
+            "created": rollup.get("created", 0),
+            "completed": rollup.get("completed", 0),
+            "overdue": overdue,
+            "status": status,
+        })
+        day += timedelta(days=1)
+    return series
+
+
+def get_burndown(project_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Open (remaining) and done task counts at the end of each day."""
+    return [
+        {
+            "date": entry["date"],
+            "remaining": sum(entry["status"].get(task_status, 0) for task_status in OPEN_STATUSES),
+            "done": entry["status"].get(TaskStatus.DONE.value, 0),
+            "overdue": entry["overdue"],
+        }
+        for entry in get_daily_rollups(project_id, start, end)
+    ]
+
+
+def get_throughput(project_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Tasks created and completed on each day."""
+    return [
+        {"date": entry["date"], "created": entry["created"], "completed": entry["completed"]}
+        for entry in get_daily_rollups(project_id, start, end)
+    ]
+
+
+def get_cumulative_flow(project_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Task count per status at the end of each day."""
+    return [{"date": entry["date"], **entry["status"]} for entry in get_daily_rollups(project_id, start, end)]
@@ -3,7 +3,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from typing import Annotated
 
-from ..repos.auth_repo import AuthRepo, auth_repo
+from ..repos.auth_repo import AuthRepo, auth_repo, get_auth_repo
 from ..models.auth_model import User, UserCreate, TokenData
 from ..core.security import verify_password, decode_access_token
 import logging, typing
@@ -18,6 +18,7 @@ from typing_extensions import Annotated
 from app.core.logger import logs
 from app.core import security
 from app.models.auth_model import User, TokenData
+from app.services import stats_service
 
 
 
@@ -33,7 +34,7 @@ class AuthService:
     """
     Service layer containing all business logic for authentication.
     """
-    def __init__(self, repo: AuthRepo = Depends(AuthRepo)):
+    def __init__(self, repo: AuthRepo = Depends(get_auth_repo)):
         self.repo = repo
 
     def register_user(self, user_data: UserCreate) -> dict:
@@ -51,7 +52,9 @@ class AuthService:
                 detail="Email is already registered."
             )
         
-        return self.repo.create_user(user_data)
+        user = self.repo.create_user(user_data)
+        stats_service.record_user_created()
+        return user
 
     def authenticate_user(self, username: str, password: str) -> dict | None:
         """
@@ -108,7 +111,7 @@ def get_current_user_from_token(token: str) -> Optional[User]:
 def get_current_active_user(
     # Use the new bearer_scheme. It returns a credentials object.
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)],
-    repo: AuthRepo = Depends(AuthRepo)
+    repo: AuthRepo = Depends(get_auth_repo)
 ) -> User:
     """
     Dependency to get the current authenticated user from a token.
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import inspect
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.repos.cascade_job_repo import cascade_job_repo
+from app.repos.task_repo import task_repo
+from app.repos.chat_repo import chat_repo
+from app.repos.chat_summary_repo import chat_summary_repo
+from app.repos.notification_repo import notification_repo
+from app.repos.version_repo import version_repo, project_tasks_scope
+from app.models.project_model import ProjectCascadeJob
+from app.services import retrieval_service
+
+# Collections holding data that belongs to a project, in the order they are cascaded.
+CASCADE_TARGETS = (
+    ("Tasks", task_repo),
+    ("chat_history", chat_repo),
+    ("notifications", notification_repo),
+)
+
+
+def enqueue_project_cascade(project_id: str) -> str:
+    """
+    Records a pending cascade job for a deleted project and returns its ID.
+    The actual soft deletes happen in the background worker.
+    """
+    job_id = cascade_job_repo.enqueue(project_id, [name for name, _ in CASCADE_TARGETS])
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Enqueued cascade job '{job_id}' for project '{project_id}'.")
+    return job_id
+
+
+def get_cascade_status(project_id: str) -> Optional[ProjectCascadeJob]:
+    """Returns the most recent cascade job of a project, or None if it was never deleted."""
+    job_doc = cascade_job_repo.get_latest_for_project(project_id)
+    return ProjectCascadeJob.model_validate(job_doc) if job_doc else None
+
+
+def _backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at CASCADE_BACKOFF_MAX_SECONDS."""
+    delay = min(settings.CASCADE_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), settings.CASCADE_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def run_cascade_job(job: dict):
+    """
+    Soft-deletes every document of the job's project in each target collection,
+    in bounded batches with a short pause between them so foreground traffic is not starved.
+    A failed run is put back to pending with a backoff, up to CASCADE_MAX_ATTEMPTS attempts:
+    the project is already deleted, so nothing else would restart it.
+    """
+    log_name = inspect.stack()[0]
+    project_id = job["project_id"]
+    logs.define_logger(logging.INFO, None, log_name, message=f"Running cascade job '{job['_id']}' for project '{project_id}'.")
+    try:
+        for collection_name, repo in CASCADE_TARGETS:
+            while True:
+                deleted = await asyncio.to_thread(repo.delete_soft_batch, {"project_id": project_id}, settings.CASCADE_BATCH_SIZE)
+                if deleted == 0:
+                    break
+                await asyncio.to_thread(cascade_job_repo.add_progress, job["_id"], collection_name, deleted)
+                await asyncio.sleep(settings.CASCADE_BATCH_DELAY_SECONDS)
+
+        await asyncio.to_thread(chat_summary_repo.delete, project_id)
+        await asyncio.to_thread(retrieval_service.remove_project, project_id)
+        await asyncio.to_thread(version_repo.bump, project_tasks_scope(project_id))
+        await asyncio.to_thread(cascade_job_repo.finish, job["_id"])
+        logs.define_logger(logging.INFO, None, log_name, message=f"Cascade job '{job['_id']}' for project '{project_id}' completed.")
+    except Exception as e:
+        attempts = job.get("attempts", 0) + 1
+        give_up = attempts >= settings.CASCADE_MAX_ATTEMPTS
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=_backoff_seconds(attempts))
+        logs.define_logger(
+            logging.ERROR if give_up else logging.WARNING, None, log_name,
+            message=f"Cascade job '{job['_id']}' for project '{project_id}' failed on attempt {attempts}: {e}" + (" Giving up." if give_up else f" Retrying at {next_attempt_at}.")
+        )
+        # If this write fails too, the job stays 'running' and is reclaimed once it goes stale.
+        await asyncio.to_thread(cascade_job_repo.schedule_retry, job["_id"], attempts, str(e), next_attempt_at, give_up)
+
+
+async def cascade_worker():
+    """
+    Background loop that claims and runs pending cascade jobs one at a time.
+    Jobs left 'running' by a crashed worker are picked up again once they go stale.
+    """
+    while True:
+        try:
+            job = await asyncio.to_thread(cascade_job_repo.claim_next, settings.CASCADE_STALE_JOB_SECONDS)
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Cascade worker failed to claim a job: {e}")
+            job = None
+
+        if not job:
+            await asyncio.sleep(settings.CASCADE_POLL_INTERVAL_SECONDS)
+            continue
+        try:
+            await run_cascade_job(job)
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Cascade worker error on job '{job['_id']}': {e}")
+            await asyncio.sleep(settings.CASCADE_POLL_INTERVAL_SECONDS)
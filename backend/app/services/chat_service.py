@@ -5,13 +5,14 @@ from typing import List, Optional
 
 # Your project's specific imports
 from app.core.logger import logs
-from app.repos.chat_repo import ChatRepo
+from app.repos.chat_repo import chat_repo
+from app.repos.chat_summary_repo import chat_summary_repo
 from app.repos.project_repo import project_repo
+from app.repos.version_repo import version_repo, project_chat_scope
 from app.models.chat_model import ChatMessage, ChatMessageCreate, ChatMessageUpdate
 from app.services import notification_service # Import notification service
+from app.services import retrieval_service
 
-# A single instance for the service layer
-chat_repo = ChatRepo()
 # Replace the function in services/chat_service.py with this one:
 
 
@@ -49,8 +50,12 @@ def get_chat_history(project_id: str, user_id: str, page: int, limit: int) -> Li
     logs.define_logger(logging.INFO, None, log_name, message=f"Successfully retrieved {len(history_docs)} messages for project '{project_id}'.")
     return [ChatMessage.model_validate(doc) for doc in history_docs]
 
-async def create_chat_message(project_id: str, user_id: str, username: str, data: ChatMessageCreate, skip_membership_check: bool = False) -> ChatMessage:
-    """Creates a new chat message after verifying user membership."""
+async def create_chat_message(project_id: str, user_id: str, username: str, data: ChatMessageCreate, skip_membership_check: bool = False, llm_exchange: bool = False) -> ChatMessage:
+    """
+    Creates a new chat message after verifying user membership.
+    Messages of an LLM exchange (a prompt and its answer) leave the project's chat version alone,
+    so asking the assistant does not invalidate the answers it has cached for the project.
+    """
     log_name = inspect.stack()[0]
     logs.define_logger(logging.INFO, None, log_name, message=f"User '{username}' attempting to send message to project '{project_id}'.")
 
@@ -69,7 +74,12 @@ async def create_chat_message(project_id: str, user_id: str, username: str, data
         "updated_at": now,
     }
     inserted_id = chat_repo.create(message_doc)
+    if not llm_exchange:
+        version_repo.bump(project_chat_scope(project_id))
+    chat_summary_repo.record_message(project_id)
     new_message = chat_repo.get_by_id(str(inserted_id))
+    if not llm_exchange:
+        retrieval_service.index_message(new_message)
     logs.define_logger(logging.INFO, None, log_name, message=f"Successfully created message '{inserted_id}' in project '{project_id}'.")
     
     validated_message = ChatMessage.model_validate(new_message)
@@ -92,7 +102,8 @@ async def create_chat_message(project_id: str, user_id: str, username: str, data
             if member_id_str != user_id:
                 await notification_service.create_notification(
                     user_id=member_id_str,
-                    message=f"New message in '{project.get('project_name')}': '{username}' said: {data.message[:30]}...'"
+                    message=f"New message in '{project.get('project_name')}': '{username}' said: {data.message[:30]}...'",
+                    project_id=project_id
                 )
 
     return validated_message
@@ -120,7 +131,9 @@ def edit_chat_message(message_id: str, user_id: str, data: ChatMessageUpdate) ->
     modified_count = chat_repo.update(message_id, update_data)
 
     if modified_count > 0:
+        version_repo.bump(project_chat_scope(original_message["project_id"]))
         updated_message = chat_repo.get_by_id(message_id)
+        retrieval_service.index_message(updated_message)
         logs.define_logger(logging.INFO, None, log_name, message=f"Successfully updated message '{message_id}'.")
         return ChatMessage.model_validate(updated_message)
         
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import inspect
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.llm_connection import get_llm_provider
+from app.core.logger import logs
+from app.repos.chat_repo import chat_repo
+from app.repos.chat_summary_repo import chat_summary_repo
+from app.services.llm_context_service import estimate_tokens, truncate
+
+MESSAGE_PROJECTION = {"username": 1, "message": 1}
+
+
+def _summary_prompt(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+    transcript = "".join(f"{msg.get('username')}: {truncate(msg.get('message', ''), settings.LLM_CONTEXT_LINE_MAX_TOKENS)}\n" for msg in messages)
+    return (
+        "You maintain a running summary of a project team's chat. Update the summary with the new "
+        "messages below: keep decisions, open questions, owners and deadlines, drop small talk, and "
+        f"stay under {settings.CHAT_SUMMARY_MAX_TOKENS * 3 // 4} words. Reply with the updated summary only.\n\n"
+        f"--- Current Summary ---\n{previous_summary or '(none yet)'}\n\n"
+        f"--- New Messages ---\n{transcript}"
+    )
+
+
+async def summarize_project(project_id: str) -> bool:
+    """
+    Folds the messages posted since the last update into the project's rolling summary.
+    Only the new span is sent to the model, together with the previous summary, so the cost of
+    an update does not grow with the age of the room. Returns whether the summary advanced.
+    """
+    summary_doc = await asyncio.to_thread(chat_summary_repo.get, project_id)
+    if not summary_doc:
+        return False
+    last_message_id = summary_doc.get("last_message_id")
+    if last_message_id is None:
+        # First summary of the room: start from its most recent messages. A room that already had
+        # history when summaries were introduced would otherwise start from its oldest ones.
+        recent = await asyncio.to_thread(chat_repo.get_recent_for_project, project_id, settings.CHAT_SUMMARY_MAX_BATCH, MESSAGE_PROJECTION)
+        messages = recent[::-1]
+    else:
+        messages = await asyncio.to_thread(chat_repo.get_after, project_id, last_message_id, settings.CHAT_SUMMARY_MAX_BATCH, MESSAGE_PROJECTION)
+    if len(messages) < settings.CHAT_SUMMARY_EVERY_MESSAGES:
+        # Messages counted as pending were deleted before they were summarized.
+        pending = await asyncio.to_thread(chat_repo.count_after, project_id, last_message_id)
+        await asyncio.to_thread(chat_summary_repo.set_pending, project_id, pending)
+        return False
+
+    parts = [text async for text in get_llm_provider().stream(_summary_prompt(summary_doc.get("summary", ""), messages))]
+    summary = truncate("".join(parts).strip(), settings.CHAT_SUMMARY_MAX_TOKENS)
+    if not summary:
+        raise ValueError("The model returned an empty summary.")
+
+    # The pending count is reset from the messages actually left after the span, not decremented.
+    pending = await asyncio.to_thread(chat_repo.count_after, project_id, messages[-1]["_id"])
+    advanced = await asyncio.to_thread(chat_summary_repo.advance, project_id, last_message_id, summary, messages[-1]["_id"], len(messages), pending)
+    logs.define_logger(
+        logging.INFO, None, inspect.stack()[0],
+        message=f"{'Updated' if advanced else 'Discarded concurrent update of'} chat summary of project '{project_id}' with {len(messages)} messages ({estimate_tokens(summary)} tokens)."
+    )
+    return advanced
+
+
+async def summarize_due_projects() -> int:
+    """Updates the summaries of up to CHAT_SUMMARY_PROJECTS_PER_RUN rooms with enough new messages."""
+    due = await asyncio.to_thread(chat_summary_repo.find_due, settings.CHAT_SUMMARY_EVERY_MESSAGES, settings.CHAT_SUMMARY_PROJECTS_PER_RUN)
+    updated = 0
+    for summary_doc in due:
+        try:
+            updated += await summarize_project(summary_doc["_id"])
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Failed to update the chat summary of project '{summary_doc['_id']}': {e}")
+    return updated
+
+
+async def chat_summary_worker():
+    """
+    Background loop keeping chat summaries current. A room is summarized every
+    CHAT_SUMMARY_EVERY_MESSAGES messages; busy rooms are drained without waiting for the next poll.
+    """
+    while True:
+        try:
+            updated = await summarize_due_projects()
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Chat summary worker failed: {e}")
+            updated = 0
+        if not updated:
+            await asyncio.sleep(settings.CHAT_SUMMARY_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import inspect
+import random
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Iterator
+
+from jira import JIRAError
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.repos.jira_outbox_repo import jira_outbox_repo
+from app.repos.project_repo import project_repo
+from app.services import jira_service
+
+OP_CREATE_PROJECT = "create_project"
+OP_DELETE_PROJECT = "delete_project"
+# Project keys are derived from the first characters of the name, so distinct projects can
+# share one; the numbered variants (MARKE2, MARKE3, ...) tried after it stay within Jira's limit.
+MAX_KEY_SUFFIX = 99
+
+
+def record_project_created(project_id: str, project_key: str, name: str, description: str) -> Optional[str]:
+    """Records that a project must be created in Jira. Returns the outbox entry ID."""
+    entry_id = jira_outbox_repo.record(
+        OP_CREATE_PROJECT,
+        project_id,
+        {"project_key": project_key, "name": name, "description": description},
+        idempotency_key=f"{OP_CREATE_PROJECT}:{project_id}"
+    )
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Recorded Jira create for project '{project_id}' with key '{project_key}' (entry: {entry_id}).")
+    return entry_id
+
+
+def record_project_deleted(project_id: str, project_key: Optional[str] = None) -> Optional[str]:
+    """
+    Records that a project must be deleted from Jira. The key may be unknown yet if the
+    create is still in the outbox; the worker resolves it when the entry is processed.
+    """
+    idempotency_key = f"{OP_DELETE_PROJECT}:{project_id}" + (f":{project_key}" if project_key else "")
+    entry_id = jira_outbox_repo.record(OP_DELETE_PROJECT, project_id, {"project_key": project_key}, idempotency_key=idempotency_key)
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Recorded Jira delete for project '{project_id}' (entry: {entry_id}).")
+    return entry_id
+
+
+def ownership_marker(project_id: str) -> str:
+    """Written into the Jira project description, so a later attempt can tell our project from another's."""
+    return f"SynergySphere project {project_id}"
+
+
+def _candidate_keys(project_key: str) -> Iterator[str]:
+    yield project_key
+    for suffix in range(2, MAX_KEY_SUFFIX + 1):
+        yield f"{project_key}{suffix}"
+
+
+def _claim_key(project_id: str, payload: Dict[str, Any]) -> str:
+    """
+    Creates the Jira project under the first free key and returns it. A key that is taken is only
+    adopted if the project there carries this project's ownership marker, i.e. an earlier attempt
+    created it but timed out on our side; anyone else's project is skipped.
+    """
+    marker = ownership_marker(project_id)
+    description = "\n\n".join(part for part in (payload.get("description"), marker) if part)
+    for project_key in _candidate_keys(payload["project_key"]):
+        existing = jira_service.get_project(project_key)
+        if existing is None:
+            try:
+                jira_service.create_project(project_key=project_key, name=payload["name"], description=description)
+                return project_key
+            except JIRAError as e:
+                if e.status_code != 400:
+                    raise
+                # Taken between the lookup and the create, or rejected for another reason.
+                existing = jira_service.get_project(project_key)
+                if existing is None:
+                    raise
+        if marker in existing["description"]:
+            logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Jira project '{project_key}' was created by an earlier attempt for project '{project_id}'; adopting it.")
+            return project_key
+        logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Jira key '{project_key}' belongs to another project; trying the next one.")
+    raise RuntimeError(f"No free Jira project key based on '{payload['project_key']}'.")
+
+
+def _process_create(entry: Dict[str, Any]) -> str:
+    """Creates the Jira project of an outbox entry and writes the key back. Returns the final status."""
+    project_id = entry["project_id"]
+
+    project = project_repo.get_by_id_including_deleted(project_id)
+    if not project or project.get("is_deleted"):
+        return "cancelled"
+    if project.get("jira_project_key"):
+        # Already synchronized by an earlier attempt.
+        return "done"
+
+    project_key = _claim_key(project_id, entry["payload"])
+    project_repo.update(project_id, {"jira_project_key": project_key})
+
+    # The project may have been deleted while Jira was being called: clean up the orphan.
+    project = project_repo.get_by_id_including_deleted(project_id)
+    if project and project.get("is_deleted"):
+        record_project_deleted(project_id, project_key)
+    return "done"
+
+
+def _process_delete(entry: Dict[str, Any]) -> str:
+    """Deletes the Jira project of an outbox entry. Returns the final status."""
+    project_id = entry["project_id"]
+    project_key = entry["payload"].get("project_key")
+    if not project_key:
+        project = project_repo.get_by_id_including_deleted(project_id)
+        project_key = project.get("jira_project_key") if project else None
+
+    if not project_key:
+        # Never reached Jira: make sure a queued create does not recreate it.
+        jira_outbox_repo.cancel_pending(project_id, OP_CREATE_PROJECT)
+        return "cancelled"
+
+    jira_service.delete_project(project_key=project_key)
+    return "done"
+
+
+_HANDLERS = {
+    OP_CREATE_PROJECT: _process_create,
+    OP_DELETE_PROJECT: _process_delete,
+}
+
+
+def _backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at JIRA_OUTBOX_BACKOFF_MAX_SECONDS."""
+    delay = min(settings.JIRA_OUTBOX_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), settings.JIRA_OUTBOX_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def process_entry(entry: Dict[str, Any]):
+    """Runs a claimed outbox entry and records its outcome, scheduling a retry on failure."""
+    log_name = inspect.stack()[0]
+    try:
+        status = _HANDLERS[entry["operation"]](entry)
+        jira_outbox_repo.mark_done(entry["_id"], status)
+        logs.define_logger(logging.INFO, None, log_name, message=f"Jira outbox entry '{entry['_id']}' ({entry['operation']}) finished: {status}.")
+    except Exception as e:
+        attempts = entry.get("attempts", 0) + 1
+        dead = attempts >= settings.JIRA_OUTBOX_MAX_ATTEMPTS
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=_backoff_seconds(attempts))
+        jira_outbox_repo.schedule_retry(entry["_id"], attempts, str(e), next_attempt_at, dead)
+        logs.define_logger(
+            logging.ERROR if dead else logging.WARNING, None, log_name,
+            message=f"Jira outbox entry '{entry['_id']}' ({entry['operation']}) failed on attempt {attempts}: {e}" + (" Giving up." if dead else f" Retrying at {next_attempt_at}.")
+        )
+
+
+def drain_once() -> int:
+    """Processes every entry that is currently due. Returns the number of entries processed."""
+    processed = 0
+    while True:
+        entry = jira_outbox_repo.claim_next(settings.JIRA_OUTBOX_LEASE_SECONDS)
+        if not entry:
+            return processed
+        process_entry(entry)
+        processed += 1
+
+
+async def jira_outbox_worker():
+    """Background loop draining the Jira outbox off the request path."""
+    while True:
+        try:
+            processed = await asyncio.to_thread(drain_once)
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Jira outbox worker error: {e}")
+            processed = 0
+        if not processed:
+            await asyncio.sleep(settings.JIRA_OUTBOX_POLL_INTERVAL_SECONDS)
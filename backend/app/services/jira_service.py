@@ -1,8 +1,12 @@
 import os
+import json
 import inspect
 import logging
+from datetime import datetime, timezone
 from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional
 from jira import JIRA, JIRAError
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # Import your custom logger instance
@@ -11,6 +15,19 @@ from app.core.logger import logs
 load_dotenv()
 
 
+PROJECT_TEMPLATE_KEY = 'com.pyxis.greenhopper.jira:gh-simplified-scrum'
+# Jira accepts at most 50 issues per bulk create request.
+BULK_CREATE_LIMIT = 50
+SEARCH_PAGE_SIZE = 100
+SEARCH_FIELDS = ["summary", "description", "duedate", "status", "updated"]
+HTTP_POOL_SIZE = 10
+
+
+def is_configured() -> bool:
+    """Returns True if the Jira credentials are present in the environment."""
+    return all([os.getenv("JIRA_URL", ""), os.getenv("JIRA_USERNAME", ""), os.getenv("JIRA_API_TOKEN", "")])
+
+
 @lru_cache()
 def get_jira_client() -> JIRA:
     """
@@ -29,6 +46,10 @@ def get_jira_client() -> JIRA:
     try:
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Connecting to Jira at {jira_url}...")
         jira_client = JIRA(server=jira_url, basic_auth=(jira_username, jira_api_token))
+        # Keep a pool of keep-alive connections so bulk sync requests reuse sockets.
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        jira_client._session.mount("https://", adapter)
+        jira_client._session.mount("http://", adapter)
         # Verify connection by fetching server info
         jira_client.server_info()
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message="Successfully connected to Jira.")
@@ -38,6 +59,21 @@ def get_jira_client() -> JIRA:
         raise ConnectionError(f"Could not connect to Jira: {e.text}")
 
 
+@lru_cache()
+def get_lead_account_id() -> str:
+    """
+    Returns the account ID of the authenticated Jira user, used as project lead.
+    Cached, since it never changes for a given set of credentials.
+    """
+    return get_jira_client().myself()['accountId']
+
+
+def _request(method: str, path: str, **kwargs):
+    """Sends a REST request through the cached client's pooled session. Errors raise JIRAError."""
+    jira_client = get_jira_client()
+    return jira_client._session.request(method, jira_client._get_url(path), **kwargs)
+
+
 def create_project(project_key: str, name: str, description: str):
     """
     Creates a new project in Jira.
@@ -52,25 +88,43 @@ def create_project(project_key: str, name: str, description: str):
     try:
         jira_client = get_jira_client()
         
-        lead_account_id = jira_client.myself()['accountId']
+        lead_account_id = get_lead_account_id()
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"{log_message_prefix}: Using project lead account ID: {lead_account_id}")
 
-        project_template_key = 'com.pyxis.greenhopper.jira:gh-simplified-scrum'
-
-        jira_client.create_project(
-            key=project_key,
-            name=name,
-            description=description,
-            leadAccountId=lead_account_id,
-            assigneeType='PROJECT_LEAD',
-            projectTemplateKey=project_template_key
-        )
+        # POST the project directly: JIRA.create_project() does not accept a description or
+        # template key, and looks up several schemes first, costing extra round trips.
+        payload = {
+            "key": project_key,
+            "name": name,
+            "description": description,
+            "leadAccountId": lead_account_id,
+            "assigneeType": "PROJECT_LEAD",
+            "projectTypeKey": "software",
+            "projectTemplateKey": PROJECT_TEMPLATE_KEY,
+        }
+        jira_client._session.post(jira_client._get_url("project"), data=json.dumps(payload))
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"{log_message_prefix}: Successfully created.")
     except JIRAError as e:
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"{log_message_prefix}: Failed. Status: {e.status_code}, Error: {e.text}")
         raise e
 
 
+def get_project(project_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the Jira project with the given key as {"key", "name", "description"}, or None if
+    there is none.
+
+    :param project_key: The key of the project to look up.
+    """
+    try:
+        raw = get_jira_client().project(project_key).raw
+        return {"key": raw.get("key", project_key), "name": raw.get("name"), "description": raw.get("description") or ""}
+    except JIRAError as e:
+        if e.status_code == 404:
+            return None
+        raise
+
+
 def delete_project(project_key: str):
     """
     Deletes a project from Jira permanently.
@@ -82,7 +136,7 @@ def delete_project(project_key: str):
 
     try:
         jira_client = get_jira_client()
-        jira_client.delete_project(key=project_key)
+        jira_client.delete_project(project_key)
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"{log_message_prefix}: Successfully deleted.")
     except JIRAError as e:
         if e.status_code == 404:
@@ -92,3 +146,80 @@ def delete_project(project_key: str):
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"{log_message_prefix}: Failed. Status: {e.status_code}, Error: {e.text}")
         raise e
 
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parses a Jira timestamp (e.g. 2024-01-31T12:00:00.000+0000) into a naive UTC datetime."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bulk_create_issues(issue_fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Creates issues in batches of BULK_CREATE_LIMIT.
+    Returns one result per input, in order: {"key": ...} on success or {"error": ...} on failure.
+
+    :param issue_fields: The 'fields' payload of each issue.
+    """
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(issue_fields), BULK_CREATE_LIMIT):
+        batch = issue_fields[start:start + BULK_CREATE_LIMIT]
+        response = _request("POST", "issue/bulk", data=json.dumps({"issueUpdates": [{"fields": fields} for fields in batch]})).json()
+
+        failed = {error.get("failedElementNumber"): error for error in response.get("errors", [])}
+        created = iter(response.get("issues", []))
+        # Jira lists created issues in request order, skipping the failed elements.
+        for index in range(len(batch)):
+            if index in failed:
+                results.append({"error": str(failed[index].get("elementErrors", failed[index]))})
+            else:
+                issue = next(created, None)
+                results.append({"key": issue["key"]} if issue else {"error": "Missing from bulk response."})
+        logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Bulk-created {len(batch) - len(failed)} of {len(batch)} Jira issues.")
+    return results
+
+
+def update_issue(issue_key: str, fields: Dict[str, Any]):
+    """Updates the editable fields of an issue."""
+    _request("PUT", f"issue/{issue_key}", data=json.dumps({"fields": fields}))
+
+
+def transition_issue(issue_key: str, status_name: str) -> bool:
+    """
+    Moves an issue to the status with the given name, if the workflow allows it.
+    Returns False if no transition leads to that status.
+    """
+    transitions = _request("GET", f"issue/{issue_key}/transitions").json().get("transitions", [])
+    target = next((t for t in transitions if t.get("to", {}).get("name", t.get("name")) == status_name), None)
+    if not target:
+        logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"No transition to '{status_name}' available for issue '{issue_key}'.")
+        return False
+    _request("POST", f"issue/{issue_key}/transitions", data=json.dumps({"transition": {"id": target["id"]}}))
+    return True
+
+
+def delete_issue(issue_key: str):
+    """Deletes an issue. A missing issue is treated as already deleted."""
+    try:
+        _request("DELETE", f"issue/{issue_key}")
+    except JIRAError as e:
+        if e.status_code != 404:
+            raise
+
+
+def search_updated_issues(project_key: str, updated_within_minutes: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the issues of a project updated within the last N minutes (all issues if None), oldest first.
+    A relative JQL date is used because absolute JQL dates are read in the Jira user's time zone.
+    """
+    jql = f'project = "{project_key}"'
+    if updated_within_minutes is not None:
+        jql += f' AND updated >= "-{updated_within_minutes}m"'
+    jql += ' ORDER BY updated ASC'
+    start_at = 0
+    while True:
+        page = _request("POST", "search", data=json.dumps({"jql": jql, "startAt": start_at, "maxResults": SEARCH_PAGE_SIZE, "fields": SEARCH_FIELDS})).json()
+        issues = page.get("issues", [])
+        yield from issues
+        start_at += len(issues)
+        if not issues or start_at >= page.get("total", 0):
+            return
@@ -0,0 +1,209 @@
+import logging
+import inspect
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.task_model import TaskStatus
+from app.repos.jira_sync_repo import jira_sync_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+from app.services import jira_service, retrieval_service
+from app.services.reminder_service import reminder_scheduler
+
+JIRA_ISSUE_TYPE = "Task"
+_TASK_STATUSES = {status.value for status in TaskStatus}
+
+
+def _issue_fields(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps the editable fields of a task to a Jira 'fields' payload."""
+    due_date = task.get("due_date")
+    return {
+        "summary": task.get("title"),
+        "description": task.get("description") or "",
+        "duedate": due_date.strftime("%Y-%m-%d") if due_date else None,
+    }
+
+
+def _task_changes(task: Dict[str, Any], issue: Dict[str, Any], issue_updated: datetime) -> Dict[str, Any]:
+    """Returns the task fields that differ from the Jira issue. Empty if they already match."""
+    fields = issue.get("fields", {})
+    changes: Dict[str, Any] = {}
+    if fields.get("summary") and fields["summary"] != task.get("title"):
+        changes["title"] = fields["summary"]
+    if (fields.get("description") or "") != (task.get("description") or ""):
+        changes["description"] = fields.get("description") or None
+    if fields.get("duedate"):
+        due = datetime.strptime(fields["duedate"], "%Y-%m-%d").date()
+        current = task.get("due_date")
+        if not current or current.date() != due:
+            changes["due_date"] = datetime.combine(due, current.time() if current else datetime.min.time())
+            # A moved deadline gets a new reminder, as with local edits.
+            changes["reminder_sent"] = False
+    status = (fields.get("status") or {}).get("name")
+    if status in _TASK_STATUSES and status != task.get("status"):
+        changes["status"] = status
+        # Completed (or reopened) in Jira: the issue's last update is when that happened.
+        changes["completed_at"] = issue_updated if status == TaskStatus.DONE.value else None
+    if status and status != task.get("jira_status"):
+        changes["jira_status"] = status
+    return changes
+
+
+def _pull(project_id: str, project_key: str, watermark: Optional[datetime]) -> Tuple[int, Optional[datetime]]:
+    """
+    Applies Jira-side edits to linked tasks. Only issues updated since the watermark are fetched,
+    and tasks with unpushed local changes are left alone (local edits win).
+    Returns the number of tasks updated and the newest 'updated' timestamp seen.
+    """
+    within_minutes = None
+    if watermark:
+        elapsed = (datetime.utcnow() - watermark).total_seconds() / 60
+        within_minutes = max(math.ceil(elapsed), 0) + settings.JIRA_TASK_SYNC_OVERLAP_MINUTES
+
+    updated_count = 0
+    newest = watermark
+    page: List[Dict[str, Any]] = []
+
+    def apply_page(issues: List[Dict[str, Any]]) -> int:
+        tasks = {task["jira_issue_key"]: task for task in task_repo.get_by_jira_keys(project_id, [issue["key"] for issue in issues])}
+        updates = []
+        retitled = []
+        rescheduled = []
+        for issue in issues:
+            task = tasks.get(issue["key"])
+            if not task or task.get("jira_dirty"):
+                continue
+            issue_updated = jira_service.parse_timestamp(issue["fields"]["updated"])
+            if task.get("jira_updated_at") and issue_updated <= task["jira_updated_at"]:
+                continue
+            changes = _task_changes(task, issue, issue_updated)
+            if not changes:
+                # Usually the echo of our own push.
+                continue
+            changes["jira_updated_at"] = issue_updated
+            changes["updated_at"] = datetime.utcnow()
+            updates.append((task["_id"], task.get("version"), changes))
+            if "title" in changes or "description" in changes:
+                retitled.append({**task, **changes})
+            if "due_date" in changes or "status" in changes:
+                rescheduled.append({**task, **changes})
+        applied = task_repo.apply_sync_updates(project_id, updates, skip_dirty=True)
+        if retitled:
+            retrieval_service.index_tasks(retitled)
+        # Updates skipped by the version check may be tracked too: reminders are claimed against
+        # the stored task before they are sent, so a stale entry is a no-op.
+        for task in rescheduled:
+            reminder_scheduler.track(task)
+        return applied
+
+    for issue in jira_service.search_updated_issues(project_key, within_minutes):
+        issue_updated = jira_service.parse_timestamp(issue["fields"]["updated"])
+        newest = issue_updated if newest is None else max(newest, issue_updated)
+        page.append(issue)
+        if len(page) >= jira_service.SEARCH_PAGE_SIZE:
+            updated_count += apply_page(page)
+            page = []
+    if page:
+        updated_count += apply_page(page)
+    return updated_count, newest
+
+
+def _push_existing(task: Dict[str, Any]) -> Optional[str]:
+    """Pushes a linked task to its issue. Returns the Jira status the issue ends up in."""
+    jira_service.update_issue(task["jira_issue_key"], _issue_fields(task))
+    jira_status = task.get("jira_status")
+    if task.get("status") != jira_status and jira_service.transition_issue(task["jira_issue_key"], task["status"]):
+        jira_status = task["status"]
+    return jira_status
+
+
+def _push(project_id: str, project_key: str) -> Dict[str, int]:
+    """
+    Pushes tasks with unpushed local changes: unlinked tasks are bulk-created as issues, linked
+    ones are updated (and transitioned if their status changed), deleted ones are removed.
+    A task is only marked clean if it was not edited again while the push was in flight.
+    """
+    dirty = task_repo.get_jira_dirty(project_id, settings.JIRA_TASK_SYNC_BATCH_SIZE)
+    to_create = [t for t in dirty if not t.get("is_deleted") and not t.get("jira_issue_key")]
+    to_update = [t for t in dirty if not t.get("is_deleted") and t.get("jira_issue_key")]
+    to_delete = [t for t in dirty if t.get("is_deleted") and t.get("jira_issue_key")]
+    # Deleted before ever reaching Jira: nothing to push.
+    clean_updates = [(t["_id"], t["version"], {"jira_dirty": False}) for t in dirty if t.get("is_deleted") and not t.get("jira_issue_key")]
+    stats = {"created": 0, "updated": 0, "deleted": 0, "failed": 0}
+
+    if to_create:
+        results = jira_service.bulk_create_issues([
+            {**_issue_fields(t), "project": {"key": project_key}, "issuetype": {"name": JIRA_ISSUE_TYPE}} for t in to_create
+        ])
+        # Store the issue keys unconditionally, so a concurrent edit can never cause a duplicate issue.
+        links = []
+        for task, result in zip(to_create, results):
+            if "key" not in result:
+                stats["failed"] += 1
+                logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Could not create Jira issue for task '{task['_id']}': {result['error']}")
+                continue
+            task["jira_issue_key"] = result["key"]
+            task["jira_status"] = TaskStatus.TODO.value
+            links.append((task["_id"], None, {"jira_issue_key": result["key"], "jira_status": TaskStatus.TODO.value}))
+            task["version"] += 1
+            stats["created"] += 1
+        task_repo.apply_sync_updates(project_id, links)
+        # New issues start in the first workflow status; move the others where they belong.
+        to_update.extend(t for t in to_create if t.get("jira_issue_key") and t.get("status") != TaskStatus.TODO.value)
+        clean_updates.extend((t["_id"], t["version"], {"jira_dirty": False}) for t in to_create if t.get("jira_issue_key") and t.get("status") == TaskStatus.TODO.value)
+
+    def run(task: Dict[str, Any]):
+        try:
+            if task.get("is_deleted"):
+                jira_service.delete_issue(task["jira_issue_key"])
+                return task, {"jira_dirty": False}, "deleted"
+            return task, {"jira_dirty": False, "jira_status": _push_existing(task)}, "updated"
+        except Exception as e:
+            logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Could not push task '{task['_id']}' to Jira issue '{task['jira_issue_key']}': {e}")
+            return task, None, "failed"
+
+    # Jira has no bulk edit for these, so fan out over the client's pooled connections.
+    with ThreadPoolExecutor(max_workers=jira_service.HTTP_POOL_SIZE) as executor:
+        for task, fields, outcome in executor.map(run, to_update + to_delete):
+            stats[outcome] += 1
+            if fields is not None:
+                clean_updates.append((task["_id"], task["version"], fields))
+
+    task_repo.apply_sync_updates(project_id, clean_updates)
+    return stats
+
+
+def sync_project(project_id: str, project_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Runs one incremental two-way sync between a project's tasks and its Jira issues.
+    Returns the sync statistics, or None if another worker is already syncing the project.
+    """
+    state = jira_sync_repo.claim(project_id, settings.JIRA_TASK_SYNC_LEASE_SECONDS)
+    if state is None:
+        return None
+
+    started_at = datetime.utcnow()
+    try:
+        pulled, newest = _pull(project_id, project_key, state.get("watermark"))
+        stats = _push(project_id, project_key)
+    except Exception as e:
+        jira_sync_repo.release(project_id, None, str(e))
+        raise
+    # With no issues seen yet, start the next window from now instead of rescanning everything.
+    jira_sync_repo.release(project_id, newest or started_at)
+    stats["pulled"] = pulled
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Jira sync for project '{project_id}' ({project_key}) finished: {stats}")
+    return stats
+
+
+def sync_all_projects():
+    """Syncs every project mirrored to Jira. Used as a periodic background job."""
+    for project_id, project_key in project_repo.get_jira_linked():
+        try:
+            sync_project(project_id, project_key)
+        except Exception as e:
+            logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Jira sync for project '{project_id}' ({project_key}) failed: {e}")
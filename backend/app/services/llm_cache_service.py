@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import inspect
+import re
+import time
+import unicodedata
+from typing import Awaitable, Callable, Dict, Any, Hashable, Tuple
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.repos.project_repo import project_repo
+from app.repos.version_repo import version_repo, project_tasks_scope, project_chat_scope
+from app.utils.cache import TTLCache
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Folds case, Unicode forms, whitespace and trailing punctuation, so trivially different phrasings share an entry."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return WHITESPACE_PATTERN.sub(" ", text).strip().rstrip("?!. ")
+
+
+def project_state_fingerprint(project_id: str) -> Tuple[int, int, int]:
+    """The versions of everything an answer is built from: the project, its tasks and its chat."""
+    task_scope, chat_scope = project_tasks_scope(project_id), project_chat_scope(project_id)
+    versions = version_repo.get_many([task_scope, chat_scope])
+    return project_repo.get_version(project_id) or 0, versions[task_scope], versions[chat_scope]
+
+
+class LLMAnswerCache:
+    """
+    Caches LLM answers per project, keyed by the normalized prompt and the project's state
+    fingerprint, so a repeated question is answered without an upstream call until the project
+    changes. Entries are evicted by LRU and LLM_CACHE_TTL_SECONDS.
+
+    Identical prompts that arrive while the first one is still being generated wait for that
+    call instead of starting their own.
+    """
+    def __init__(self):
+        self._cache = TTLCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.upstream_seconds = 0.0
+        self.latency_saved_seconds = 0.0
+
+    async def get_or_generate(self, project_id: str, prompt: str, generate: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+        """
+        Returns (answer, served_from_cache). `generate` is only awaited on a miss; failed
+        generations are not cached and are raised to every caller waiting on them.
+        """
+        fingerprint = await asyncio.to_thread(project_state_fingerprint, project_id)
+        key = (project_id, normalize_prompt(prompt), fingerprint)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            answer, upstream_seconds = cached
+            self.hits += 1
+            self.latency_saved_seconds += upstream_seconds
+            return answer, True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            started = time.perf_counter()
+            answer, upstream_seconds = await asyncio.shield(in_flight)
+            self.latency_saved_seconds += max(0.0, upstream_seconds - (time.perf_counter() - started))
+            return answer, True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        started = time.perf_counter()
+        try:
+            answer = await generate()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody was waiting.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        upstream_seconds = time.perf_counter() - started
+        self.upstream_seconds += upstream_seconds
+        self._cache.set(key, (answer, upstream_seconds))
+        future.set_result((answer, upstream_seconds))
+        logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Cached LLM answer for project '{project_id}' ({upstream_seconds:.2f}s upstream).")
+        return answer, False
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "in_flight": len(self._in_flight),
+            "upstream_seconds": round(self.upstream_seconds, 4),
+            "latency_saved_seconds": round(self.latency_saved_seconds, 4),
+        }
+
+llm_answer_cache = LLMAnswerCache()
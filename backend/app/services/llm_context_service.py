@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import inspect
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Callable
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.llm_model import ContextSection, LLMContext
+from app.models.task_model import TaskStatus
+from app.repos.chat_repo import chat_repo
+from app.repos.chat_summary_repo import chat_summary_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+from app.services import retrieval_service
+
+PROJECT_PROJECTION = {"project_name": 1, "description": 1}
+TASK_PROJECTION = {"title": 1, "description": 1, "status": 1, "due_date": 1}
+MESSAGE_PROJECTION = {"username": 1, "message": 1, "created_at": 1}
+# Rough size of a token in characters; close enough for budgeting without a tokenizer.
+CHARS_PER_TOKEN = 4
+SECTION_OVERHEAD = "Tasks:\n\nChat Summary:\n\nRelevant Earlier Messages:\n\nRecent Chat History:\n- (00000 more tasks not shown)\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens of a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Cuts a text to about `max_tokens` tokens, marking the cut with an ellipsis."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + "..."
+
+
+async def _timed(func: Callable, *args) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = await asyncio.to_thread(func, *args)
+    return result, time.perf_counter() - started
+
+
+def _rank_tasks(tasks: List[Dict[str, Any]], relevance: Dict[str, float], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Orders candidate tasks by relevance: tasks the retrieval index matched to the question first
+    (best score first), then open before done and overdue before the rest, keeping the fetch
+    order (due date / recency) otherwise.
+    """
+    def rank(item: Tuple[int, Dict[str, Any]]):
+        index, task = item
+        score = relevance.get(str(task["_id"]), 0.0)
+        is_done = task.get("status") == TaskStatus.DONE
+        is_overdue = not is_done and task.get("due_date") is not None and task["due_date"] < now
+        return (-score, is_done, not is_overdue, index)
+
+    return [task for _, task in sorted(enumerate(tasks), key=rank)]
+
+
+def _task_line(task: Dict[str, Any], now: datetime) -> str:
+    status = task.get("status")
+    details = [f"Status: {getattr(status, 'value', status)}"]
+    if task.get("due_date"):
+        details.append(f"due {task['due_date'].date().isoformat()}")
+        if status != TaskStatus.DONE and task["due_date"] < now:
+            details.append("overdue")
+    return f"- {truncate(task.get('title', ''), settings.LLM_CONTEXT_LINE_MAX_TOKENS)} ({', '.join(details)})\n"
+
+
+def _take_lines(lines: List[str], budget: int, start: int = 0) -> Tuple[int, int]:
+    """Returns (end index, tokens used) of the longest run of `lines` from `start` fitting in `budget`."""
+    used = 0
+    end = start
+    while end < len(lines):
+        tokens = estimate_tokens(lines[end])
+        if used + tokens > budget:
+            break
+        used += tokens
+        end += 1
+    return end, used
+
+
+async def build_context(project_id: str, question: str) -> LLMContext:
+    """
+    Builds the context block for a prompt about a project within LLM_CONTEXT_TOKEN_BUDGET.
+
+    The project, candidate tasks (open ones by due date, recently completed ones by recency), the
+    rolling chat summary, the latest messages and the retrieval index's top matches for the
+    question are fetched concurrently. Older discussion reaches the model through the summary
+    and the matched messages; only messages the summary does not cover yet are sent raw. Tasks
+    are ranked by their match score and messages are taken newest first; each section gets its
+    share of the budget and budget one section leaves unused goes to the other.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    (project, project_seconds), (open_tasks, open_seconds), (done_tasks, done_seconds), (summary_doc, summary_seconds), (messages, chat_seconds), (matches, retrieval_seconds) = await asyncio.gather(
+        _timed(project_repo.get_by_id, project_id, PROJECT_PROJECTION),
+        _timed(task_repo.find_page_for_project, project_id, {"status": {"$ne": TaskStatus.DONE.value}}, "due_date", False, settings.LLM_CONTEXT_MAX_OPEN_TASKS, None, TASK_PROJECTION),
+        _timed(task_repo.find_page_for_project, project_id, {"status": TaskStatus.DONE.value}, "updated_at", True, settings.LLM_CONTEXT_MAX_DONE_TASKS, None, TASK_PROJECTION),
+        _timed(chat_summary_repo.get, project_id),
+        _timed(chat_repo.get_recent_for_project, project_id, settings.LLM_CONTEXT_MAX_MESSAGES, MESSAGE_PROJECTION),
+        _timed(retrieval_service.search, project_id, question),
+    )
+    if not project:
+        raise ValueError(f"Project with ID '{project_id}' not found.")
+
+    budget = settings.LLM_CONTEXT_TOKEN_BUDGET
+    header = (
+        f"Project Name: {project.get('project_name')}\n"
+        f"Project Description: {truncate(project.get('description') or 'N/A', settings.LLM_CONTEXT_DESCRIPTION_MAX_TOKENS)}\n\n"
+    )
+    header_tokens = estimate_tokens(header)
+    summary = truncate(summary_doc.get("summary") or "", settings.CHAT_SUMMARY_MAX_TOKENS) if summary_doc else ""
+    summary_text = f"{summary}\n" if summary else ""
+    summary_tokens = estimate_tokens(summary_text)
+    summarized_messages = summary_doc.get("messages_covered", 0) if summary else 0
+    if summary_doc and summary_doc.get("last_message_id") is not None:
+        messages = [msg for msg in messages if msg["_id"] > summary_doc["last_message_id"]]
+    # Section titles and the "more tasks not shown" line are paid for up front.
+    remaining = max(0, budget - header_tokens - summary_tokens - estimate_tokens(SECTION_OVERHEAD))
+
+    task_relevance = {match.item_id: match.score for match in matches if match.kind == "task"}
+    task_lines = [_task_line(task, now) for task in _rank_tasks(open_tasks + done_tasks, task_relevance, now)]
+    # Newest first while budgeting, shown oldest first.
+    message_lines = [f"{msg.get('username')}: {truncate(msg.get('message', ''), settings.LLM_CONTEXT_LINE_MAX_TOKENS)}\n" for msg in messages]
+    # Matched messages already in the recent history are not repeated; best match first.
+    recent_ids = {str(msg["_id"]) for msg in messages}
+    relevant_lines = [f"{truncate(match.label, settings.LLM_CONTEXT_LINE_MAX_TOKENS)}\n" for match in matches if match.kind == "chat" and match.item_id not in recent_ids]
+
+    task_budget = int(remaining * settings.LLM_CONTEXT_TASK_SHARE)
+    task_end, task_tokens = _take_lines(task_lines, task_budget)
+    relevant_end, relevant_tokens = _take_lines(relevant_lines, remaining - task_tokens)
+    message_end, message_tokens = _take_lines(message_lines, remaining - task_tokens - relevant_tokens)
+    if message_end == len(message_lines):
+        # Messages did not need their share: spend it on more tasks.
+        task_end, extra_tokens = _take_lines(task_lines, remaining - task_tokens - relevant_tokens - message_tokens, task_end)
+        task_tokens += extra_tokens
+
+    parts = [header, "Tasks:\n"]
+    parts += task_lines[:task_end] or ["- No tasks found.\n"]
+    if task_end < len(task_lines):
+        parts.append(f"- ({len(task_lines) - task_end} more tasks not shown)\n")
+    if summary_text:
+        parts += ["\nChat Summary:\n", summary_text]
+    if relevant_end:
+        parts += ["\nRelevant Earlier Messages:\n"] + relevant_lines[:relevant_end]
+    parts.append("\nRecent Chat History:\n")
+    parts += list(reversed(message_lines[:message_end])) or ["- No recent messages.\n"]
+    text = "".join(parts)
+
+    context = LLMContext(
+        text=text,
+        total_tokens=estimate_tokens(text),
+        token_budget=budget,
+        sections=[
+            ContextSection(name="project", tokens=header_tokens, items_included=1, items_available=1, fetch_seconds=round(project_seconds, 4)),
+            ContextSection(name="tasks", tokens=task_tokens, items_included=task_end, items_available=len(task_lines), fetch_seconds=round(max(open_seconds, done_seconds), 4)),
+            ContextSection(name="chat_summary", tokens=summary_tokens, items_included=summarized_messages, items_available=summarized_messages, fetch_seconds=round(summary_seconds, 4)),
+            ContextSection(name="relevant_messages", tokens=relevant_tokens, items_included=relevant_end, items_available=len(relevant_lines), fetch_seconds=round(retrieval_seconds, 4)),
+            ContextSection(name="chat_history", tokens=message_tokens, items_included=message_end, items_available=len(message_lines), fetch_seconds=round(chat_seconds, 4)),
+        ],
+        build_seconds=round(time.perf_counter() - started, 4),
+    )
+    logs.define_logger(
+        logging.INFO, None, inspect.stack()[0],
+        message=f"Built LLM context for project '{project_id}': {context.total_tokens}/{budget} tokens in {context.build_seconds}s ("
+                + ", ".join(f"{s.name}: {s.tokens} tokens, {s.items_included}/{s.items_available} items, fetched in {s.fetch_seconds}s" for s in context.sections) + ")."
+    )
+    return context
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import inspect
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.llm_model import LLMJob, LLMJobStatus
+from app.services import llm_service
+from app.utils.cache import TTLCache
+
+
+class LLMQueueFull(Exception):
+    """Raised when a prompt is submitted while LLM_QUEUE_MAX_SIZE prompts are already waiting."""
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 4)
+
+
+class LLMJobQueue:
+    """
+    In-process queue for LLM prompts, so the HTTP request returns a job ID instead of waiting
+    for the model.
+
+    At most LLM_MAX_CONCURRENT_JOBS prompts run at once, and at most
+    LLM_MAX_CONCURRENT_JOBS_PER_PROJECT of them for the same project. Waiting prompts are kept in
+    one FIFO per project and projects are served round-robin, so a busy project cannot hold up
+    the others. Finished jobs stay queryable for LLM_JOB_RETENTION_SECONDS.
+    """
+    def __init__(self):
+        self._pending: "OrderedDict[str, Deque[Tuple[LLMJob, str, str]]]" = OrderedDict()
+        self._pending_count = 0
+        self._running_by_project: Dict[str, int] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._jobs = TTLCache(settings.LLM_JOB_RETENTION_MAX_JOBS, settings.LLM_JOB_RETENTION_SECONDS)
+        self._queue_waits: Deque[float] = deque(maxlen=settings.LLM_METRICS_WINDOW)
+        self._generation_times: Deque[float] = deque(maxlen=settings.LLM_METRICS_WINDOW)
+        self._totals = {status.value: 0 for status in (LLMJobStatus.SUCCEEDED, LLMJobStatus.FAILED)}
+        self._rejected = 0
+
+    def submit(self, project_id: str, prompt: str, user_id: str, username: str) -> LLMJob:
+        """Queues a prompt and returns its job. Raises LLMQueueFull if the queue is at capacity."""
+        if self._pending_count >= settings.LLM_QUEUE_MAX_SIZE:
+            self._rejected += 1
+            raise LLMQueueFull(f"The LLM queue is full ({settings.LLM_QUEUE_MAX_SIZE} prompts waiting). Try again shortly.")
+        job = LLMJob(job_id=uuid.uuid4().hex, project_id=project_id, user_id=user_id, enqueued_at=datetime.utcnow())
+        self._pending.setdefault(project_id, deque()).append((job, prompt, username))
+        self._pending_count += 1
+        self._jobs.set(job.job_id, job)
+        self._notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[LLMJob]:
+        return self._jobs.get(job_id)
+
+    def metrics(self, visible_project_ids: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Queue depth, running jobs, outcome totals and queue-wait / generation-time percentiles.
+        Per-project running counts are limited to `visible_project_ids`, the caller's projects.
+        """
+        waits, generations = list(self._queue_waits), list(self._generation_times)
+        visible = set(visible_project_ids)
+        return {
+            "queued": self._pending_count,
+            "running": len(self._running),
+            "running_by_project": {project_id: count for project_id, count in self._running_by_project.items() if project_id in visible},
+            "succeeded": self._totals[LLMJobStatus.SUCCEEDED.value],
+            "failed": self._totals[LLMJobStatus.FAILED.value],
+            "rejected": self._rejected,
+            "queue_wait_seconds": {"p50": _percentile(waits, 0.5), "p95": _percentile(waits, 0.95), "max": max(waits, default=None)},
+            "generation_seconds": {"p50": _percentile(generations, 0.5), "p95": _percentile(generations, 0.95), "max": max(generations, default=None)},
+        }
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_job(self) -> Optional[Tuple[LLMJob, str, str]]:
+        """Pops the oldest prompt of the first project (round-robin) that is below its concurrency limit."""
+        if len(self._running) >= settings.LLM_MAX_CONCURRENT_JOBS:
+            return None
+        for project_id in list(self._pending):
+            if self._running_by_project.get(project_id, 0) >= settings.LLM_MAX_CONCURRENT_JOBS_PER_PROJECT:
+                continue
+            queue = self._pending.pop(project_id)
+            entry = queue.popleft()
+            if queue:
+                # Served projects go to the back of the line.
+                self._pending[project_id] = queue
+            self._pending_count -= 1
+            return entry
+        return None
+
+    async def run(self):
+        """Dispatches queued prompts while capacity allows. Runs until cancelled."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                entry = self._next_job()
+                if entry is None:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                job = entry[0]
+                self._running_by_project[job.project_id] = self._running_by_project.get(job.project_id, 0) + 1
+                task = asyncio.create_task(self._execute(*entry), name=f"llm-job-{job.job_id}")
+                self._running.add(task)
+                task.add_done_callback(self._job_done)
+        finally:
+            for task in list(self._running):
+                task.cancel()
+
+    def _job_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._notify()
+
+    async def _execute(self, job: LLMJob, prompt: str, username: str):
+        log_name = inspect.stack()[0]
+        job.started_at = datetime.utcnow()
+        job.status = LLMJobStatus.RUNNING
+        job.queue_wait_seconds = (job.started_at - job.enqueued_at).total_seconds()
+        self._queue_waits.append(job.queue_wait_seconds)
+        try:
+            response_message = await llm_service.handle_gemini_prompt(job.project_id, prompt, job.user_id, username)
+            job.response_message_id = response_message.id
+            job.status = LLMJobStatus.SUCCEEDED
+        except asyncio.CancelledError:
+            job.error = "The prompt was cancelled by a server shutdown."
+            job.status = LLMJobStatus.FAILED
+            raise
+        except Exception as e:
+            logs.define_logger(logging.ERROR, None, log_name, message=f"LLM job '{job.job_id}' for project '{job.project_id}' failed: {e}")
+            job.error = "The prompt could not be processed."
+            job.status = LLMJobStatus.FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.generation_seconds = (job.finished_at - job.started_at).total_seconds()
+            self._generation_times.append(job.generation_seconds)
+            self._totals[job.status.value] = self._totals.get(job.status.value, 0) + 1
+            remaining = self._running_by_project.get(job.project_id, 1) - 1
+            if remaining:
+                self._running_by_project[job.project_id] = remaining
+            else:
+                self._running_by_project.pop(job.project_id, None)
+            # Refresh the retention window from the moment the job finished.
+            self._jobs.set(job.job_id, job)
+        logs.define_logger(logging.INFO, None, log_name, message=f"LLM job '{job.job_id}' {job.status.value}: waited {job.queue_wait_seconds:.2f}s, generated in {job.generation_seconds:.2f}s.")
+
+llm_job_queue = LLMJobQueue()
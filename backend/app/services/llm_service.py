@@ -1,15 +1,80 @@
 import asyncio
+import uuid
 from datetime import datetime, timezone
 import logging
+from typing import List, Optional
 
 from app.routes.chat_routes import manager as chat_manager
-from app.services import chat_service
+from app.services import chat_service, llm_context_service
+from app.services.llm_cache_service import llm_answer_cache
 from app.models.chat_model import ChatMessageCreate
-from app.core.llm_connection import get_gemini_client
-from app.repos.project_repo import project_repo
-from app.repos.task_repo import task_repo
+from app.core.config import settings
+from app.core.llm_connection import get_llm_provider
 from app.core.logger import logs
 
+ERROR_REPLY = "Sorry, I encountered an error while processing your request."
+
+class _DeltaBroadcaster:
+    """
+    Relays streamed LLM text to a project room as 'llm_delta' events.
+    Chunks are coalesced and flushed at most once per LLM_STREAM_FLUSH_INTERVAL_SECONDS, so a
+    model emitting many tiny chunks does not flood every client with websocket frames.
+    """
+    def __init__(self, project_id: str, stream_id: str):
+        self.project_id = project_id
+        self.stream_id = stream_id
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._sequence = 0
+        self._flusher: Optional[asyncio.Task] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def add(self, text: str):
+        if not text:
+            return
+        self._parts.append(text)
+        self._pending.append(text)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        delta = "".join(self._pending)
+        self._pending.clear()
+        await chat_manager.broadcast(self.project_id, {"event": "llm_delta", "data": {"stream_id": self.stream_id, "sequence": self._sequence, "delta": delta}})
+        self._sequence += 1
+
+    async def _flush_periodically(self):
+        while True:
+            await self._flush()
+            await asyncio.sleep(settings.LLM_STREAM_FLUSH_INTERVAL_SECONDS)
+
+    async def close(self):
+        """Stops the periodic flush and sends whatever is still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        await self._flush()
+
+
+async def _generate_answer(project_id: str, prompt: str, deltas: _DeltaBroadcaster) -> str:
+    """Builds the context, streams the provider's answer through `deltas` and returns the full text."""
+    context = await llm_context_service.build_context(project_id, prompt)
+    full_prompt = f"You are a helpful project assistant. Based on the following context, answer the user's question.\n\n--- Context ---\n{context.text}--- User Question ---\n{prompt}"
+    async for text in get_llm_provider().stream(full_prompt):
+        deltas.add(text)
+    if not deltas.text:
+        raise ValueError("The model returned an empty answer.")
+    return deltas.text
+
+
 async def handle_gemini_prompt(project_id: str, prompt: str, user_id: str, username: str):
     """
     Handles a prompt for the Gemini LLM, saves the interaction to the chat history,
@@ -20,6 +85,9 @@ async def handle_gemini_prompt(project_id: str, prompt: str, user_id: str, usern
         prompt: The user's prompt text.
         user_id: The ID of the user who made the prompt.
         username: The username of the user.
+
+    Returns:
+        The chat message holding the LLM's response.
     """
     # 1. Save and broadcast the user's prompt to the chat.
     # This uses the existing chat service, which will verify the user's membership.
@@ -27,44 +95,24 @@ async def handle_gemini_prompt(project_id: str, prompt: str, user_id: str, usern
         project_id=project_id,
         user_id=user_id,
         username=username,
-        data=ChatMessageCreate(message=f"@gemini {prompt}")
+        data=ChatMessageCreate(message=f"@gemini {prompt}"),
+        llm_exchange=True
     )
     await chat_manager.broadcast(project_id, {"event": "new_message", "data": user_prompt_message.model_dump(mode="json")})
 
-    # 2. Gather context for the LLM
+    # 2. Answer from the cache when the same question was asked about the same project state;
+    #    otherwise gather context and stream the answer from Gemini, relaying partial text to the
+    #    room as it arrives.
+    deltas = _DeltaBroadcaster(project_id, uuid.uuid4().hex)
     try:
-        project = project_repo.get_by_id(project_id)
-        tasks = task_repo.get_by_project_id(project_id)
-        chat_history = chat_service.get_chat_history(project_id, user_id, page=1, limit=20)
-
-        # Format the context into a string for the LLM
-        context_str = f"Project Name: {project.get('project_name')}\n"
-        context_str += f"Project Description: {project.get('description', 'N/A')}\n\n"
-        context_str += "Tasks:\n"
-        if tasks:
-            for task in tasks:
-                context_str += f"- {task.get('title')} (Status: {task.get('status')})\n"
-        else:
-            context_str += "- No tasks found.\n"
-        
-        context_str += "\nRecent Chat History:\n"
-        if chat_history:
-            for msg in reversed(chat_history): # Show most recent first
-                context_str += f"{msg.username}: {msg.message}\n"
-        else:
-            context_str += "- No recent messages.\n"
-
-        # 3. Call the real Gemini API
-        gemini = get_gemini_client()
-        model = gemini.GenerativeModel('gemini-1.5-flash-latest')
-        full_prompt = f"You are a helpful project assistant. Based on the following context, answer the user's question.\n\n--- Context ---\n{context_str}\n--- User Question ---\n{prompt}"
-        response = await model.generate_content_async(full_prompt, request_options={"timeout": 60})
-        llm_response_text = response.text
+        llm_response_text, _ = await llm_answer_cache.get_or_generate(project_id, prompt, lambda: _generate_answer(project_id, prompt, deltas))
     except Exception as e:
-        logs.define_logger(logging.ERROR, message=f"Error calling Gemini API: {e}")
-        llm_response_text = "Sorry, I encountered an error while processing your request."
+        logs.define_logger(logging.ERROR, message=f"Error generating the LLM answer: {e}")
+        llm_response_text = ERROR_REPLY
+    finally:
+        await deltas.close()
 
-    # 4. Save the LLM's response to the chat history.
+    # 3. Save the LLM's response to the chat history.
     # We use a placeholder ID for the bot. This call will bypass the membership check.
     gemini_user_id = "gemini-bot-id"
     gemini_response_message = await chat_service.create_chat_message(
@@ -72,8 +120,11 @@ async def handle_gemini_prompt(project_id: str, prompt: str, user_id: str, usern
         user_id=gemini_user_id,
         username="Gemini",
         data=ChatMessageCreate(message=llm_response_text),
-        skip_membership_check=True  # Bypass the permission check for the bot.
+        skip_membership_check=True,  # Bypass the permission check for the bot.
+        llm_exchange=True
     )
 
-    # 5. Broadcast the LLM's response directly using the connection manager.
-    await chat_manager.broadcast(project_id, {"event": "new_message", "data": gemini_response_message.model_dump(mode="json")})
\ No newline at end of file
+    # 4. Broadcast the LLM's response directly using the connection manager. The stream ID lets
+    #    clients replace the partial reply built from 'llm_delta' events with the stored message.
+    await chat_manager.broadcast(project_id, {"event": "new_message", "data": gemini_response_message.model_dump(mode="json"), "stream_id": deltas.stream_id})
+    return gemini_response_message
\ No newline at end of file
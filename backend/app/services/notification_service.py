@@ -1,13 +1,18 @@
 import logging
 import inspect
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 from app.core.logger import logs
 from app.repos.notification_repo import notification_repo
 from app.models.notification_model import Notification, NotificationStatus
 from app.utils.websocket_manager import manager
+from app.utils.metrics import registry, SIZE_BUCKETS
 
-async def create_notification(user_id: str, message: str, link: Optional[str] = None) -> Notification:
+NOTIFICATIONS_CREATED = registry.counter("notifications_created_total", "Notifications created.").labels()
+NOTIFICATION_FANOUT = registry.histogram("notification_fanout_recipients", "Notifications created together for one event.", buckets=SIZE_BUCKETS).labels()
+NOTIFICATIONS_PUSHED = registry.counter("notifications_pushed_total", "Notification messages sent to open websocket connections.").labels()
+
+async def create_notification(user_id: str, message: str, link: Optional[str] = None, project_id: Optional[str] = None) -> Notification:
     """
     Creates a notification, saves it to the DB, and pushes it via WebSocket.
     """
@@ -17,6 +22,7 @@ async def create_notification(user_id: str, message: str, link: Optional[str] =
         "user_id": user_id,
         "message": message,
         "link": link,
+        "project_id": project_id,
         "status": NotificationStatus.UNREAD.value
     }
     
@@ -31,11 +37,47 @@ async def create_notification(user_id: str, message: str, link: Optional[str] =
     # Push the notification to the user via WebSocket
     # We use the user_id as the "project_id" for the broadcast channel
     broadcast_payload = {"event": "new_notification", "data": notification.model_dump(mode="json")}
-    await manager.broadcast(user_id, broadcast_payload)
+    NOTIFICATIONS_CREATED.inc()
+    NOTIFICATION_FANOUT.observe(1)
+    NOTIFICATIONS_PUSHED.inc(await manager.broadcast(user_id, broadcast_payload))
     logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Pushed notification '{notification.notification_id}' to user '{user_id}'.")
     
     return notification
 
+async def create_notifications(items: List[Dict[str, Any]]) -> List[Notification]:
+    """
+    Creates many notifications with a single insert and pushes each one via WebSocket.
+    Each item holds the 'user_id', 'message' and optional 'link' / 'project_id' of one notification.
+    """
+    if not items:
+        return []
+    notification_docs = [
+        {
+            "user_id": item["user_id"],
+            "message": item["message"],
+            "link": item.get("link"),
+            "project_id": item.get("project_id"),
+            "status": NotificationStatus.UNREAD.value
+        }
+        for item in items
+    ]
+    # insert_many sets the '_id' of each document in place.
+    notification_repo.create_many(notification_docs)
+    notifications = [Notification.model_validate(doc) for doc in notification_docs]
+
+    NOTIFICATIONS_CREATED.inc(len(notifications))
+    NOTIFICATION_FANOUT.observe(len(notifications))
+    pushed = 0
+    for notification in notifications:
+        pushed += await manager.broadcast(notification.user_id, {"event": "new_notification", "data": notification.model_dump(mode="json")})
+    NOTIFICATIONS_PUSHED.inc(pushed)
+    logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Created and pushed {len(notifications)} notifications in one batch.")
+    return notifications
+
+def get_notifications_version(user_id: str) -> int:
+    """Returns the version of a user's notification list, used to build its ETag."""
+    return notification_repo.get_list_version(user_id)
+
 def get_notifications_for_user(user_id: str) -> List[Notification]:
     """Retrieves all notifications for a specific user."""
     notification_docs = notification_repo.get_by_user_id(user_id)
@@ -45,5 +87,5 @@ def mark_notification_as_read(notification_id: str, user_id: str) -> bool:
     """Marks a specific notification as read, ensuring it belongs to the user."""
     notification = notification_repo.get_by_id(notification_id)
     if notification and notification.get("user_id") == user_id:
-        return notification_repo.mark_as_read(notification_id) > 0
+        return notification_repo.mark_as_read(notification_id, user_id) > 0
     return False
\ No newline at end of file
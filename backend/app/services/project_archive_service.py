@@ -0,0 +1,156 @@
+import base64
+import json
+import logging
+import inspect
+import zipfile
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.repos.auth_repo import auth_repo
+from app.repos.base_repo import BaseRepo
+from app.repos.chat_repo import chat_repo
+from app.repos.membership_repo import membership_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+
+SECTION_NAMES = ("members", "tasks", "chat_history")
+USER_PROJECTION = {"username": 1, "email": 1, "full_name": 1}
+# Compressed zip output is sent in chunks of at least this size.
+ZIP_CHUNK_BYTES = 64 * 1024
+
+
+class ArchiveFormat(str, Enum):
+    """Wire formats for project archives."""
+    NDJSON = "ndjson"
+    ZIP = "zip"
+
+
+def _sections(project_id: str) -> Tuple[Tuple[str, BaseRepo, Dict[str, Any], Optional[Dict[str, Any]]], ...]:
+    """The streamed sections of an archive, in SECTION_NAMES order: (name, repo, query, projection)."""
+    member_ids = [ObjectId(uid) for uid in membership_repo.get_member_ids(project_id) if ObjectId.is_valid(uid)]
+    return (
+        ("members", auth_repo, {"_id": {"$in": member_ids}}, USER_PROJECTION),
+        ("tasks", task_repo, {"project_id": project_id}, None),
+        ("chat_history", chat_repo, {"project_id": project_id}, None),
+    )
+
+
+def _json_default(value: Any) -> Any:
+    # ObjectIds and datetimes are written as plain strings, like the rest of the API.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_json(doc: Dict[str, Any]) -> str:
+    return json.dumps(doc, default=_json_default)
+
+
+def encode_resume_token(project_id: str, section: str, after_id: ObjectId) -> str:
+    """Encodes a position in an archive stream: every record up to `after_id` of `section` was sent."""
+    raw = json.dumps({"p": project_id, "s": section, "a": str(after_id)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_resume_token(project_id: str, token: str) -> Tuple[str, ObjectId]:
+    """Decodes a resume token produced by `encode_resume_token` for the same project."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+        if payload["p"] != project_id or payload["s"] not in SECTION_NAMES:
+            raise ValueError
+        return payload["s"], ObjectId(payload["a"])
+    except Exception:
+        raise ValueError("Invalid resume token for this project.")
+
+
+def stream_ndjson_archive(project_id: str, resume_token: Optional[str] = None) -> Iterator[str]:
+    """
+    Streams a project as NDJSON: one {"type": ..., "data": ...} line per record, straight from
+    _id-ordered cursors, so memory stays constant whatever the size of the project.
+
+    Every ARCHIVE_CHECKPOINT_EVERY records (and at the end of each section) a
+    {"type": "checkpoint", "resume_token": ...} line is emitted; passing the last token seen
+    restarts the stream right after it.
+    """
+    log_name = inspect.stack()[0]
+    resume_section, resume_after = decode_resume_token(project_id, resume_token) if resume_token else (None, None)
+    sections = _sections(project_id)
+    logs.define_logger(logging.INFO, None, log_name, message=f"Streaming archive of project '{project_id}'" + (f" from {resume_section}/{resume_after}." if resume_section else "."))
+
+    if resume_section is None:
+        project = project_repo.get_by_id(project_id)
+        yield '{"type": "project", "data": %s}\n' % _to_json(project)
+
+    started = resume_section is None
+    for name, repo, query, projection in sections:
+        if not started and name != resume_section:
+            continue
+        after_id = resume_after if not started else None
+        started = True
+
+        count = 0
+        last_id = after_id
+        for doc in repo.iter_by_id(query, after_id, settings.ARCHIVE_CURSOR_BATCH_SIZE, projection):
+            yield '{"type": "%s", "data": %s}\n' % (name, _to_json(doc))
+            last_id = doc["_id"]
+            count += 1
+            if count % settings.ARCHIVE_CHECKPOINT_EVERY == 0:
+                yield json.dumps({"type": "checkpoint", "resume_token": encode_resume_token(project_id, name, last_id)}) + "\n"
+        if last_id is not None and count % settings.ARCHIVE_CHECKPOINT_EVERY:
+            yield json.dumps({"type": "checkpoint", "resume_token": encode_resume_token(project_id, name, last_id)}) + "\n"
+        logs.define_logger(logging.INFO, None, log_name, message=f"Archived {count} {name} records of project '{project_id}'.")
+
+    yield json.dumps({"type": "end", "exported_at": datetime.utcnow().isoformat()}) + "\n"
+
+
+class _ChunkSink:
+    """A write-only, non-seekable file object whose written bytes are drained by the generator."""
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.pending = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        self.pending += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        self.pending = 0
+        return data
+
+
+def stream_zip_archive(project_id: str) -> Iterator[bytes]:
+    """
+    Streams a project as a zip holding project.json and one NDJSON file per section.
+    The zip is written to a non-seekable sink (entries use data descriptors), so each
+    compressed chunk is sent as soon as it is produced and memory stays constant.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("project.json", mode="w") as entry:
+            entry.write(_to_json(project_repo.get_by_id(project_id)).encode("utf-8"))
+        yield sink.drain()
+
+        for name, repo, query, projection in _sections(project_id):
+            with archive.open(f"{name}.ndjson", mode="w", force_zip64=True) as entry:
+                for doc in repo.iter_by_id(query, None, settings.ARCHIVE_CURSOR_BATCH_SIZE, projection):
+                    entry.write(_to_json(doc).encode("utf-8") + b"\n")
+                    if sink.pending >= ZIP_CHUNK_BYTES:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
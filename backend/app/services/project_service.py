@@ -1,18 +1,19 @@
 import logging
 import inspect
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import the custom logger instance
 from app.core.logger import logs
 
 # Import our refactored components
 from app.repos.project_repo import project_repo
-from app.services import jira_service
+from app.repos.membership_repo import membership_repo
+from app.services import jira_outbox_service, cascade_service, stats_service
 from app.models.project_model import Project, ProjectCreate, ProjectUpdate
 
 def create_project(project_data: ProjectCreate, user_id: str) -> Project: # <-- ADDED user_id PARAMETER
     """
-    Orchestrates creating a project in our database and in Jira.
+    Orchestrates creating a project in our database and queuing its creation in Jira.
     """
     logs.define_logger(
         level=logging.INFO,
@@ -30,32 +31,24 @@ def create_project(project_data: ProjectCreate, user_id: str) -> Project: # <--
         jira_key = ''.join(filter(str.isalnum, project_data.project_name))[:5].upper()
         logs.define_logger(level=logging.DEBUG, loggName=inspect.stack()[0], message=f"Generated Jira key: '{jira_key}'")
 
-        # 2. Call the Jira service to create the project in Jira
-        jira_creation_success = False
-        try:
-            logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Attempting to create project in Jira with key: '{jira_key}'")
-            jira_service.create_project(
-                project_key=jira_key,
-                name=project_data.project_name,
-                description=project_data.description or ""
-            )
-            jira_creation_success = True
-            logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message="Successfully created project in Jira.")
-        except Exception as e:
-            logs.define_logger(
-                level=logging.WARNING,
-                loggName=inspect.stack()[0],
-                message=f"Failed to create project in Jira. Proceeding with local creation only. Error: {str(e)}"
-            )
-
-        # 3. Prepare and save the project in our database
+        # 2. Prepare and save the project in our database
         project_dict = project_data.model_dump()
         project_dict['created_by'] = user_id  # <-- ADDED USER ID TO THE DOCUMENT
-        if jira_creation_success:
-            project_dict['jira_project_key'] = jira_key
         
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message="Creating project in local database.")
         inserted_id = project_repo.create(project_dict)
+        membership_repo.add(str(inserted_id), user_id, role="owner")
+        stats_service.record_project_created()
+
+        # 3. Record the Jira creation in the outbox. The worker creates it in Jira and writes
+        #    'jira_project_key' back, so slow or failing Jira calls never block this request.
+        if jira_key:
+            jira_outbox_service.record_project_created(
+                project_id=str(inserted_id),
+                project_key=jira_key,
+                name=project_data.project_name,
+                description=project_data.description or ""
+            )
         
         # 4. Return the newly created project document
         new_project_doc = project_repo.get_by_id(str(inserted_id))
@@ -77,20 +70,23 @@ def get_all_projects(user_id: str) -> List[Project]: # <-- MODIFIED
     """
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Fetching all projects for user ID: {user_id}")
     try:
-        # MongoDB query to find documents where the user is the creator OR is in the members array
-        query = {
-            "$or": [
-                {"created_by": user_id},
-                {"members": user_id}
-            ]
-        }
-        project_docs = project_repo.get_all(query) # Use the get_all method from the new BaseRepo
+        # Resolve the user's projects through the membership index, then fetch them by _id.
+        project_ids = membership_repo.get_project_ids_for_user(user_id)
+        project_docs = project_repo.get_by_ids(project_ids)
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully retrieved {len(project_docs)} projects for user {user_id}.")
         return [Project(**doc) for doc in project_docs]
     except Exception as e:
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Failed to fetch projects for user {user_id}. Error: {str(e)}")
         raise
 
+def get_projects_versions(user_id: str) -> List[Tuple[str, int]]:
+    """Service to retrieve (project_id, version) pairs for a user's projects, used to build the list ETag."""
+    return project_repo.get_versions_for_user(user_id)
+
+def get_project_version(project_id: str) -> Optional[int]:
+    """Service to retrieve only the version counter of a project. Returns None if it does not exist."""
+    return project_repo.get_version(project_id)
+
 def get_project_by_id(project_id: str) -> Optional[Project]:
     """Service to retrieve a single project by its MongoDB _id."""
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Fetching project with ID: {project_id}")
@@ -126,9 +122,11 @@ def update_project(project_id: str, project_update: ProjectUpdate) -> Optional[P
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Error updating project with ID: {project_id}. Error: {str(e)}")
         raise
 
-def delete_project(project_id: str) -> bool:
+def delete_project(project_id: str) -> Optional[str]:
     """
-    Orchestrates deleting a project from our database (soft delete) and from Jira.
+    Orchestrates deleting a project from our database (soft delete) and queuing its deletion from Jira.
+    The project's tasks, chat history and notifications are soft-deleted by a background
+    cascade job; returns that job's ID, or None if the project could not be deleted.
     """
 
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Attempting to delete project with ID: {project_id}")
@@ -138,27 +136,47 @@ def delete_project(project_id: str) -> bool:
             logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Cannot delete. Project with ID '{project_id}' not found.")
             raise ValueError(f"Project with ID '{project_id}' not found.")
 
-        if project_to_delete.jira_project_key:
-            try:
-                logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Attempting to delete Jira project with key: {project_to_delete.jira_project_key}")
-                jira_service.delete_project(project_key=project_to_delete.jira_project_key)
-                logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message="Successfully deleted Jira project.")
-            except Exception as e:
-                logs.define_logger(
-                    level=logging.WARNING,
-                    loggName=inspect.stack()[0],
-                    message=f"Failed to delete Jira project {project_to_delete.jira_project_key}, but proceeding with local soft delete. Error: {str(e)}"
-                )
-
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Soft-deleting project with ID: {project_id} from local database.")
         modified_count = project_repo.delete_soft(project_id)
         
-        if modified_count > 0:
-            logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully soft-deleted project ID: {project_id}")
-        else:
+        if modified_count == 0:
             logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Soft delete failed for project ID: {project_id}. Project may have already been deleted.")
+            return None
 
-        return modified_count > 0
+        membership_repo.remove_project(project_id)
+        stats_service.record_project_deleted(project_id)
+        # The Jira project is deleted by the outbox worker; the key is resolved there
+        # in case the Jira creation itself is still queued.
+        jira_outbox_service.record_project_deleted(project_id, project_to_delete.jira_project_key)
+        job_id = cascade_service.enqueue_project_cascade(project_id)
+        logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully soft-deleted project ID: {project_id}")
+        return job_id
     except Exception as e:
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"An unexpected error occurred during project deletion for ID: {project_id}. Error: {str(e)}")
         raise
+
+def reconcile_memberships() -> Dict[str, int]:
+    """
+    Repairs drift between the Projects collection and the membership index.
+    Projects are the source of truth: missing memberships are added, stale ones
+    (removed members, deleted projects) are soft-deleted and wrong roles are fixed.
+    """
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message="Starting membership index reconciliation.")
+    # The index is read before the projects. Project documents are always written before their
+    # memberships, so a membership created during the run either is missing from this snapshot
+    # or belongs to a project the scan below sees with that member.
+    actual = {(project_id, user_id): (role, version) for project_id, user_id, role, version in membership_repo.get_all_pairs()}
+
+    expected: Dict[tuple, str] = {}
+    for project_id, created_by, members in project_repo.iter_membership_sources():
+        for member_id in members:
+            expected[(project_id, str(member_id))] = "member"
+        if created_by:
+            expected[(project_id, str(created_by))] = "owner"
+
+    to_add = [(pid, uid, role) for (pid, uid), role in expected.items() if actual.get((pid, uid), (None,))[0] != role]
+    to_remove = [(pid, uid, version) for (pid, uid), (_, version) in actual.items() if (pid, uid) not in expected]
+    repaired = membership_repo.apply_repairs(to_add, to_remove)
+
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Membership reconciliation finished: {len(to_add)} added/fixed, {len(to_remove)} removed, {repaired} documents written.")
+    return {"added": len(to_add), "removed": len(to_remove)}
@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import logging
+import inspect
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.task_model import TaskStatus
+from app.repos.task_repo import task_repo
+from app.services import notification_service
+
+
+class ReminderScheduler:
+    """
+    Sends a notification to the assignee of a task REMINDER_LEAD_SECONDS before it is due.
+
+    Only the next window of deadlines is held in memory, in a min-heap ordered by the time each
+    reminder fires. The window is loaded with an indexed range query on 'due_date' and reloaded
+    every REMINDER_WINDOW_SECONDS; task writes in between are applied incrementally through
+    `track` / `untrack`. Reminders are claimed atomically in Mongo before they are sent, so any
+    number of processes can run a scheduler without sending duplicates.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[datetime, str]] = []
+        # task_id -> fire time of its live heap entry. Heap entries that disagree are stale and skipped.
+        self._scheduled: Dict[str, datetime] = {}
+        self._horizon: Optional[datetime] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def _lead() -> timedelta:
+        return timedelta(seconds=settings.REMINDER_LEAD_SECONDS)
+
+    def _push(self, task_id: str, fire_at: datetime):
+        self._scheduled[task_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, task_id))
+
+    def _load_window(self) -> datetime:
+        """Rebuilds the heap from the deadlines of the next window. Returns when to reload next."""
+        now = datetime.utcnow()
+        horizon = now + self._lead() + timedelta(seconds=settings.REMINDER_WINDOW_SECONDS)
+        task_docs = task_repo.get_due_between(now, horizon)
+        with self._lock:
+            self._heap = []
+            self._scheduled = {}
+            for doc in task_docs:
+                self._push(str(doc["_id"]), doc["due_date"] - self._lead())
+            self._horizon = horizon
+        logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Reminder scheduler loaded {len(task_docs)} deadlines up to {horizon}.")
+        return now + timedelta(seconds=settings.REMINDER_WINDOW_SECONDS)
+
+    def track(self, task_doc: Dict[str, Any]):
+        """Schedules (or reschedules) the reminder of a created or updated task."""
+        task_id = str(task_doc["_id"])
+        due_date = task_doc.get("due_date")
+        with self._lock:
+            self._scheduled.pop(task_id, None)
+            if self._horizon is None or not due_date:
+                return
+            # Deadlines past the loaded window are picked up by the next reload.
+            if task_doc.get("status") == TaskStatus.DONE.value or task_doc.get("reminder_sent") or not (datetime.utcnow() <= due_date < self._horizon):
+                return
+            self._push(task_id, due_date - self._lead())
+        self._wake()
+
+    def untrack(self, task_id: str):
+        """Drops the reminder of a deleted task."""
+        with self._lock:
+            self._scheduled.pop(task_id, None)
+
+    def _wake(self):
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _pop_due(self, now: datetime) -> List[ObjectId]:
+        """Pops up to REMINDER_BATCH_SIZE reminders that are due."""
+        due: List[ObjectId] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < settings.REMINDER_BATCH_SIZE:
+                fire_at, task_id = heapq.heappop(self._heap)
+                if self._scheduled.get(task_id) != fire_at:
+                    continue
+                del self._scheduled[task_id]
+                due.append(ObjectId(task_id))
+        return due
+
+    def _next_fire_at(self) -> Optional[datetime]:
+        with self._lock:
+            while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    async def _send(self, task_ids: List[ObjectId]) -> int:
+        """Claims the given reminders and sends the ones this worker won as one notification batch."""
+        due_before = datetime.utcnow() + self._lead()
+        claimed = await asyncio.to_thread(task_repo.claim_reminders, task_ids, due_before, uuid.uuid4().hex)
+        await notification_service.create_notifications([
+            {
+                "user_id": task["assignee"],
+                "message": f"Reminder: task '{task['title']}' is due on {task['due_date']:%Y-%m-%d %H:%M} UTC.",
+                "project_id": task.get("project_id")
+            }
+            for task in claimed
+        ])
+        return len(claimed)
+
+    async def run(self):
+        """Background loop: sleeps until the next reminder or reload is due, then handles it."""
+        log_name = inspect.stack()[0]
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        reload_at = datetime.utcnow()
+        while True:
+            try:
+                if datetime.utcnow() >= reload_at:
+                    reload_at = await asyncio.to_thread(self._load_window)
+
+                due = self._pop_due(datetime.utcnow())
+                if due:
+                    sent = await self._send(due)
+                    logs.define_logger(logging.INFO, None, log_name, message=f"Sent {sent} of {len(due)} due reminders.")
+                    continue
+            except Exception as e:
+                logs.define_logger(logging.ERROR, None, log_name, message=f"Reminder scheduler error: {e}")
+                # Rebuild from the database rather than trust a half-processed heap.
+                reload_at = datetime.utcnow() + timedelta(seconds=settings.REMINDER_WINDOW_SECONDS / 10)
+
+            self._wakeup.clear()
+            next_fire_at = self._next_fire_at()
+            wake_at = min(next_fire_at, reload_at) if next_fire_at else reload_at
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max((wake_at - datetime.utcnow()).total_seconds(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+
+reminder_scheduler = ReminderScheduler()
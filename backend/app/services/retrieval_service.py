@@ -0,0 +1,191 @@
+import logging
+import inspect
+import re
+import zlib
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.llm_model import RetrievedItem
+from app.repos.chat_repo import chat_repo
+from app.repos.retrieval_repo import retrieval_repo
+from app.repos.task_repo import task_repo
+from app.repos.version_repo import version_repo, project_tasks_scope, project_chat_scope
+from app.utils.cache import TTLCache
+
+# The index is an in-process, network-free relevance search over a project's tasks and chat
+# messages. Every item is reduced to a sparse vector of term frequencies whose terms are hashed
+# into 2**RETRIEVAL_HASH_BITS buckets (no vocabulary to maintain). The vectors are stored per item
+# in Mongo and written on every task / message write; a project's vectors are loaded into NumPy
+# arrays on demand and weighted by TF-IDF at load time, as IDF depends on the whole project.
+
+WORD_PATTERN = re.compile(r"\w+")
+TASK_PROJECTION = {"project_id": 1, "title": 1, "description": 1}
+MESSAGE_PROJECTION = {"project_id": 1, "username": 1, "message": 1}
+# Prompts to the assistant and its answers are not indexed, like they do not count as chat
+# activity for caching.
+HUMAN_MESSAGES_FILTER = {"user_id": {"$ne": "gemini-bot-id"}, "message": {"$not": re.compile(r"^@gemini\b")}}
+LABEL_MAX_CHARS = 400
+
+_indexes = TTLCache(settings.RETRIEVAL_INDEX_CACHE_PROJECTS, settings.RETRIEVAL_INDEX_CACHE_SECONDS)
+
+
+def hash_terms(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the sorted hashed term buckets of a text and how often each occurs."""
+    terms = [word for word in WORD_PATTERN.findall(text.lower()) if len(word) > 2]
+    if not terms:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    mask = (1 << settings.RETRIEVAL_HASH_BITS) - 1
+    buckets = np.fromiter((zlib.crc32(term.encode()) & mask for term in terms), dtype=np.int64, count=len(terms))
+    indices, counts = np.unique(buckets, return_counts=True)
+    return indices.astype(np.int32), counts.astype(np.float32)
+
+
+def _label(text: str) -> str:
+    return text if len(text) <= LABEL_MAX_CHARS else text[:LABEL_MAX_CHARS - 3].rstrip() + "..."
+
+
+def _vector_doc(kind: str, item_id: str, project_id: str, label: str, text: str) -> Dict[str, Any]:
+    indices, counts = hash_terms(text)
+    return {
+        "_id": f"{kind}:{item_id}",
+        "project_id": project_id,
+        "kind": kind,
+        "item_id": item_id,
+        "label": _label(label),
+        "indices": indices.tobytes(),
+        "counts": counts.tobytes(),
+    }
+
+
+def _task_vector(task: Dict[str, Any]) -> Dict[str, Any]:
+    text = f"{task.get('title', '')}\n{task.get('description') or ''}"
+    return _vector_doc("task", str(task["_id"]), task["project_id"], task.get("title", ""), text)
+
+
+def _message_vector(message: Dict[str, Any]) -> Dict[str, Any]:
+    text = message.get("message", "")
+    return _vector_doc("chat", str(message["_id"]), message["project_id"], f"{message.get('username')}: {text}", text)
+
+
+class ProjectIndex:
+    """
+    TF-IDF weighted vectors of one project, stored as flat NumPy arrays: entry i belongs to item
+    rows[i] and holds the normalized weight of bucket indices[i]. Buckets and document
+    frequencies are kept sorted, so IDF lookups are binary searches rather than dense arrays.
+    """
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.items = [(doc["kind"], doc["item_id"], doc.get("label", "")) for doc in docs]
+        per_item = [(np.frombuffer(doc["indices"], dtype=np.int32), np.frombuffer(doc["counts"], dtype=np.float32)) for doc in docs]
+        lengths = np.fromiter((len(indices) for indices, _ in per_item), dtype=np.int64, count=len(per_item))
+        self.indices = np.concatenate([indices for indices, _ in per_item]) if per_item else np.empty(0, dtype=np.int32)
+        counts = np.concatenate([counts for _, counts in per_item]) if per_item else np.empty(0, dtype=np.float32)
+        self.rows = np.repeat(np.arange(len(per_item)), lengths)
+
+        self.buckets, document_frequency = np.unique(self.indices, return_counts=True)
+        self.idf = (np.log((len(per_item) + 1) / (document_frequency + 1)) + 1).astype(np.float32)
+        weights = np.log1p(counts) * self._idf_of(self.indices)
+        norms = np.sqrt(np.bincount(self.rows, weights=weights * weights, minlength=len(per_item)))
+        self.weights = weights / np.where(norms > 0, norms, 1)[self.rows]
+
+    def _idf_of(self, buckets: np.ndarray) -> np.ndarray:
+        """IDF of each bucket; buckets no item contains get the maximum IDF."""
+        if not len(self.buckets):
+            return np.ones(len(buckets), dtype=np.float32)
+        positions = np.clip(np.searchsorted(self.buckets, buckets), 0, len(self.buckets) - 1)
+        found = self.buckets[positions] == buckets
+        return np.where(found, self.idf[positions], np.log(len(self.items) + 1) + 1).astype(np.float32)
+
+    def search(self, question: str, k: int) -> List[Tuple[int, float]]:
+        """Returns (item position, cosine score) of the k best matching items, best first."""
+        query_buckets, query_counts = hash_terms(question)
+        if not len(query_buckets) or not self.items:
+            return []
+        query_weights = np.log1p(query_counts) * self._idf_of(query_buckets)
+        query_weights /= np.linalg.norm(query_weights)
+
+        positions = np.clip(np.searchsorted(query_buckets, self.indices), 0, len(query_buckets) - 1)
+        matches = query_buckets[positions] == self.indices
+        scores = np.bincount(self.rows[matches], weights=self.weights[matches] * query_weights[positions[matches]], minlength=len(self.items))
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(position), float(scores[position])) for position in top]
+
+
+def _fingerprint(project_id: str) -> Tuple[int, ...]:
+    versions = version_repo.get_many([project_tasks_scope(project_id), project_chat_scope(project_id)])
+    return tuple(versions.values())
+
+
+def _backfill(project_id: str):
+    """
+    Indexes the tasks and messages a project had before it was first indexed, once per project.
+    Items written since then already have vectors and are left as they are.
+    """
+    limit = settings.RETRIEVAL_BACKFILL_MAX_ITEMS
+    tasks = task_repo.find_page_for_project(project_id, {}, "created_at", True, limit, None, TASK_PROJECTION)
+    messages = chat_repo.get_recent_for_project(project_id, max(0, limit - len(tasks)), MESSAGE_PROJECTION, HUMAN_MESSAGES_FILTER) if len(tasks) < limit else []
+    docs = [_task_vector(task) for task in tasks] + [_message_vector(message) for message in messages]
+    if not retrieval_repo.upsert_many(docs, only_missing=True):
+        # Not marked, so the next load retries.
+        return
+    retrieval_repo.mark_backfilled(project_id)
+    if docs:
+        logs.define_logger(logging.INFO, None, inspect.stack()[0], message=f"Backfilled the retrieval index of project '{project_id}' with {len(tasks)} tasks and {len(messages)} messages.")
+
+
+def get_index(project_id: str) -> ProjectIndex:
+    """
+    Returns the project's index, reloading it from Mongo when its tasks or chat changed since it
+    was loaded (also when the change was made by another process).
+    """
+    fingerprint = _fingerprint(project_id)
+    cached = _indexes.get(project_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    if not retrieval_repo.is_backfilled(project_id):
+        _backfill(project_id)
+    index = ProjectIndex(retrieval_repo.get_for_project(project_id))
+    _indexes.set(project_id, (fingerprint, index))
+    return index
+
+
+def search(project_id: str, question: str, k: Optional[int] = None) -> List[RetrievedItem]:
+    """Returns up to k (RETRIEVAL_TOP_K by default) tasks and messages most relevant to the question."""
+    index = get_index(project_id)
+    return [
+        RetrievedItem(kind=index.items[position][0], item_id=index.items[position][1], label=index.items[position][2], score=round(score, 4))
+        for position, score in index.search(question, k or settings.RETRIEVAL_TOP_K)
+    ]
+
+
+def _invalidate(project_ids: Iterable[str]):
+    _indexes.invalidate(*set(project_ids))
+
+
+def index_tasks(tasks: List[Dict[str, Any]]):
+    """Writes the vectors of created or edited tasks."""
+    retrieval_repo.upsert_many([_task_vector(task) for task in tasks])
+    _invalidate(task["project_id"] for task in tasks)
+
+
+def remove_task(task: Dict[str, Any]):
+    retrieval_repo.delete(f"task:{task['_id']}")
+    _invalidate([task["project_id"]])
+
+
+def index_message(message: Dict[str, Any]):
+    """Writes the vector of a new or edited chat message."""
+    retrieval_repo.upsert_many([_message_vector(message)])
+    _invalidate([message["project_id"]])
+
+
+def remove_project(project_id: str):
+    retrieval_repo.delete_for_project(project_id)
+    _invalidate([project_id])
@@ -0,0 +1,130 @@
+import base64
+import html
+import logging
+import inspect
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+
+from app.core.logger import logs
+from app.models.search_model import SearchScope, SearchHit
+from app.repos.base_repo import BaseRepo
+from app.repos.chat_repo import chat_repo
+from app.repos.membership_repo import membership_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+
+SNIPPET_LENGTH = 160
+
+# scope -> (hit type, repo, searchable fields, field shown as the hit title)
+SEARCH_SOURCES: Dict[SearchScope, Tuple[str, BaseRepo, Tuple[str, ...], str]] = {
+    SearchScope.TASKS: ("task", task_repo, ("title", "description"), "title"),
+    SearchScope.PROJECTS: ("project", project_repo, ("project_name", "description"), "project_name"),
+    SearchScope.CHAT: ("chat", chat_repo, ("message",), "message"),
+}
+
+
+def _encode_cursor(positions: Dict[str, Tuple[float, ObjectId]]) -> str:
+    """Encodes the (score, _id) position reached in each scope into an opaque cursor."""
+    raw = json_util.dumps({scope: list(position) for scope, position in positions.items()})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Tuple[float, ObjectId]]:
+    """Decodes a cursor produced by `_encode_cursor`."""
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return {scope: (float(position[0]), position[1]) for scope, position in payload.items()}
+    except Exception:
+        raise ValueError("Invalid search cursor.")
+
+
+def _query_terms(text: str) -> List[str]:
+    """Extracts the terms to highlight from a $text search string, skipping negated terms."""
+    return [term.lower() for term in re.findall(r'(?<![-\w])[\w]+', text) if term]
+
+
+def highlight(value: Optional[str], terms: List[str]) -> Optional[str]:
+    """
+    Returns an HTML-escaped snippet of `value` around the first matching term, with every match
+    wrapped in <mark>. Terms match word prefixes, approximating the stemming of the text index.
+    Returns None if no term occurs in the value.
+    """
+    if not value or not terms:
+        return None
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    first = pattern.search(value)
+    if not first:
+        return None
+
+    start, end = 0, len(value)
+    if len(value) > SNIPPET_LENGTH:
+        start = max(first.start() - SNIPPET_LENGTH // 3, 0)
+        end = min(start + SNIPPET_LENGTH, len(value))
+    window = value[start:end]
+
+    parts, last = [], 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(value) else "")
+
+
+def _to_hit(hit_type: str, doc: Dict[str, Any], fields: Tuple[str, ...], title_field: str, terms: List[str]) -> SearchHit:
+    highlights = {field: snippet for field in fields if (snippet := highlight(doc.get(field), terms))}
+    project_id = str(doc["_id"]) if hit_type == "project" else doc.get("project_id")
+    return SearchHit(
+        type=hit_type,
+        id=str(doc["_id"]),
+        project_id=project_id,
+        title=doc.get(title_field) or "",
+        score=doc["_score"],
+        highlights=highlights
+    )
+
+
+def search(user_id: str, text: str, scope: SearchScope, limit: int, cursor: Optional[str] = None) -> Tuple[List[SearchHit], Optional[str]]:
+    """
+    Full-text search over the tasks, projects and chat messages of the projects a user belongs to.
+
+    Each scope is searched through its Mongo text index with keyset pagination on (score, _id);
+    with scope=all the per-scope results are merged by score. Returns the hits and the cursor of
+    the next page (None on the last page).
+    """
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"User '{user_id}' searching '{text}' (scope: {scope.value}, limit: {limit})")
+    positions = _decode_cursor(cursor) if cursor else {}
+    project_ids = list(membership_repo.get_project_id_set(user_id))
+    if not project_ids:
+        return [], None
+
+    scopes = list(SEARCH_SOURCES) if scope == SearchScope.ALL else [scope]
+    terms = _query_terms(text)
+
+    candidates: List[Tuple[SearchScope, Dict[str, Any]]] = []
+    for source_scope in scopes:
+        _, repo, fields, _ = SEARCH_SOURCES[source_scope]
+        if source_scope == SearchScope.PROJECTS:
+            access = {"_id": {"$in": [ObjectId(pid) for pid in project_ids if ObjectId.is_valid(pid)]}}
+        else:
+            access = {"project_id": {"$in": project_ids}}
+        projection = {field: 1 for field in fields}
+        projection["project_id"] = 1
+        # One extra document per scope tells whether anything is left after this page.
+        docs = repo.text_search(text, access, limit + 1, positions.get(source_scope.value), projection)
+        candidates.extend((source_scope, doc) for doc in docs)
+
+    candidates.sort(key=lambda item: (-item[1]["_score"], str(item[1]["_id"])))
+    page, rest = candidates[:limit], candidates[limit:]
+
+    hits = []
+    for source_scope, doc in page:
+        hit_type, _, fields, title_field = SEARCH_SOURCES[source_scope]
+        hits.append(_to_hit(hit_type, doc, fields, title_field, terms))
+        positions[source_scope.value] = (doc["_score"], doc["_id"])
+
+    next_cursor = _encode_cursor(positions) if rest else None
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Search '{text}' for user '{user_id}' returned {len(hits)} hits.")
+    return hits, next_cursor
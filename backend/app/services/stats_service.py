@@ -1,80 +1,230 @@
-from typing import Dict, Any
+import logging
+import inspect
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from bson import ObjectId
+
+from app.core.logger import logs
 from app.repos.auth_repo import auth_repo
 from app.repos.project_repo import project_repo
 from app.repos.task_repo import task_repo
+from app.repos.membership_repo import membership_repo
+from app.repos.stats_counter_repo import stats_counter_repo, GLOBAL_STATS_SCOPE, user_stats_scope
+from app.repos.task_rollup_repo import task_rollup_repo, day_start
 from app.models.task_model import TaskStatus
 
 
-def get_global_overview_stats() -> Dict[str, Any]:
+def _status_value(status: Any) -> str:
+    return status.value if isinstance(status, TaskStatus) else str(status)
+
+
+def _task_deltas(task: Dict[str, Any], sign: int, deltas: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, int]]:
+    """Adds the counter changes of adding (sign=1) or removing (sign=-1) one task to `deltas`."""
+    deltas = deltas if deltas is not None else defaultdict(lambda: defaultdict(int))
+    status_field = f"status.{_status_value(task.get('status', TaskStatus.TODO))}"
+    deltas[GLOBAL_STATS_SCOPE]["tasks"] += sign
+    # Per-project figures come from the dashboard aggregation, so only assignees are counted here.
+    scope = user_stats_scope(task["assignee"])
+    deltas[scope]["tasks"] += sign
+    deltas[scope][status_field] += sign
+    return deltas
+
+
+def _rollup_deltas(task: Dict[str, Any], sign: int, deltas: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Adds the change of today's status counts from adding (sign=1) or removing (sign=-1) one task."""
+    deltas[task["project_id"]][f"status.{_status_value(task.get('status', TaskStatus.TODO))}"] += sign
+    return deltas
+
+
+def _is_done(task: Dict[str, Any]) -> bool:
+    return _status_value(task.get("status")) == TaskStatus.DONE.value
+
+
+def record_tasks_created(tasks: List[Dict[str, Any]]):
+    """Counts newly created tasks."""
+    deltas = None
+    rollup_deltas = defaultdict(lambda: defaultdict(int))
+    for task in tasks:
+        deltas = _task_deltas(task, 1, deltas)
+        _rollup_deltas(task, 1, rollup_deltas)
+        rollup_deltas[task["project_id"]]["created"] += 1
+        rollup_deltas[task["project_id"]]["completed"] += _is_done(task)
+    if deltas:
+        stats_counter_repo.increment(deltas)
+        task_rollup_repo.increment(day_start(datetime.utcnow()), rollup_deltas)
+
+
+def record_task_updated(before: Dict[str, Any], after: Dict[str, Any]):
+    """Moves a task between counters if its status or assignee changed."""
+    status_changed = _status_value(before.get("status")) != _status_value(after.get("status"))
+    if not status_changed and before.get("assignee") == after.get("assignee"):
+        return
+    deltas = _task_deltas(before, -1)
+    stats_counter_repo.increment(_task_deltas(after, 1, deltas))
+    if status_changed:
+        today = day_start(datetime.utcnow())
+        rollup_deltas = _rollup_deltas(after, 1, _rollup_deltas(before, -1, defaultdict(lambda: defaultdict(int))))
+        rollup_deltas[after["project_id"]]["completed"] += _is_done(after)
+        task_rollup_repo.increment(today, rollup_deltas)
+        # 'completed' counts tasks by their completed_at, as the backfill does. Reopening clears
+        # it, so the task no longer counts on the day it was completed.
+        if _is_done(before) and before.get("completed_at"):
+            task_rollup_repo.increment(day_start(before["completed_at"]), {before["project_id"]: {"completed": -1}})
+
+
+def record_task_deleted(task: Dict[str, Any]):
+    """Uncounts a deleted task."""
+    stats_counter_repo.increment(_task_deltas(task, -1))
+    task_rollup_repo.increment(day_start(datetime.utcnow()), _rollup_deltas(task, -1, defaultdict(lambda: defaultdict(int))))
+
+
+def record_project_created():
+    stats_counter_repo.increment({GLOBAL_STATS_SCOPE: {"projects": 1}})
+
+
+def record_project_deleted(project_id: str):
     """
-    Calculates high-level statistics for the entire application.
-    Note: In a large-scale app, these counts might be cached.
+    Uncounts a deleted project and, since its tasks are soft-deleted by the background cascade,
+    its tasks from the global total. Per-assignee counters are corrected by reconciliation.
+    Called before the cascade starts, so the project's tasks are still live.
     """
-    total_users = auth_repo.collection.count_documents({"is_deleted": False})
-    total_projects = project_repo.collection.count_documents({"is_deleted": False})
-    total_tasks = task_repo.collection.count_documents({"is_deleted": False})
+    project_tasks = task_repo.collection.count_documents({"project_id": project_id, "is_deleted": False})
+    stats_counter_repo.increment({GLOBAL_STATS_SCOPE: {"projects": -1, "tasks": -project_tasks}})
+
+
+def record_user_created():
+    stats_counter_repo.increment({GLOBAL_STATS_SCOPE: {"users": 1}})
+
+
+def _status_breakdown(counters: Dict[str, Any]) -> Dict[str, int]:
+    return {status: count for status, count in counters.get("status", {}).items() if count}
+
 
+def get_global_overview_stats() -> Dict[str, Any]:
+    """
+    Returns high-level statistics for the entire application, read from a single counters document.
+    """
+    counters = stats_counter_repo.get(GLOBAL_STATS_SCOPE)
     return {
-        "total_users": total_users,
-        "total_projects": total_projects,
-        "total_tasks": total_tasks,
+        "total_users": counters.get("users", 0),
+        "total_projects": counters.get("projects", 0),
+        "total_tasks": counters.get("tasks", 0),
     }
 
 
 def get_user_overview_stats(user_id: str) -> Dict[str, Any]:
     """
-    Calculates statistics specific to a single user.
+    Returns statistics specific to a single user.
     """
-    # Count projects user is a member of or created
-    projects_count = project_repo.collection.count_documents({
-        "$or": [{"created_by": user_id}, {"members": user_id}],
-        "is_deleted": False
-    })
-
-    # Count tasks assigned to the user
-    assigned_tasks_count = task_repo.collection.count_documents({
-        "assignee": user_id,
-        "is_deleted": False
-    })
-
-    # Get breakdown of assigned tasks by status
-    pipeline = [
-        {"$match": {"assignee": user_id, "is_deleted": False}},
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    task_status_breakdown = {item['_id']: item['count'] for item in task_repo.collection.aggregate(pipeline)}
+    # Count projects user is a member of or created, served from the membership index
+    projects_count = membership_repo.count_for_user(user_id)
+    counters = stats_counter_repo.get(user_stats_scope(user_id))
 
     return {
         "projects_count": projects_count,
-        "assigned_tasks_count": assigned_tasks_count,
-        "task_status_breakdown": task_status_breakdown,
+        "assigned_tasks_count": counters.get("tasks", 0),
+        "task_status_breakdown": _status_breakdown(counters),
     }
 
 
+def _project_dashboard_pipeline(object_ids: List[ObjectId], now: datetime) -> List[Dict[str, Any]]:
+    """
+    One aggregation over the projects collection that returns, per project, its member count and
+    a $facet over its non-deleted tasks (total, status breakdown, overdue, open tasks per assignee).
+    """
+    open_match = {"status": {"$ne": TaskStatus.DONE.value}}
+    return [
+        {"$match": {"_id": {"$in": object_ids}, "is_deleted": False}},
+        {"$project": {"member_count": {"$add": [{"$size": {"$ifNull": ["$members", []]}}, 1]}}},  # +1 for the creator
+        {"$lookup": {
+            "from": task_repo.collection.name,
+            "let": {"project_id": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$project_id", "$$project_id"]}, "is_deleted": False}},
+                {"$facet": {
+                    "total": [{"$count": "count"}],
+                    "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                    "overdue": [{"$match": {**open_match, "due_date": {"$lt": now}}}, {"$count": "count"}],
+                    "open_by_assignee": [{"$match": open_match}, {"$group": {"_id": "$assignee", "count": {"$sum": 1}}}],
+                }},
+            ],
+            "as": "tasks",
+        }},
+    ]
+
+
+def _dashboard_from_facets(project: Dict[str, Any]) -> Dict[str, Any]:
+    facets = project["tasks"][0] if project.get("tasks") else {}
+    total = facets.get("total") or [{"count": 0}]
+    overdue = facets.get("overdue") or [{"count": 0}]
+    return {
+        "member_count": project["member_count"],
+        "total_tasks_in_project": total[0]["count"],
+        "task_status_breakdown": {_status_value(item["_id"]): item["count"] for item in facets.get("by_status", [])},
+        "overdue_tasks_count": overdue[0]["count"],
+        "open_tasks_by_assignee": {item["_id"]: item["count"] for item in facets.get("open_by_assignee", [])},
+    }
+
+
+def get_projects_dashboard_stats(project_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns dashboard statistics for several projects in a single aggregation round trip,
+    keyed by project ID. Missing or deleted projects are left out.
+    """
+    object_ids = [ObjectId(pid) for pid in dict.fromkeys(project_ids) if ObjectId.is_valid(pid)]
+    if not object_ids:
+        return {}
+    pipeline = _project_dashboard_pipeline(object_ids, datetime.utcnow())
+    return {str(project["_id"]): _dashboard_from_facets(project) for project in project_repo.collection.aggregate(pipeline)}
+
+
 def get_project_dashboard_stats(project_id: str) -> Dict[str, Any]:
     """
-    Calculates detailed statistics for a single project dashboard.
+    Returns detailed statistics for a single project dashboard.
     """
-    project = project_repo.get_by_id(project_id)
-    if not project:
+    stats = get_projects_dashboard_stats([project_id]).get(project_id)
+    if stats is None:
         raise ValueError("Project not found")
+    return stats
 
-    member_count = len(project.get("members", [])) + 1  # +1 for the creator
 
-    total_tasks_in_project = task_repo.collection.count_documents({
-        "project_id": project_id,
-        "is_deleted": False
-    })
-
-    # Get breakdown of project tasks by status
+def reconcile_counters():
+    """
+    Recomputes every counter from the source collections and overwrites the stored values,
+    correcting drift from failed increments or writes that bypass the services (cascade
+    deletes, Jira pulls). Scopes that no longer have any task are reset to zero.
+    """
+    log_name = inspect.stack()[0]
+    computed: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"tasks": 0, "status": {}})
+    total_tasks = 0
     pipeline = [
-        {"$match": {"project_id": project_id, "is_deleted": False}},
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        {"$match": {"is_deleted": False}},
+        {"$group": {"_id": {"assignee": "$assignee", "status": "$status"}, "count": {"$sum": 1}}}
     ]
-    task_status_breakdown = {item['_id']: item['count'] for item in task_repo.collection.aggregate(pipeline)}
+    for item in task_repo.collection.aggregate(pipeline):
+        key, count = item["_id"], item["count"]
+        status = _status_value(key.get("status") or TaskStatus.TODO)
+        total_tasks += count
+        scope = user_stats_scope(key["assignee"])
+        computed[scope]["tasks"] += count
+        computed[scope]["status"][status] = computed[scope]["status"].get(status, 0) + count
 
-    return {
-        "member_count": member_count,
-        "total_tasks_in_project": total_tasks_in_project,
-        "task_status_breakdown": task_status_breakdown,
-    }
\ No newline at end of file
+    # Per-project counters ('project:<id>') were replaced by the dashboard aggregation.
+    obsolete = []
+    for scope in stats_counter_repo.get_all_scopes():
+        if scope == GLOBAL_STATS_SCOPE or scope in computed:
+            continue
+        if scope.startswith(user_stats_scope("")):
+            computed[scope] = {"tasks": 0, "status": {}}
+        else:
+            obsolete.append(scope)
+    stats_counter_repo.delete_scopes(obsolete)
+    computed[GLOBAL_STATS_SCOPE] = {
+        "users": auth_repo.collection.count_documents({"is_deleted": False}),
+        "projects": project_repo.collection.count_documents({"is_deleted": False}),
+        "tasks": total_tasks,
+    }
+    written = stats_counter_repo.replace_all(dict(computed))
+    logs.define_logger(logging.INFO, None, log_name, message=f"Stat counter reconciliation: {len(computed)} scopes recomputed, {written} corrected.")
@@ -1,32 +1,47 @@
 import logging
 import inspect
-from typing import Dict, Any, Optional, List
+import base64
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from datetime import datetime
+from bson import ObjectId, json_util
 from app.core.logger import logs
 from app.repos.task_repo import task_repo
-from app.models.task_model import Task, TaskCreate, TaskUpdate
+from app.models.task_model import Task, TaskCreate, TaskUpdate, TaskListFilter, TaskSortField, TaskStatus
 from app.repos.project_repo import project_repo
+from app.repos.membership_repo import membership_repo
+from app.repos.version_repo import version_repo, project_tasks_scope
 from app.services import notification_service # Import the new service
+from app.services import stats_service, retrieval_service
+from app.services.reminder_service import reminder_scheduler
+from app.utils.dates import to_naive_utc
 
 # Assume task_repo and project_repo are instantiated and configured
 # task_repo = TaskRepo(collection=db.tasks)
 # project_repo = ProjectRepo(collection=db.projects)
 
+class TaskVersionConflict(Exception):
+    """Raised when a task was modified after the version the client based its update on."""
+    def __init__(self, task_id: str, current_version: Optional[int]):
+        self.task_id = task_id
+        self.current_version = current_version
+        super().__init__(f"Task '{task_id}' was modified concurrently (current version: {current_version}).")
+
+def _after_write(task_id: str, hook: Callable[..., Any], *args: Any):
+    """
+    Runs a hook that maintains derived data (stats, search index, reminders) after a task write has
+    committed. A failing hook is logged rather than raised, so it cannot fail the request.
+    """
+    try:
+        hook(*args)
+    except Exception as e:
+        logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Post-write hook '{hook.__qualname__}' failed for task '{task_id}': {e}")
+
 def _is_user_valid_for_assignment(project_id: str, user_id: str) -> bool:
     """
     Checks if a user can be assigned a task in a project.
-    The user must be the project creator or a member.
+    The user must be the project creator or a member; served from the cached membership index.
     """
-    project = project_repo.get_by_id(project_id)
-    if not project:
-        return False # Project doesn't exist, so assignment is invalid.
-
-    # Check if the user is the creator
-    if project.get("created_by") == user_id:
-        return True
-    
-    # Check if the user is in the members list
-    return user_id in project.get("members", [])
+    return membership_repo.is_member(project_id, user_id)
 
 
 async def create_task(project_id: str, task_data: TaskCreate, creator_id: str) -> Task:
@@ -59,13 +74,17 @@ async def create_task(project_id: str, task_data: TaskCreate, creator_id: str) -
             raise Exception("Failed to create or retrieve the new task.")
         
         new_task = Task.model_validate(new_task_doc)
+        _after_write(new_task.task_id, stats_service.record_tasks_created, [new_task_doc])
+        _after_write(new_task.task_id, retrieval_service.index_tasks, [new_task_doc])
+        _after_write(new_task.task_id, reminder_scheduler.track, new_task_doc)
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully created new task with ID: {new_task.task_id}")
         
         # --- NOTIFICATION ---
         # Create a notification for the assignee
         await notification_service.create_notification(
             user_id=new_task.assignee,
-            message=f"You have been assigned a new task: '{new_task.title}'"
+            message=f"You have been assigned a new task: '{new_task.title}'",
+            project_id=project_id
         )
         return new_task
     except Exception as e:
@@ -85,6 +104,12 @@ def get_task(task_id: str) -> Optional[Task]:
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully fetched task ID: {task_id}")
     return Task.model_validate(task_doc)
 
+def get_tasks_version(project_id: str) -> int:
+    """
+    Retrieves the version of a project's task list without reading the tasks.
+    """
+    return version_repo.get(project_tasks_scope(project_id))
+
 def get_tasks_for_project(project_id: str) -> List[Task]:
     """
     Retrieves all tasks for a specific project.
@@ -94,9 +119,88 @@ def get_tasks_for_project(project_id: str) -> List[Task]:
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Found {len(task_docs)} tasks for project ID: {project_id}")
     return [Task.model_validate(doc) for doc in task_docs]
 
-async def update_task(task_id: str, task_update: TaskUpdate) -> Optional[Task]:
+def _encode_cursor(doc: Dict[str, Any], sort_field: str, descending: bool) -> str:
     """
-    Updates an existing task by its ID.
+    Encodes the sort value and _id of the last document of a page into an opaque cursor, along
+    with the sort it belongs to.
+    """
+    raw = json_util.dumps({"s": sort_field, "d": descending, "v": doc.get(sort_field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str, sort_field: str, descending: bool) -> Tuple[Any, Any]:
+    """
+    Decodes a cursor produced by `_encode_cursor` back into a (sort value, _id) pair.
+    A cursor from another sort is rejected: its value would be compared against the wrong field.
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if payload["s"] != sort_field or payload["d"] != descending:
+            raise ValueError
+        return payload["v"], payload["id"]
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
+
+def _build_task_filter_query(filters: TaskListFilter) -> Dict[str, Any]:
+    """Translates a TaskListFilter into Mongo conditions on the Tasks collection."""
+    conditions: List[Dict[str, Any]] = []
+    if filters.status:
+        conditions.append({"status": {"$in": [s.value for s in filters.status]}})
+    if filters.assignee:
+        conditions.append({"assignee": filters.assignee})
+
+    due_range: Dict[str, Any] = {}
+    if filters.due_after:
+        due_range["$gte"] = filters.due_after
+    if filters.due_before:
+        due_range["$lte"] = filters.due_before
+    if due_range:
+        conditions.append({"due_date": due_range})
+
+    if filters.overdue is not None:
+        overdue_condition = {"due_date": {"$lt": datetime.utcnow()}, "status": {"$ne": TaskStatus.DONE.value}}
+        conditions.append(overdue_condition if filters.overdue else {"$nor": [overdue_condition]})
+
+    return {"$and": conditions} if conditions else {}
+
+def query_tasks_for_project(
+    project_id: str,
+    filters: TaskListFilter,
+    sort_by: TaskSortField = TaskSortField.CREATED_AT,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Task], Optional[str]]:
+    """
+    Retrieves a filtered, sorted page of tasks for a project.
+    Returns the tasks and the cursor of the next page (None on the last page).
+    """
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Querying tasks for project ID: {project_id} (sort: {sort_by.value}, limit: {limit})")
+    after = _decode_cursor(cursor, sort_by.value, descending) if cursor else None
+
+    # Fetch one extra document to know whether another page exists.
+    task_docs = task_repo.find_page_for_project(
+        project_id,
+        _build_task_filter_query(filters),
+        sort_field=sort_by.value,
+        descending=descending,
+        limit=limit + 1 if limit is not None else None,
+        after=after
+    )
+
+    next_cursor = None
+    if limit is not None and len(task_docs) > limit:
+        task_docs = task_docs[:limit]
+        next_cursor = _encode_cursor(task_docs[-1], sort_by.value, descending)
+
+    logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Found {len(task_docs)} tasks for project ID: {project_id}")
+    return [Task.model_validate(doc) for doc in task_docs], next_cursor
+
+async def update_task(task_id: str, task_update: TaskUpdate, expected_version: Optional[int] = None) -> Optional[Task]:
+    """
+    Updates an existing task by its ID with a single conditional write.
+
+    :param expected_version: The version the client last read (from If-Match). If the task has
+        changed since, TaskVersionConflict is raised instead of overwriting the other update.
     """
     logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Attempting to update task ID: {task_id}")
     
@@ -105,32 +209,45 @@ async def update_task(task_id: str, task_update: TaskUpdate) -> Optional[Task]:
         logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Update operation cancelled for task ID '{task_id}': No update data provided.")
         raise ValueError("No update data provided.")
     
-    # If the assignee is being updated, validate the new assignee
-    if 'assignee' in update_data:
-        task_doc = task_repo.get_by_id(task_id)
-        if not task_doc:
-            raise ValueError(f"Task with ID '{task_id}' not found.")
-        project_id = task_doc.get("project_id")
-        if not _is_user_valid_for_assignment(project_id, update_data['assignee']):
-            raise ValueError(f"New assignee with ID '{update_data['assignee']}' is not a valid member of the project.")
+    # A new assignee must belong to the task's project. Rather than reading the task first, the
+    # write is restricted to the projects the assignee belongs to (from the membership cache).
+    allowed_project_ids = membership_repo.get_project_id_set(update_data['assignee']) if 'assignee' in update_data else None
 
+    if 'due_date' in update_data:
+        # Stored as naive UTC, so the returned document compares with the ones read from Mongo.
+        update_data['due_date'] = to_naive_utc(update_data['due_date'])
     update_data['updated_at'] = datetime.utcnow()
     
     try:
-        updated_task_doc = task_repo.update_task(task_id, update_data)
-        if not updated_task_doc:
-            logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Task with ID '{task_id}' not found for update.")
-            return None
+        result = task_repo.update_task(task_id, update_data, expected_version, allowed_project_ids)
+        if not result:
+            # Only the failure path pays for a read, to report which condition failed.
+            current_doc = task_repo.get_by_id(task_id) if ObjectId.is_valid(task_id) else None
+            if not current_doc:
+                logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Task with ID '{task_id}' not found for update.")
+                return None
+            if allowed_project_ids is not None and current_doc.get("project_id") not in allowed_project_ids:
+                raise ValueError(f"New assignee with ID '{update_data['assignee']}' is not a valid member of the project.")
+            logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Update of task '{task_id}' rejected: expected version {expected_version}, found {current_doc.get('version')}.")
+            raise TaskVersionConflict(task_id, current_doc.get("version"))
         
+        previous_task_doc, updated_task_doc = result
+        _after_write(task_id, stats_service.record_task_updated, previous_task_doc, updated_task_doc)
+        if 'title' in update_data or 'description' in update_data:
+            _after_write(task_id, retrieval_service.index_tasks, [updated_task_doc])
+        if 'due_date' in update_data or 'status' in update_data:
+            _after_write(task_id, reminder_scheduler.track, updated_task_doc)
         logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully updated task ID: {task_id}")
         updated_task = Task.model_validate(updated_task_doc)
 
         # --- NOTIFICATION ---
         # If the assignee was changed, notify the new assignee
         if 'assignee' in update_data:
-            await notification_service.create_notification(user_id=updated_task.assignee, message=f"A task has been assigned to you: '{updated_task.title}'")
+            await notification_service.create_notification(user_id=updated_task.assignee, message=f"A task has been assigned to you: '{updated_task.title}'", project_id=updated_task.project_id)
 
         return updated_task
+    except (ValueError, TaskVersionConflict):
+        raise
     except Exception as e:
         logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"An unexpected error occurred during task update for ID: {task_id}. Error: {str(e)}")
         raise
@@ -147,8 +264,12 @@ def delete_task(task_id: str) -> bool:
         return False
         
     try:
-        is_deleted = task_repo.delete_task(task_id)
+        deleted_doc = task_repo.delete_task(task_id)
+        is_deleted = deleted_doc is not None
         if is_deleted:
+            _after_write(task_id, stats_service.record_task_deleted, deleted_doc)
+            _after_write(task_id, retrieval_service.remove_task, deleted_doc)
+            _after_write(task_id, reminder_scheduler.untrack, task_id)
             logs.define_logger(level=logging.INFO, loggName=inspect.stack()[0], message=f"Successfully soft-deleted task ID: {task_id}")
         else:
             logs.define_logger(level=logging.WARNING, loggName=inspect.stack()[0], message=f"Task with ID '{task_id}' was not deleted. It might have already been deleted or not found.")
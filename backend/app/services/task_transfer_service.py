@@ -0,0 +1,216 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import inspect
+from collections import Counter
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator, Tuple, Callable
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.task_model import TaskCreate
+from app.repos.membership_repo import membership_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+from app.services import notification_service, stats_service, retrieval_service
+from app.services.reminder_service import reminder_scheduler
+from app.utils.dates import to_naive_utc
+
+# Columns of an import row, in CSV header order. Exports add the task ID in front.
+TASK_COLUMNS = ("title", "description", "assignee", "due_date", "status")
+EXPORT_PROJECTION = {field: 1 for field in TASK_COLUMNS}
+
+
+class TransferFormat(str, Enum):
+    """Wire formats for task import and export."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a stream of byte chunks into decoded lines without buffering the whole body."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def _iter_records(chunks: AsyncIterator[bytes], fmt: TransferFormat) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yields (row number, record) pairs from a CSV or NDJSON stream. A record is a dict, or an
+    Exception if the row could not be parsed. Quoted CSV fields may span lines.
+    """
+    header: Optional[List[str]] = None
+    row_number = 0
+    pending = ""
+    async for line in _iter_lines(chunks):
+        if fmt == TransferFormat.NDJSON:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+                yield row_number, record if isinstance(record, dict) else ValueError("Each line must be a JSON object.")
+            except json.JSONDecodeError as e:
+                yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+
+        # CSV: keep reading while a quoted field is still open.
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}.")
+            continue
+        yield row_number, {column: value for column, value in zip(header, values) if value != ""}
+    if pending:
+        row_number += 1
+        yield row_number, ValueError("Unterminated quoted field.")
+
+
+def _after_insert(hook: Callable[..., Any], *args: Any):
+    """
+    Runs a hook that maintains derived data for inserted rows. The rows are already stored, so a
+    failure is logged rather than raised: it must not abort the import stream.
+    """
+    try:
+        hook(*args)
+    except Exception as e:
+        logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Post-insert hook '{hook.__qualname__}' failed during task import: {e}")
+
+
+def _insert_batch(batch: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Inserts a batch of validated rows with one insert_many and returns their per-row results."""
+    docs = [doc for _, doc in batch]
+    try:
+        task_ids = task_repo.create_tasks(docs)
+    except Exception as e:
+        logs.define_logger(level=logging.ERROR, loggName=inspect.stack()[0], message=f"Task import batch of {len(batch)} rows failed: {e}")
+        return [{"row": row, "status": "error", "error": "Database error while inserting this batch."} for row, _ in batch]
+    _after_insert(stats_service.record_tasks_created, docs)
+    _after_insert(retrieval_service.index_tasks, docs)
+    for doc in docs:
+        _after_insert(reminder_scheduler.track, doc)
+    return [{"row": row, "status": "created", "task_id": str(task_id)} for (row, _), task_id in zip(batch, task_ids)]
+
+
+async def import_tasks(project_id: str, creator_id: str, chunks: AsyncIterator[bytes], fmt: TransferFormat) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Imports tasks from a streamed CSV or NDJSON body, yielding one result per row as it is processed
+    and a final summary.
+
+    Assignees are validated against the project's member set, loaded once. Valid rows are inserted
+    in batches of TASK_IMPORT_BATCH_SIZE, and each assignee gets a single notification at the end.
+    """
+    log_name = inspect.stack()[0]
+    project = await asyncio.to_thread(project_repo.get_by_id, project_id)
+    if not project:
+        raise ValueError(f"Project with ID '{project_id}' not found.")
+    member_ids = set(await asyncio.to_thread(membership_repo.get_member_ids, project_id))
+    logs.define_logger(logging.INFO, None, log_name, message=f"Importing tasks into project '{project_id}' ({fmt.value}, {len(member_ids)} members).")
+
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    assigned = Counter()
+    created = failed = 0
+
+    async def flush():
+        nonlocal created, failed
+        results = await asyncio.to_thread(_insert_batch, batch)
+        for result, (_, doc) in zip(results, batch):
+            if result["status"] == "created":
+                created += 1
+                assigned[doc["assignee"]] += 1
+            else:
+                failed += 1
+        batch.clear()
+        return results
+
+    async for row, record in _iter_records(chunks, fmt):
+        if isinstance(record, Exception):
+            failed += 1
+            yield {"row": row, "status": "error", "error": str(record)}
+            continue
+        try:
+            task_data = TaskCreate.model_validate(record)
+        except ValidationError as e:
+            failed += 1
+            yield {"row": row, "status": "error", "error": "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())}
+            continue
+        if task_data.assignee not in member_ids:
+            failed += 1
+            yield {"row": row, "status": "error", "error": f"Assignee with ID '{task_data.assignee}' is not a valid member of this project."}
+            continue
+
+        now = datetime.utcnow()
+        doc = task_data.model_dump()
+        # Stored as naive UTC, the form Mongo returns datetimes in.
+        doc["due_date"] = to_naive_utc(doc["due_date"])
+        doc.update({"project_id": project_id, "created_by": creator_id, "created_at": now, "updated_at": now})
+        batch.append((row, doc))
+        if len(batch) >= settings.TASK_IMPORT_BATCH_SIZE:
+            for result in await flush():
+                yield result
+
+    if batch:
+        for result in await flush():
+            yield result
+
+    # One notification per assignee, however many tasks they received.
+    await notification_service.create_notifications([
+        {
+            "user_id": user_id,
+            "message": f"You have been assigned {count} new task{'s' if count > 1 else ''} in '{project.get('project_name')}'.",
+            "project_id": project_id
+        }
+        for user_id, count in assigned.items()
+    ])
+    logs.define_logger(logging.INFO, None, log_name, message=f"Task import into project '{project_id}' finished: {created} created, {failed} failed.")
+    yield {"summary": {"created": created, "failed": failed}}
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def export_tasks(project_id: str, fmt: TransferFormat) -> Iterator[str]:
+    """
+    Streams the tasks of a project as CSV or NDJSON, one cursor batch in memory at a time.
+    The output uses the import columns (plus the task ID), so it can be imported again.
+    """
+    columns = ("task_id",) + TASK_COLUMNS
+    if fmt == TransferFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+    for doc in task_repo.iter_for_project(project_id, EXPORT_PROJECTION, settings.TASK_EXPORT_BATCH_SIZE):
+        row = {"task_id": str(doc["_id"]), **{field: _export_value(doc.get(field)) for field in TASK_COLUMNS}}
+        if fmt == TransferFormat.NDJSON:
+            yield json.dumps(row) + "\n"
+            continue
+        writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if fmt == TransferFormat.CSV and buffer.tell():
+        yield buffer.getvalue()
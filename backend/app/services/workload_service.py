@@ -0,0 +1,153 @@
+import logging
+import inspect
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.logger import logs
+from app.models.task_model import TaskStatus
+from app.repos.auth_repo import auth_repo
+from app.repos.project_repo import project_repo
+from app.repos.task_repo import task_repo
+from app.repos.version_repo import version_repo, project_tasks_scope
+from app.utils.cache import TTLCache
+
+STATUSES = [task_status.value for task_status in TaskStatus]
+DONE_INDEX = STATUSES.index(TaskStatus.DONE.value)
+WORKLOAD_PROJECTION = {"project_id": 1, "assignee": 1, "status": 1, "due_date": 1, "_id": 0}
+
+# project set -> (task versions of those projects, report). A task write in any of the projects
+# bumps its version, so a cached report is only served while the fingerprint still matches.
+_report_cache = TTLCache(settings.WORKLOAD_CACHE_MAX_ENTRIES, settings.WORKLOAD_CACHE_TTL_SECONDS)
+
+
+def _load_columns(project_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Reads the task fields the report needs through one projected cursor into column arrays."""
+    projects, assignees, statuses, due_dates = [], [], [], []
+    status_codes = {task_status: index for index, task_status in enumerate(STATUSES)}
+    for doc in task_repo.iter_for_projects(project_ids, WORKLOAD_PROJECTION, settings.WORKLOAD_REPORT_BATCH_SIZE):
+        projects.append(doc["project_id"])
+        assignees.append(doc.get("assignee") or "")
+        statuses.append(status_codes.get(doc.get("status"), 0))
+        due_dates.append(doc.get("due_date"))
+    return (
+        np.array(projects, dtype=object),
+        np.array(assignees, dtype=object),
+        np.array(statuses, dtype=np.int64),
+        np.array([np.datetime64(due, "s") if due else np.datetime64("NaT") for due in due_dates], dtype="datetime64[s]"),
+    )
+
+
+def _group_counts(codes: np.ndarray, size: int) -> np.ndarray:
+    return np.bincount(codes, minlength=size) if codes.size else np.zeros(size, dtype=np.int64)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.round(np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0), 4)
+
+
+def _build_report(project_ids: List[str]) -> Dict[str, Any]:
+    """
+    Computes the users x projects x status x due-week workload of a set of projects with
+    vectorized group-bys (bincount over combined group codes) instead of per-user queries.
+    """
+    now = datetime.utcnow()
+    week_start = datetime(now.year, now.month, now.day) - timedelta(days=now.weekday())
+    weeks = settings.WORKLOAD_REPORT_WEEKS
+
+    project_col, assignee_col, status_col, due_col = _load_columns(project_ids)
+    user_ids, user_codes = np.unique(assignee_col, return_inverse=True) if assignee_col.size else (np.array([], dtype=object), np.array([], dtype=np.int64))
+    project_index = {project_id: index for index, project_id in enumerate(project_ids)}
+    project_codes = np.array([project_index[project_id] for project_id in project_col], dtype=np.int64)
+    n_users, n_projects, n_statuses = len(user_ids), len(project_ids), len(STATUSES)
+
+    is_open = status_col != DONE_INDEX
+    has_due = ~np.isnat(due_col)
+    is_overdue = is_open & has_due & (due_col < np.datetime64(now, "s"))
+    # Due-week buckets relative to this week: 0..2*weeks for weeks -weeks..+weeks (ends are open-ended),
+    # plus a last bucket for tasks without a due date.
+    week_offsets = np.zeros(due_col.shape, dtype=np.int64)
+    week_offsets[has_due] = (due_col[has_due] - np.datetime64(week_start, "s")).astype("timedelta64[D]").astype(np.int64) // 7
+    week_codes = np.where(has_due, np.clip(week_offsets, -weeks, weeks) + weeks, 2 * weeks + 1)
+    n_weeks = 2 * weeks + 2
+
+    user_status = _group_counts(user_codes * n_statuses + status_col, n_users * n_statuses).reshape(n_users, n_statuses)
+    user_open = user_status.sum(axis=1) - user_status[:, DONE_INDEX]
+    user_overdue = _group_counts(user_codes[is_overdue], n_users)
+    user_weeks = _group_counts(user_codes[is_open] * n_weeks + week_codes[is_open], n_users * n_weeks).reshape(n_users, n_weeks)
+    project_status = _group_counts(project_codes * n_statuses + status_col, n_projects * n_statuses).reshape(n_projects, n_statuses)
+    project_open = project_status.sum(axis=1) - project_status[:, DONE_INDEX]
+    project_overdue = _group_counts(project_codes[is_overdue], n_projects)
+
+    # The user x project x status cube is sparse, so only its non-empty cells are materialized.
+    cells, cell_counts = np.unique((user_codes * n_projects + project_codes) * n_statuses + status_col, return_counts=True)
+    user_projects: List[Dict[str, Dict[str, int]]] = [{} for _ in range(n_users)]
+    for cell, count in zip(cells.tolist(), cell_counts.tolist()):
+        user_code, rest = divmod(cell, n_projects * n_statuses)
+        project_code, status_code = divmod(rest, n_statuses)
+        user_projects[user_code].setdefault(project_ids[project_code], {})[STATUSES[status_code]] = count
+
+    usernames = {
+        str(doc["_id"]): doc.get("username")
+        for doc in auth_repo.collection.find({"_id": {"$in": [ObjectId(uid) for uid in user_ids if ObjectId.is_valid(uid)]}}, {"username": 1})
+    }
+    project_names = {str(doc["_id"]): doc.get("project_name") for doc in project_repo.get_by_ids(project_ids)}
+    week_labels = [(week_start + timedelta(weeks=offset)).date().isoformat() for offset in range(-weeks, weeks + 1)] + ["none"]
+    user_overdue_ratio = _ratio(user_overdue, user_open)
+    project_overdue_ratio = _ratio(project_overdue, project_open)
+
+    return {
+        "generated_at": now.isoformat(),
+        "task_count": int(status_col.size),
+        "due_weeks": week_labels,
+        "users": [
+            {
+                "user_id": user_id,
+                "username": usernames.get(user_id),
+                "open_tasks": int(user_open[code]),
+                "overdue_tasks": int(user_overdue[code]),
+                "overdue_ratio": float(user_overdue_ratio[code]),
+                "task_status_breakdown": dict(zip(STATUSES, user_status[code].tolist())),
+                "open_tasks_by_due_week": user_weeks[code].tolist(),
+                "projects": user_projects[code],
+            }
+            for code, user_id in enumerate(user_ids.tolist())
+        ],
+        "projects": [
+            {
+                "project_id": project_id,
+                "project_name": project_names.get(project_id),
+                "open_tasks": int(project_open[code]),
+                "overdue_tasks": int(project_overdue[code]),
+                "overdue_ratio": float(project_overdue_ratio[code]),
+                "task_status_breakdown": dict(zip(STATUSES, project_status[code].tolist())),
+            }
+            for code, project_id in enumerate(project_ids)
+        ],
+    }
+
+
+def get_workload_report(project_ids: List[str]) -> Dict[str, Any]:
+    """
+    Returns the workload report of a set of projects. Reports are cached per project set and
+    rebuilt as soon as a task of any of the projects changes.
+    """
+    project_ids = sorted(set(project_ids))
+    cache_key = tuple(project_ids)
+    fingerprint = tuple(version_repo.get_many([project_tasks_scope(project_id) for project_id in project_ids]).values())
+    cached = _report_cache.get(cache_key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    started = datetime.utcnow()
+    report = _build_report(project_ids)
+    _report_cache.set(cache_key, (fingerprint, report))
+    logs.define_logger(
+        level=logging.INFO,
+        loggName=inspect.stack()[0],
+        message=f"Built workload report over {len(project_ids)} projects and {report['task_count']} tasks in {(datetime.utcnow() - started).total_seconds():.3f}s."
+    )
+    return report
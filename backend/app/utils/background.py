@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import inspect
+from typing import Callable, List, Any
+
+from app.core.logger import logs
+
+
+class BackgroundRunner:
+    """
+    Owns the long-running asyncio tasks started by the application (periodic jobs and workers),
+    so they can all be cancelled together on shutdown.
+    """
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, name: str, coro) -> asyncio.Task:
+        """Schedules a coroutine as a named background task."""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.append(task)
+        task.add_done_callback(self._tasks_done)
+        return task
+
+    def start_periodic(self, name: str, interval_seconds: float, func: Callable[..., Any], *args, run_immediately: bool = True) -> asyncio.Task:
+        """
+        Runs a blocking function every `interval_seconds` in a worker thread.
+        Failures are logged and do not stop the schedule.
+        """
+        return self.start(name, self._periodic(name, interval_seconds, func, args, run_immediately))
+
+    async def _periodic(self, name: str, interval_seconds: float, func: Callable[..., Any], args: tuple, run_immediately: bool):
+        log_name = inspect.stack()[0]
+        if not run_immediately:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await asyncio.to_thread(func, *args)
+            except Exception as e:
+                logs.define_logger(logging.ERROR, None, log_name, message=f"Periodic job '{name}' failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def _tasks_done(self, task: asyncio.Task):
+        if task in self._tasks:
+            self._tasks.remove(task)
+        if not task.cancelled() and task.exception() is not None:
+            logs.define_logger(logging.ERROR, None, inspect.stack()[0], message=f"Background task '{task.get_name()}' crashed: {task.exception()}")
+
+    async def shutdown(self):
+        """Cancels every running background task and waits for them to finish."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+# A single, shared instance for the entire application
+background_runner = BackgroundRunner()
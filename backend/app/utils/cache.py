@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    A small thread-safe in-process cache with least-recently-used eviction and a time-to-live.
+    Entries are only as fresh as the TTL across processes; writers in this process should call
+    `invalidate` so their own reads never see stale values.
+    """
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Stores a value, evicting the least recently used entry if the cache is full."""
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable):
+        """Drops the given keys."""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
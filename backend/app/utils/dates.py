@@ -0,0 +1,12 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Converts a datetime to the naive UTC form Mongo returns, so values written by the app compare
+    with values read back. Naive datetimes are assumed to be UTC already and returned unchanged.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
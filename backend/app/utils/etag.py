@@ -0,0 +1,58 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+
+
+def build_etag(*parts) -> str:
+    """
+    Builds a strong ETag from version counters and any other values the representation depends on.
+    """
+    raw = "|".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Returns True if the request's If-None-Match header matches the given ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Accept weak validators too, since proxies may downgrade strong ones.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def version_etag(version: int) -> str:
+    """
+    Builds the ETag of a single versioned document. The version itself is used, so clients
+    can send it back in If-Match for optimistic concurrency.
+    """
+    return f'"{version}"'
+
+
+def parse_if_match(request: Request) -> Optional[int]:
+    """
+    Reads the document version from the If-Match header. Returns None if the header is absent or '*'.
+    Raises ValueError if it does not hold a version produced by `version_etag`.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+    try:
+        return int(header.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise ValueError("If-Match must hold the task version, e.g. \"3\".")
+
+
+def set_etag(response: Response, etag: str):
+    """Attaches the ETag and a cache policy that forces clients to revalidate."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    """Builds an empty 304 response carrying the current ETag."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,262 @@
+"""
+A small in-memory stand-in for the Jira REST API, used to exercise the Jira
+integration (project outbox worker, task/issue sync) locally without a real Jira instance.
+
+Run it with:
+    python -m app.utils.fake_jira --port 8089
+and point JIRA_URL at http://127.0.0.1:8089 (any JIRA_USERNAME / JIRA_API_TOKEN works).
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+FAKE_ACCOUNT_ID = "fake-account-id"
+# Workflow of the fake projects: status name -> transition id.
+FAKE_TRANSITIONS = {"To Do": "11", "In Progress": "21", "Done": "31"}
+
+
+def _jira_timestamp(moment: datetime) -> str:
+    """Formats a datetime the way Jira does, e.g. 2024-01-31T12:00:00.000+0000."""
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}" + "+0000"
+
+
+class FakeJiraState:
+    """In-memory data and fault-injection knobs shared by all request handlers."""
+    def __init__(self, latency_seconds: float = 0.0, fail_next: int = 0):
+        self.lock = threading.Lock()
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self.issue_counters: Dict[str, int] = {}
+        self.latency_seconds = latency_seconds
+        # Number of upcoming write requests to answer with a 503, to exercise retries.
+        self.fail_next = fail_next
+        self.request_log: list = []
+
+    def create_issue(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Creates an issue from a 'fields' payload and returns it."""
+        with self.lock:
+            project_key = fields["project"]["key"]
+            self.issue_counters[project_key] = self.issue_counters.get(project_key, 0) + 1
+            key = f"{project_key}-{self.issue_counters[project_key]}"
+            issue = {
+                "id": str(20000 + len(self.issues)),
+                "key": key,
+                "fields": {
+                    "project": {"key": project_key},
+                    "summary": fields.get("summary"),
+                    "description": fields.get("description"),
+                    "duedate": fields.get("duedate"),
+                    "status": {"name": "To Do"},
+                    "updated": _jira_timestamp(datetime.now(timezone.utc)),
+                },
+            }
+            self.issues[key] = issue
+            return issue
+
+    def touch(self, issue: Dict[str, Any]):
+        issue["fields"]["updated"] = _jira_timestamp(datetime.now(timezone.utc))
+
+    def search(self, jql: str) -> list:
+        """Supports the JQL shape used by the sync: project = KEY [AND updated >= -Nm]."""
+        project = re.search(r'project\s*=\s*"?([A-Z0-9]+)"?', jql)
+        since = re.search(r'updated\s*>=\s*"?-(\d+)m"?', jql)
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=int(since.group(1))) if since else None
+        results = []
+        for issue in self.issues.values():
+            if project and issue["fields"]["project"]["key"] != project.group(1):
+                continue
+            updated = datetime.strptime(issue["fields"]["updated"], "%Y-%m-%dT%H:%M:%S.%f%z")
+            if cutoff and updated < cutoff:
+                continue
+            results.append(issue)
+        return sorted(results, key=lambda i: i["fields"]["updated"])
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return True
+            return False
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    state: FakeJiraState = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status_code: int, payload: Optional[Any] = None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _begin(self) -> str:
+        path = urlparse(self.path).path.rstrip("/")
+        self.state.request_log.append((self.command, path))
+        if self.state.latency_seconds:
+            time.sleep(self.state.latency_seconds)
+        return path
+
+    def _route(self, path: str) -> Optional[re.Match]:
+        return re.fullmatch(r"/rest/api/[23]/project/(?P<key>[^/]+)", path)
+
+    def _issue_route(self, path: str) -> Optional[re.Match]:
+        return re.fullmatch(r"/rest/api/[23]/issue/(?P<key>[^/]+?)(?P<transitions>/transitions)?", path)
+
+    def do_GET(self):
+        path = self._begin()
+        if path.endswith("/serverInfo"):
+            return self._send(200, {"baseUrl": f"http://{self.headers.get('Host')}", "version": "1001.0.0", "versionNumbers": [1001, 0, 0], "deploymentType": "Cloud", "serverTitle": "Fake Jira"})
+        if path.endswith("/myself"):
+            return self._send(200, {"accountId": FAKE_ACCOUNT_ID, "displayName": "Fake Lead", "active": True})
+        match = self._route(path)
+        if match:
+            project = self.state.projects.get(match["key"])
+            return self._send(200, project) if project else self._send(404, {"errorMessages": ["No project could be found with key."]})
+        match = self._issue_route(path)
+        if match:
+            issue = self.state.issues.get(match["key"])
+            if not issue:
+                return self._send(404, {"errorMessages": ["Issue does not exist."]})
+            if match["transitions"]:
+                transitions = [{"id": tid, "name": name, "to": {"name": name}} for name, tid in FAKE_TRANSITIONS.items() if name != issue["fields"]["status"]["name"]]
+                return self._send(200, {"transitions": transitions})
+            return self._send(200, issue)
+        return self._send(404, {"errorMessages": [f"Unknown path {path}"]})
+
+    def do_PUT(self):
+        path = self._begin()
+        data = self._read_json()
+        if self.state.should_fail():
+            return self._send(503, {"errorMessages": ["Service temporarily unavailable (injected)."]})
+        match = self._issue_route(path)
+        if match and not match["transitions"]:
+            issue = self.state.issues.get(match["key"])
+            if not issue:
+                return self._send(404, {"errorMessages": ["Issue does not exist."]})
+            with self.state.lock:
+                issue["fields"].update({k: v for k, v in data.get("fields", {}).items() if k in ("summary", "description", "duedate")})
+                self.state.touch(issue)
+            return self._send(204)
+        return self._send(404, {"errorMessages": [f"Unknown path {path}"]})
+
+    def do_POST(self):
+        path = self._begin()
+        data = self._read_json()
+        if self.state.should_fail():
+            return self._send(503, {"errorMessages": ["Service temporarily unavailable (injected)."]})
+        if re.fullmatch(r"/rest/api/[23]/project", path):
+            key = data.get("key")
+            with self.state.lock:
+                if key in self.state.projects:
+                    return self._send(400, {"errors": {"projectKey": "A project with that project key already exists."}})
+                project_id = str(10000 + len(self.state.projects))
+                self.state.projects[key] = {"id": project_id, "key": key, "name": data.get("name"), "description": data.get("description", ""), "lead": {"accountId": data.get("leadAccountId")}}
+            return self._send(201, {"id": int(project_id), "key": key, "self": f"http://{self.headers.get('Host')}/rest/api/2/project/{project_id}"})
+        if re.fullmatch(r"/rest/api/[23]/issue/bulk", path):
+            created, errors = [], []
+            for index, update in enumerate(data.get("issueUpdates", [])):
+                fields = update.get("fields", {})
+                if fields.get("project", {}).get("key") not in self.state.projects:
+                    errors.append({"status": 400, "failedElementNumber": index, "elementErrors": {"errors": {"project": "valid project is required"}}})
+                    continue
+                issue = self.state.create_issue(fields)
+                created.append({"id": issue["id"], "key": issue["key"]})
+            return self._send(201, {"issues": created, "errors": errors})
+        if re.fullmatch(r"/rest/api/[23]/search", path):
+            matches = self.state.search(data.get("jql", ""))
+            start, size = int(data.get("startAt", 0)), int(data.get("maxResults", 50))
+            return self._send(200, {"startAt": start, "maxResults": size, "total": len(matches), "issues": matches[start:start + size]})
+        match = self._issue_route(path)
+        if match and match["transitions"]:
+            issue = self.state.issues.get(match["key"])
+            target = {tid: name for name, tid in FAKE_TRANSITIONS.items()}.get(data.get("transition", {}).get("id"))
+            if not issue or not target:
+                return self._send(400, {"errorMessages": ["Invalid transition."]})
+            with self.state.lock:
+                issue["fields"]["status"] = {"name": target}
+                self.state.touch(issue)
+            return self._send(204)
+        return self._send(404, {"errorMessages": [f"Unknown path {path}"]})
+
+    def do_DELETE(self):
+        path = self._begin()
+        if self.state.should_fail():
+            return self._send(503, {"errorMessages": ["Service temporarily unavailable (injected)."]})
+        match = self._route(path)
+        if match:
+            with self.state.lock:
+                removed = self.state.projects.pop(match["key"], None)
+            return self._send(204) if removed else self._send(404, {"errorMessages": ["No project could be found with key."]})
+        match = self._issue_route(path)
+        if match and not match["transitions"]:
+            with self.state.lock:
+                removed = self.state.issues.pop(match["key"], None)
+            return self._send(204) if removed else self._send(404, {"errorMessages": ["Issue does not exist."]})
+        return self._send(404, {"errorMessages": [f"Unknown path {path}"]})
+
+
+class FakeJiraServer:
+    """
+    Runs the fake Jira API on a background thread.
+
+        with FakeJiraServer() as jira:
+            os.environ["JIRA_URL"] = jira.url
+            ...
+            assert "ABC" in jira.state.projects
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_seconds: float = 0.0, fail_next: int = 0):
+        self.state = FakeJiraState(latency_seconds=latency_seconds, fail_next=fail_next)
+        handler = type("BoundFakeJiraHandler", (FakeJiraHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeJiraServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake Jira REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before answering each request.")
+    parser.add_argument("--fail-next", type=int, default=0, help="Number of write requests to fail with 503.")
+    args = parser.parse_args()
+
+    server = FakeJiraServer(args.host, args.port, args.latency, args.fail_next)
+    print(f"Fake Jira listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
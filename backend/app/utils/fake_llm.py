@@ -0,0 +1,82 @@
+"""
+A deterministic in-process stand-in for a Gemini GenerativeModel, used to exercise the LLM flow
+(job queue, streamed replies, chat persistence) locally, in tests and in load tests without an
+API key or network access.
+
+Enable it with LLM_PROVIDER=fake. The reply is derived only from the question part of the
+prompt, so the same prompt always yields the same text and the same chunks. Latency before the
+first chunk and the streaming rate are set with LLM_FAKE_LATENCY_SECONDS and
+LLM_FAKE_TOKENS_PER_SECOND.
+"""
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+QUESTION_MARKER = "--- User Question ---"
+# Same rough estimate the context builder uses: one token per four characters.
+CHARS_PER_TOKEN = 4
+
+
+class FakeChunk:
+    """One streamed piece of a reply, shaped like a Gemini response chunk."""
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStreamResponse:
+    """Async iterator over FakeChunks, like the result of generate_content_async(stream=True)."""
+    def __init__(self, chunks: List[str], tokens_per_second: float):
+        self._chunks = chunks
+        self._tokens_per_second = tokens_per_second
+        self.text = "".join(chunks)
+
+    async def __aiter__(self) -> AsyncIterator[FakeChunk]:
+        for chunk in self._chunks:
+            if self._tokens_per_second:
+                await asyncio.sleep(_chunk_tokens(chunk) / self._tokens_per_second)
+            yield FakeChunk(chunk)
+
+
+def _chunk_tokens(chunk: str) -> int:
+    return max(1, (len(chunk) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+class FakeGenerativeModel:
+    """
+    Answers every prompt with a fixed sentence quoting the user's question, split into chunks
+    of `words_per_chunk` words. Each call waits `latency_seconds` before answering, and chunks
+    are released at `tokens_per_second` (0 for no delay).
+
+    Setting `fail_next` makes that many upcoming calls raise ConnectionError, to exercise retries.
+    """
+    def __init__(self, model_name: str = "fake-model", words_per_chunk: int = 3, latency_seconds: float = 0.0, tokens_per_second: float = 0.0):
+        self.model_name = model_name
+        self.words_per_chunk = words_per_chunk
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.fail_next = 0
+        self.prompts: List[str] = []
+
+    def reply_for(self, prompt: str) -> str:
+        question = prompt.split(QUESTION_MARKER, 1)[-1].strip()
+        return f"This is a fake answer to: {question}"
+
+    def chunks_for(self, prompt: str) -> List[str]:
+        words = self.reply_for(prompt).split(" ")
+        return [
+            " ".join(words[start:start + self.words_per_chunk]) + (" " if start + self.words_per_chunk < len(words) else "")
+            for start in range(0, len(words), self.words_per_chunk)
+        ]
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, request_options: Optional[dict] = None):
+        self.prompts.append(prompt)
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise ConnectionError("Injected fake LLM failure.")
+        chunks = self.chunks_for(prompt)
+        if stream:
+            return FakeStreamResponse(chunks, self.tokens_per_second)
+        if self.tokens_per_second:
+            await asyncio.sleep(sum(_chunk_tokens(chunk) for chunk in chunks) / self.tokens_per_second)
+        return FakeChunk("".join(chunks))
@@ -0,0 +1,122 @@
+"""
+Load test for the assistant path: drives concurrent prompts through
+llm_service.handle_gemini_prompt against a scratch project and reports end-to-end latency
+(context building, generation, streaming and both chat writes).
+
+Run it against the configured MongoDB with the local fake model:
+    python -m app.utils.llm_benchmark --requests 200 --concurrency 20 --latency 0.3 --tokens-per-second 200
+Pass --provider gemini to measure the real model instead (needs GEMINI_API_KEY). Prompts are
+unique unless --repeat-prompts is set, so by default every request misses the answer cache.
+The scratch project and everything written for it (messages, notifications, chat summary,
+retrieval index) are removed afterwards.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.llm_connection import get_llm_provider
+from app.repos.chat_repo import chat_repo
+from app.repos.chat_summary_repo import chat_summary_repo
+from app.repos.notification_repo import notification_repo
+from app.repos.project_repo import project_repo
+from app.repos.version_repo import version_repo, project_tasks_scope, project_chat_scope
+from app.services import llm_service, retrieval_service
+from app.services.llm_cache_service import llm_answer_cache
+
+BENCHMARK_USERNAME = "llm-benchmark"
+
+
+def _create_scratch_project(user_id: str) -> str:
+    project_id = project_repo.create({
+        "project_name": f"LLM benchmark {ObjectId()}",
+        "description": "Scratch project created by app.utils.llm_benchmark.",
+        "created_by": user_id,
+        "members": [],
+    })
+    return str(project_id)
+
+
+def _remove_scratch_project(project_id: str):
+    chat_repo.collection.delete_many({"project_id": project_id})
+    notification_repo.collection.delete_many({"project_id": project_id})
+    chat_summary_repo.delete(project_id)
+    # Building the prompt context backfills the retrieval index, which leaves a marker even when empty.
+    retrieval_service.remove_project(project_id)
+    project_repo.collection.delete_one({"_id": ObjectId(project_id)})
+    version_repo.collection.delete_many({"_id": {"$in": [project_tasks_scope(project_id), project_chat_scope(project_id)]}})
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+        "mean": round(float(values.mean()), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+async def run_benchmark(project_id: str, user_id: str, requests: int, concurrency: int, repeat_prompts: bool = False) -> Dict[str, Any]:
+    """Sends `requests` prompts with at most `concurrency` in flight and summarizes their latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        prompt = "What should the team work on next?" if repeat_prompts else f"What should the team work on next? (request {index})"
+        async with semaphore:
+            started = time.perf_counter()
+            message = await llm_service.handle_gemini_prompt(project_id, prompt, user_id, BENCHMARK_USERNAME)
+            latencies.append(time.perf_counter() - started)
+        if message.message == llm_service.ERROR_REPLY:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "provider": get_llm_provider().name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "retries": get_llm_provider().retries,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_per_second": round(requests / elapsed, 2) if elapsed else None,
+        "latency_seconds": _summary(latencies),
+        "cache": llm_answer_cache.metrics(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end latency of LLM prompts.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--provider", default="fake", help="LLM provider to use (fake or gemini).")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model: seconds before the first chunk.")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Fake model: streaming rate, 0 for no delay.")
+    parser.add_argument("--repeat-prompts", action="store_true", help="Send the same prompt every time, to measure the answer cache.")
+    args = parser.parse_args()
+
+    settings.LLM_PROVIDER = args.provider
+    settings.LLM_FAKE_LATENCY_SECONDS = args.latency
+    settings.LLM_FAKE_TOKENS_PER_SECOND = args.tokens_per_second
+    get_llm_provider.cache_clear()
+
+    user_id = str(ObjectId())
+    project_id = _create_scratch_project(user_id)
+    try:
+        report = asyncio.run(run_benchmark(project_id, user_id, args.requests, args.concurrency, args.repeat_prompts))
+    finally:
+        _remove_scratch_project(project_id)
+
+    latency = report["latency_seconds"]
+    print(f"Provider: {report['provider']}, {report['requests']} requests at concurrency {report['concurrency']}")
+    print(f"Errors: {report['errors']}, retries: {report['retries']}, cache hits: {report['cache']['hits'] + report['cache']['coalesced']}")
+    print(f"Elapsed: {report['elapsed_seconds']}s, throughput: {report['throughput_per_second']} prompts/s")
+    print(f"Latency p50: {latency['p50']}s, p99: {latency['p99']}s, mean: {latency['mean']}s, max: {latency['max']}s")
@@ -0,0 +1,201 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds, in seconds, for latencies from sub-millisecond queries to multi-second calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds for sizes: recipients of a broadcast, notifications in a batch.
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# (name suffix, extra labels, value) of one exposition line.
+Sample = Tuple[str, Optional[Dict[str, str]], float]
+
+
+class Counter:
+    """A value that only goes up."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> Iterator[Sample]:
+        yield "", None, self.value
+
+
+class Gauge:
+    """
+    A value that goes up and down. `set_function` makes it read its value from a callback at scrape
+    time instead, for numbers the application already keeps (e.g. open connections).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+    def samples(self) -> Iterator[Sample]:
+        yield "", None, self.value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, as Prometheus keeps them: constant memory however many values are
+    observed, and quantiles estimated from the bucket counts.
+    """
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the overflow (+Inf) bucket.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given quantile (None when empty or past the last bound)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def _cumulative(self) -> Tuple[List[int], int, float]:
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative = []
+        running = 0
+        for bucket_count in counts[:-1]:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, count, total
+
+    def samples(self) -> Iterator[Sample]:
+        cumulative, count, total = self._cumulative()
+        for bound, bucket_count in zip(self.buckets, cumulative):
+            yield "_bucket", {"le": _format_value(bound)}, bucket_count
+        yield "_bucket", {"le": "+Inf"}, count
+        yield "_sum", None, total
+        yield "_count", None, count
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, count, total = self._cumulative()
+        buckets = {str(bound): bucket_count for bound, bucket_count in zip(self.buckets, cumulative)}
+        buckets["+Inf"] = count
+        return {
+            "count": count,
+            "sum_seconds": round(total, 6),
+            "mean_seconds": round(total / count, 6) if count else None,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class MetricFamily:
+    """
+    One named metric and its children, one per combination of label values. Children are created
+    on first use and kept, so hot paths can look one up once and reuse it.
+    """
+    def __init__(self, kind: str, name: str, documentation: str, labelnames: Sequence[str], factory: Callable[[], Any]):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], Any] = {}
+        self._factory = factory
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self.children.setdefault(values, self._factory())
+        return child
+
+
+class MetricsRegistry:
+    """The application's metrics, rendered in the Prometheus text exposition format."""
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric '{family.name}' is already registered.")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily("counter", name, documentation, labelnames, Counter))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily("gauge", name, documentation, labelnames, Gauge))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._register(MetricFamily("histogram", name, documentation, labelnames, lambda: Histogram(buckets)))
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {_escape(family.documentation, help_text=True)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in list(family.children.items()):
+                labels = dict(zip(family.labelnames, values))
+                for suffix, extra, value in child.samples():
+                    lines.append(f"{family.name}{suffix}{_format_labels({**labels, **extra} if extra else labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(text: str, help_text: bool = False) -> str:
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text if help_text else text.replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+registry = MetricsRegistry()
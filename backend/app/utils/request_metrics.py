@@ -0,0 +1,35 @@
+import time
+
+from app.utils.metrics import registry
+
+HTTP_REQUEST_DURATION = registry.histogram("http_request_duration_seconds", "Time taken to answer HTTP requests, by route template.", ["method", "route"])
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled.").labels()
+# Requests that matched no route, or used a non-standard method, share one label each, so
+# scanners cannot create unbounded series.
+UNMATCHED_ROUTE = "<unmatched>"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request. The route template ('/projects/{project_id}')
+    is read from the scope after the router has matched it, so series stay one per route rather
+    than one per URL. Websocket connections are counted by the connection managers instead.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else OTHER_METHOD
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
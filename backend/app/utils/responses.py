@@ -1,3 +1,8 @@
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
 class Response:
     @staticmethod
     def success(data, message: str = "Request successful", status_code: int = 200):
@@ -17,4 +22,22 @@ class Response:
             "status_code": status_code
         }
     
-response = Response()
\ No newline at end of file
+response = Response()
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body generator is still reading the request body (e.g. a streamed upload
+    answered with a streamed per-row result).
+
+    The stock StreamingResponse listens for client disconnects by calling `receive()` while it streams
+    on ASGI servers older than spec 2.4, which would race the generator for the request body chunks.
+    This variant only streams; a disconnected client surfaces as a failed send instead.
+    """
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
@@ -3,19 +3,32 @@ from typing import List, Dict
 from typing import Any
 import logging
 import inspect
+import time
 
 # Your project's specific imports
 from app.core.logger import logs
 from app.models.chat_model import ChatMessage
+from app.utils.metrics import registry, SIZE_BUCKETS
+
+# Shared by the chat and notification connection managers, labelled with their endpoint.
+WEBSOCKET_CONNECTIONS = registry.gauge("websocket_connections", "Open websocket connections.", ["endpoint"])
+WEBSOCKET_BROADCAST_RECIPIENTS = registry.histogram("websocket_broadcast_recipients", "Connections a broadcast was sent to.", ["endpoint"], buckets=SIZE_BUCKETS)
+WEBSOCKET_BROADCAST_DURATION = registry.histogram("websocket_broadcast_duration_seconds", "Time taken to send a broadcast to every connection.", ["endpoint"])
 
 class ConnectionManager:
     """
     Manages active WebSocket connections for project-based chat rooms.
     This version is corrected to handle broadcasting to multiple clients per project.
     """
-    def __init__(self):
+    def __init__(self, endpoint: str):
         # A dictionary where keys are project_ids and values are lists of active WebSockets
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        WEBSOCKET_CONNECTIONS.labels(endpoint).set_function(self.connection_count)
+        self._broadcast_recipients = WEBSOCKET_BROADCAST_RECIPIENTS.labels(endpoint)
+        self._broadcast_duration = WEBSOCKET_BROADCAST_DURATION.labels(endpoint)
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.active_connections.values())
 
     async def connect(self, websocket: WebSocket, project_id: str):
         """
@@ -49,19 +62,26 @@ class ConnectionManager:
         }
         await self._send_personal_json(websocket, history_payload)
 
-    async def broadcast(self, project_id: str, data: dict):
-        """Broadcasts a JSON message to all clients in a specific project room."""
+    async def broadcast(self, project_id: str, data: dict) -> int:
+        """Broadcasts a JSON message to all clients in a specific project room. Returns how many it reached."""
         log_name = inspect.stack()[0]
+        delivered = 0
         if project_id in self.active_connections:
+            start = time.perf_counter()
             # We iterate over a copy of the list in case of disconnections during broadcast
-            for connection in list(self.active_connections.get(project_id, [])):
+            connections = list(self.active_connections.get(project_id, []))
+            for connection in connections:
                 try:
                     await connection.send_json(data)
+                    delivered += 1
                 except RuntimeError as e:
                     # This can happen if a client disconnects abruptly.
                     logs.define_logger(logging.WARNING, None, log_name, message=f"Failed to send to a client in project '{project_id}', likely disconnected. Error: {e}")
                     # The endpoint's finally block will handle the cleanup.
                     pass
+            self._broadcast_recipients.observe(len(connections))
+            self._broadcast_duration.observe(time.perf_counter() - start)
+        return delivered
 
 # A single, shared instance for the entire application
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager("/ws/notifications")
\ No newline at end of file